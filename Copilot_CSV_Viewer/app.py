@@ -24,12 +24,39 @@ import logging
 import time
 from utils import (
     load_csv_data,
-    filter_dataframe_by_text,
+    iter_csv_chunks,
+    concat_csv_chunks,
+    default_parse_cache,
+    default_disk_cache,
+    is_pyarrow_available,
+    compact_dataframe,
+    sniff_csv_schema,
+    get_schema_details,
+    CSV_ENGINES,
+    DEFAULT_CATEGORY_RATIO,
+    DEFAULT_MEMORY_BUDGET_MB,
+    search_dataframe,
+    get_search_text_memory,
+    drop_search_text,
+    SearchIndex,
+    TrigramIndex,
+    SEARCH_MODES,
+    TRIGRAM_INDEX_MIN_ROWS,
+    DEFAULT_SEARCH_WORKERS,
+    PARALLEL_SEARCH_MIN_CELLS,
+    paginate_dataframe,
+    find_row_page,
+    PAGE_SIZES,
+    DEFAULT_PAGE_SIZE,
     get_numeric_columns,
     calculate_numeric_statistics,
+    DEFAULT_QUANTILE_ERROR,
     get_dataset_info,
     get_column_details,
     prepare_chart_data,
+    DEFAULT_CHART_POINTS,
+    CHART_AGGREGATIONS,
+    DEFAULT_TOP_GROUPS,
     validate_chart_requirements
 )
 
@@ -40,15 +67,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def process_uploaded_file(uploaded_file):
+# Nomes exibidos das agregações dos gráficos (None = sem agregação)
+AGGREGATION_LABELS = {
+    None: "Nenhuma (uma barra por linha)",
+    'sum': "Soma",
+    'mean': "Média",
+    'count': "Contagem",
+    'min': "Mínimo",
+    'max': "Máximo"
+}
+
+def process_uploaded_file(uploaded_file, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                          engine="c", dtype_backend=None, use_disk_cache=True,
+                          compact=False, category_ratio=DEFAULT_CATEGORY_RATIO):
     """
     Processa o arquivo CSV carregado pelo usuário.
     
-    Carrega o arquivo CSV em um DataFrame do pandas, armazena no estado da sessão
-    e exibe mensagens de confirmação com informações básicas do dataset.
+    Antes da leitura completa, detecta o esquema (delimitador, codificação e
+    tipos) a partir de uma amostra do arquivo e o exibe imediatamente; os tipos
+    detectados são repassados ao parser, que não precisa inferi-los. O esquema
+    fica guardado por upload (file_id), então os reruns seguintes não leem
+    a amostra de novo e vão direto ao cache de parsing.
+    Lê o arquivo CSV em blocos limitados pelo orçamento de memória, exibindo o
+    preview assim que o primeiro bloco é lido, enquanto o restante ainda carrega.
+    Com o motor pyarrow o arquivo é lido de uma vez, em múltiplas threads.
+    Se o mesmo conteúdo já foi carregado com as mesmas opções, o DataFrame vem
+    do cache de parsing em memória ou do arquivo Feather em disco, e nenhuma
+    leitura do CSV é refeita.
+    No modo compacto, os tipos das colunas são reduzidos após a leitura e a
+    memória antes/depois da conversão é exibida.
+    Ao final, armazena o DataFrame completo no estado da sessão e exibe mensagens
+    de confirmação com informações básicas do dataset.
     
     Args:
         uploaded_file: Arquivo carregado pelo Streamlit file_uploader
+        memory_budget_mb: Orçamento de memória (MB) de cada bloco lido (o pico
+            total é o DataFrame completo mais um bloco; ver concat_csv_chunks)
+        engine: Motor de parsing ("c" ou "pyarrow")
+        dtype_backend: Backend de tipos (None ou "pyarrow")
+        use_disk_cache: Se True, usa o cache colunar em disco
+        compact: Se True, reduz os tipos numéricos e converte texto em 'category'
+        category_ratio: Razão máxima valores únicos / linhas para usar 'category'
         
     Raises:
         Exception: Captura erros de leitura do arquivo CSV (formato inválido, 
@@ -57,23 +116,124 @@ def process_uploaded_file(uploaded_file):
     start_time = time.time()
     logger.info(f"Iniciando upload de arquivo: {uploaded_file.name}")
     
-    # Carrega o CSV usando função utilitária
-    df = load_csv_data(uploaded_file)
+    # Espaços reservados para as mensagens, preenchidos ao final da carga
+    status_placeholder = st.empty()
+    info_placeholder = st.empty()
+    
+    # Esquema detectado por amostragem, exibido antes da leitura completa;
+    # reaproveitado enquanto o mesmo upload estiver carregado
+    schema_key = (getattr(uploaded_file, 'file_id', None), getattr(uploaded_file, 'size', None))
+    saved_key, schema = st.session_state.get('detected_schema', (None, None))
+    if schema_key[0] is None or saved_key != schema_key:
+        sniff_start = time.time()
+        schema = sniff_csv_schema(uploaded_file)
+        logger.info(f"Esquema detectado em {(time.time() - sniff_start) * 1000:.1f} ms: delimitador={schema['delimiter']!r}, codificação={schema['encoding']}, {len(schema['columns'])} colunas, {len(schema['date_columns'])} de datas")
+        st.session_state['detected_schema'] = (schema_key, schema)
+    show_detected_schema(schema)
+    
+    # Reaproveita o DataFrame se o mesmo conteúdo já foi carregado
+    cache_key = default_parse_cache.make_key(uploaded_file, engine=engine, dtype_backend=dtype_backend,
+                                             compact=compact, category_ratio=category_ratio if compact else None,
+                                             sep=schema['delimiter'], encoding=schema['encoding'])
+    df = default_parse_cache.get(cache_key)
+    cache_status = "acerto (memória)" if df is not None else "falha"
+    if df is None and use_disk_cache:
+        df = default_disk_cache.get(cache_key)
+        if df is not None:
+            cache_status = "acerto (disco)"
+            default_parse_cache.put(cache_key, df)
+    cache_hit = df is not None
+    
+    if cache_hit or engine == "pyarrow":
+        if not cache_hit:
+            # Carrega o CSV de uma vez com o parser multi-thread
+            df = load_csv_data(uploaded_file, engine=engine, dtype_backend=dtype_backend, schema=schema)
+        n_chunks = 1
+        st.subheader("Preview dos Dados")
+        st.dataframe(df.head(10))
+    else:
+        # Carrega o CSV em blocos usando função utilitária
+        chunks = []
+        loaded_rows = 0
+        for chunk in iter_csv_chunks(uploaded_file, memory_budget_mb=memory_budget_mb,
+                                     dtype_backend=dtype_backend, schema=schema):
+            if not chunks:
+                # Preview dos dados a partir do primeiro bloco
+                st.subheader("Preview dos Dados")
+                st.dataframe(chunk.head(10))
+            chunks.append(chunk)
+            loaded_rows += len(chunk)
+            status_placeholder.info(f"⏳ Carregando... {loaded_rows:,} linhas lidas")
+        
+        # A junção libera cada bloco depois de copiá-lo para o DataFrame final
+        n_chunks = len(chunks)
+        chunk = None
+        df = concat_csv_chunks(chunks)
+    
+    # Relatórios do modo compacto por chave, para reexibir em acertos de cache
+    compact_reports = st.session_state.setdefault('compact_reports', {})
+    if compact and not cache_hit:
+        compact_result = compact_dataframe(df, category_ratio)
+        df = compact_result['dataframe']
+        compact_reports[cache_key] = compact_result
+        logger.info(f"Modo compacto: {compact_result['memory_before_kb']} KB -> {compact_result['memory_after_kb']} KB, {len(compact_result['converted'])} colunas convertidas")
+    
+    if not cache_hit:
+        default_parse_cache.put(cache_key, df)
+        if use_disk_cache:
+            default_disk_cache.put(cache_key, df)
+    
+    # Um novo DataFrame invalida os índices e o texto de busca do anterior
+    previous_df = st.session_state.get('dataframe')
+    if previous_df is not df:
+        st.session_state.pop('search_index', None)
+        st.session_state.pop('trigram_index', None)
+        if previous_df is not None:
+            drop_search_text(previous_df)
     
     # Salva no estado da sessão
     st.session_state['dataframe'] = df
     st.session_state['filename'] = uploaded_file.name
     
     upload_duration = time.time() - start_time
-    logger.info(f"Upload concluído: {uploaded_file.name} - {df.shape[0]} linhas, {df.shape[1]} colunas - Duração: {upload_duration:.3f}s")
+    logger.info(f"Upload concluído: {uploaded_file.name} - {df.shape[0]} linhas, {df.shape[1]} colunas, {n_chunks} blocos, motor={engine} - Duração: {upload_duration:.3f}s")
+    logger.info(f"Cache de parsing: {cache_status} - acertos={default_parse_cache.hits}, falhas={default_parse_cache.misses}, {len(default_parse_cache)} entradas, {default_parse_cache.total_bytes / 1024 / 1024:.1f} MB")
     
     # Mensagem de confirmação
-    st.success(f"✅ Arquivo '{uploaded_file.name}' carregado com sucesso!")
-    st.info(f"📈 Dados: {df.shape[0]} linhas e {df.shape[1]} colunas")
+    status_placeholder.success(f"✅ Arquivo '{uploaded_file.name}' carregado com sucesso!")
+    info_placeholder.info(f"📈 Dados: {df.shape[0]} linhas e {df.shape[1]} colunas")
+    
+    compact_result = compact_reports.get(cache_key) if compact else None
+    if compact_result is not None:
+        before_kb = compact_result['memory_before_kb']
+        after_kb = compact_result['memory_after_kb']
+        reduction = (1 - after_kb / before_kb) * 100 if before_kb else 0.0
+        st.info(f"🗜️ Modo compacto: {before_kb:,.1f} KB → {after_kb:,.1f} KB ({reduction:.0f}% menos memória)")
+        if compact_result['converted']:
+            with st.expander("Colunas convertidas"):
+                st.dataframe(pd.DataFrame({
+                    'Coluna': list(compact_result['converted'].keys()),
+                    'Conversão': list(compact_result['converted'].values())
+                }), use_container_width=True)
+
+def show_detected_schema(schema):
+    """
+    Exibe o esquema detectado na amostra do arquivo, antes da leitura completa.
+    
+    Args:
+        schema: Esquema retornado por sniff_csv_schema
+    """
+    if not schema['columns']:
+        return
     
-    # Preview dos dados
-    st.subheader("Preview dos Dados")
-    st.dataframe(df.head(10))
+    delimiter = {'\t': 'tab'}.get(schema['delimiter'], schema['delimiter'])
+    with st.expander(f"🔎 Esquema detectado ({len(schema['columns'])} colunas)"):
+        st.caption(
+            f"Delimitador: `{delimiter}` · Codificação: {schema['encoding'] or 'texto'} · "
+            f"Cabeçalho: {'sim' if schema['has_header'] else 'não detectado'} · "
+            f"Amostra: {schema['sampled_rows']:,} linhas"
+        )
+        st.dataframe(get_schema_details(schema), use_container_width=True)
 
 def show_instructions():
     """
@@ -93,22 +253,82 @@ def show_instructions():
     
     # Limpa o estado da sessão se não há arquivo
     if 'dataframe' in st.session_state:
+        drop_search_text(st.session_state['dataframe'])
         del st.session_state['dataframe']
     if 'filename' in st.session_state:
         del st.session_state['filename']
+    if 'search_index' in st.session_state:
+        del st.session_state['search_index']
+    if 'trigram_index' in st.session_state:
+        del st.session_state['trigram_index']
+    if 'detected_schema' in st.session_state:
+        del st.session_state['detected_schema']
 
-def show_search_feedback(search_text, filtered_df):
+def show_search_feedback(search_text, found_rows, column_hits=None):
     """
     Exibe feedback sobre os resultados da busca por texto.
     
     Args:
         search_text: Texto buscado pelo usuário
-        filtered_df: DataFrame filtrado pelos resultados
+        found_rows: Número de linhas encontradas
+        column_hits: Linhas encontradas em cada coluna buscada (opcional)
     """
-    if len(filtered_df) == 0:
+    if found_rows == 0:
         st.warning(f"⚠️ Nenhum resultado encontrado para '{search_text}'")
-    else:
-        st.info(f"🔍 Encontrados {len(filtered_df)} registros para '{search_text}'")
+        return
+    
+    st.info(f"🔍 Encontrados {found_rows} registros para '{search_text}'")
+    if column_hits:
+        hits_df = pd.DataFrame({
+            'Coluna': [str(column) for column in column_hits],
+            'Linhas Encontradas': list(column_hits.values())
+        }).sort_values('Linhas Encontradas', ascending=False, kind='stable')
+        with st.expander("📍 Ocorrências por coluna"):
+            st.dataframe(hits_df, use_container_width=True, hide_index=True)
+
+def get_search_index(df):
+    """
+    Retorna o índice de busca do DataFrame carregado, construindo-o na primeira consulta.
+    
+    O índice fica no estado da sessão ao lado do DataFrame e é descartado
+    quando um novo arquivo é carregado.
+    
+    Args:
+        df: DataFrame carregado no estado da sessão
+        
+    Returns:
+        SearchIndex: Índice token -> linhas do DataFrame
+    """
+    if 'search_index' not in st.session_state:
+        start_time = time.time()
+        with st.spinner("Construindo índice de busca..."):
+            st.session_state['search_index'] = SearchIndex.build(df)
+        index = st.session_state['search_index']
+        logger.info(f"Índice de busca construído: {len(index.tokens)} tokens, {index.nbytes / 1024 / 1024:.1f} MB - Duração: {time.time() - start_time:.3f}s")
+    return st.session_state['search_index']
+
+def get_trigram_index(df):
+    """
+    Retorna o índice de trigramas do DataFrame carregado, construindo-o na primeira busca.
+    
+    Só é usado em arquivos com pelo menos TRIGRAM_INDEX_MIN_ROWS linhas; em
+    arquivos menores a varredura já é rápida.
+    
+    Args:
+        df: DataFrame carregado no estado da sessão
+        
+    Returns:
+        TrigramIndex ou None se o DataFrame for pequeno
+    """
+    if len(df) < TRIGRAM_INDEX_MIN_ROWS:
+        return None
+    if 'trigram_index' not in st.session_state:
+        start_time = time.time()
+        with st.spinner("Construindo índice de trigramas..."):
+            st.session_state['trigram_index'] = TrigramIndex.build(df)
+        index = st.session_state['trigram_index']
+        logger.info(f"Índice de trigramas construído: {index.nbytes / 1024 / 1024:.1f} MB - Duração: {time.time() - start_time:.3f}s")
+    return st.session_state['trigram_index']
 
 def show_numeric_statistics(df):
     """
@@ -119,13 +339,25 @@ def show_numeric_statistics(df):
     """
     st.subheader("🔢 Estatísticas das Colunas Numéricas")
     
+    approximate = st.checkbox(
+        "Quantis aproximados (mediana, P90 e P99)",
+        value=False,
+        help="Estima os quantis a partir de uma amostra de tamanho fixo, sem particionar as colunas inteiras"
+    )
+    
     # Calcular estatísticas usando função utilitária
-    stats_result = calculate_numeric_statistics(df)
+    start_time = time.time()
+    stats_result = calculate_numeric_statistics(df, approximate=approximate)
     stats_df = stats_result['stats_df']
     summary = stats_result['summary']
+    logger.info(f"Estatísticas calculadas - Colunas: {summary['total_numeric_columns']}, "
+                f"Aproximadas: {approximate}, Duração: {time.time() - start_time:.3f}s")
     
     # Exibir tabela de estatísticas
     st.dataframe(stats_df, use_container_width=True)
+    if approximate:
+        st.caption(f"≈ Valores aproximados: cada quantil estimado fica a no máximo "
+                   f"{DEFAULT_QUANTILE_ERROR:.0%} de distância em posição do valor exato.")
     
     # Métricas principais em colunas
     st.subheader("📈 Resumo Geral das Colunas Numéricas")
@@ -195,7 +427,8 @@ def show_dataset_summary(df):
         for dtype, count in type_distribution.items():
             st.write(f"• **{dtype}:** {count} colunas")
 
-def generate_chart(df, chart_type, x_column, y_columns):
+def generate_chart(df, chart_type, x_column, y_columns, max_points=DEFAULT_CHART_POINTS,
+                   aggregation=None, top_groups=DEFAULT_TOP_GROUPS):
     """
     Processa e gera gráfico baseado nas seleções do usuário.
     
@@ -204,12 +437,16 @@ def generate_chart(df, chart_type, x_column, y_columns):
         chart_type: Tipo de gráfico ("Barras" ou "Linha")
         x_column: Nome da coluna para eixo X
         y_columns: Lista de colunas para eixo Y
+        max_points: Máximo de pontos desenhados (séries maiores são reduzidas por M4)
+        aggregation: Agregação por valor de X (None = uma barra/ponto por linha)
+        top_groups: Quantidade de grupos exibidos com agregação
     """
     start_time = time.time()
-    logger.info(f"Iniciando geração de gráfico: tipo={chart_type}, x={x_column}, y={y_columns}")
+    logger.info(f"Iniciando geração de gráfico: tipo={chart_type}, x={x_column}, y={y_columns}, "
+                f"agregação={aggregation}")
     
     # Preparar dados usando função utilitária
-    chart_result = prepare_chart_data(df, x_column, y_columns)
+    chart_result = prepare_chart_data(df, x_column, y_columns, max_points, aggregation, top_groups)
     chart_df = chart_result['chart_df']
     is_date = chart_result['is_date']
     y_stats = chart_result['stats']
@@ -224,7 +461,21 @@ def generate_chart(df, chart_type, x_column, y_columns):
         st.info("📅 Detectada coluna de data - dados ordenados cronologicamente")
     
     # Mostrar informações do gráfico
-    st.info(f"📊 Exibindo {len(chart_df)} pontos de dados")
+    total_points = chart_result['total_points']
+    if aggregation is not None:
+        n_groups = chart_result['n_groups']
+        others = f"; os demais {n_groups - top_groups:,} em \"Outros\"" if n_groups > top_groups else ""
+        st.info(f"📊 {total_points:,} linhas agrupadas em {n_groups:,} valores de {x_column}{others}")
+    elif chart_result['time_bucket'] is not None:
+        bucket_labels = {'min': "minuto", 'h': "hora", 'D': "dia", 'W': "semana", 'MS': "mês"}
+        time_aggregation = AGGREGATION_LABELS[chart_result['time_aggregation']].lower()
+        st.info(f"📊 {total_points:,} linhas agregadas por {bucket_labels[chart_result['time_bucket']]} "
+                f"({time_aggregation}) em {len(chart_df):,} pontos")
+    elif len(chart_df) < total_points:
+        st.info(f"📊 Exibindo {len(chart_df):,} de {total_points:,} pontos de dados "
+                f"(primeiro, último, mínimo e máximo de cada intervalo, preservando picos e vales)")
+    else:
+        st.info(f"📊 Exibindo {len(chart_df)} pontos de dados")
     
     # Preparar DataFrame para o gráfico (definir X como índice)
     chart_df_indexed = chart_df.set_index(x_column)
@@ -296,10 +547,44 @@ def show_chart_section(df, numeric_columns):
             help="Selecione uma ou mais colunas numéricas para o eixo Y"
         )
     
+    col4, col5, col6 = st.columns([1, 1, 2])
+    
+    with col4:
+        # Agregação por valor de X (padrão para barras: soma)
+        aggregation = st.selectbox(
+            "Agregação por X:",
+            (None,) + CHART_AGGREGATIONS,
+            index=1 if chart_type == "Barras" else 0,
+            format_func=AGGREGATION_LABELS.get,
+            help="Agrupa as linhas pelo valor de X; útil quando X é uma categoria ou um identificador"
+        )
+    
+    with col5:
+        top_groups = st.number_input(
+            "Grupos exibidos:",
+            min_value=1,
+            max_value=200,
+            value=DEFAULT_TOP_GROUPS,
+            step=1,
+            disabled=aggregation is None,
+            help="Os maiores grupos (pela primeira coluna Y) viram barras; os demais são reunidos em \"Outros\""
+        )
+    
+    with col6:
+        max_points = st.slider(
+            "Máximo de pontos no gráfico:",
+            min_value=100,
+            max_value=10000,
+            value=DEFAULT_CHART_POINTS,
+            step=100,
+            disabled=aggregation is not None,
+            help="Séries maiores são reduzidas mantendo o primeiro, o último, o mínimo e o máximo de cada intervalo"
+        )
+    
     # Gerar gráfico se as seleções estão válidas
     if y_columns and x_column:
         try:
-            generate_chart(df, chart_type, x_column, y_columns)
+            generate_chart(df, chart_type, x_column, y_columns, max_points, aggregation, int(top_groups))
         except Exception as e:
             st.error(f"❌ Erro ao gerar gráfico: {str(e)}")
             st.info("💡 Dica: Verifique se as colunas selecionadas contêm dados válidos")
@@ -327,10 +612,60 @@ uploaded_file = st.file_uploader(
     help="Selecione um arquivo CSV para visualizar"
 )
 
+# Opções de carregamento
+with st.expander("⚙️ Opções de carregamento"):
+    memory_budget_mb = st.number_input(
+        "Orçamento de memória por bloco (MB):",
+        min_value=1.0,
+        value=DEFAULT_MEMORY_BUDGET_MB,
+        step=16.0,
+        help="O arquivo é lido em blocos que cabem neste orçamento; o preview aparece após o primeiro bloco. "
+             "O orçamento vale para cada bloco: o pico total fica perto do DataFrame completo mais um bloco"
+    )
+    engine = st.selectbox(
+        "Motor de leitura:",
+        CSV_ENGINES,
+        help="O motor pyarrow lê o arquivo inteiro em múltiplas threads (sem preview parcial)"
+    )
+    use_arrow_dtypes = st.checkbox(
+        "Usar tipos Arrow (strings compactas)",
+        value=False,
+        help="Armazena as colunas com tipos do Apache Arrow, reduzindo a memória das colunas de texto"
+    )
+    use_disk_cache = st.checkbox(
+        "Usar cache em disco (Feather)",
+        value=True,
+        help=f"Guarda o arquivo já processado em {default_disk_cache.cache_dir} para recarregar o mesmo conteúdo sem novo parsing"
+    )
+    compact = st.checkbox(
+        "Modo compacto (reduzir tipos)",
+        value=False,
+        help="Reduz inteiros/floats para o menor tipo sem perda e converte texto com poucos valores distintos em 'category'"
+    )
+    category_ratio = st.slider(
+        "Razão máxima de valores únicos para 'category':",
+        min_value=0.0,
+        max_value=1.0,
+        value=DEFAULT_CATEGORY_RATIO,
+        step=0.05,
+        disabled=not compact,
+        help="Colunas de texto com (valores únicos / linhas) até este limite viram 'category'"
+    )
+    if (engine == "pyarrow" or use_arrow_dtypes or use_disk_cache) and not is_pyarrow_available():
+        st.caption("ℹ️ pyarrow não está instalado; será usado o parser padrão, sem cache em disco")
+
 # Processamento do arquivo
 if uploaded_file is not None:
     try:
-        process_uploaded_file(uploaded_file)
+        process_uploaded_file(
+            uploaded_file,
+            memory_budget_mb,
+            engine=engine,
+            dtype_backend="pyarrow" if use_arrow_dtypes else None,
+            use_disk_cache=use_disk_cache,
+            compact=compact,
+            category_ratio=category_ratio
+        )
     except Exception as e:
         st.error(f"❌ Erro ao carregar o arquivo: {str(e)}")
 else:
@@ -354,7 +689,7 @@ if 'dataframe' in st.session_state and 'filename' in st.session_state:
     # Controles de filtro e visualização
     st.subheader("🔍 Controles de Visualização")
     
-    col1, col2 = st.columns([2, 1])
+    col1, col2, col3 = st.columns([2, 1, 1])
     
     with col1:
         # Busca por texto
@@ -365,39 +700,130 @@ if 'dataframe' in st.session_state and 'filename' in st.session_state:
         )
     
     with col2:
-        # Controle de quantidade de linhas
-        max_rows = st.number_input(
-            "Máximo de linhas:",
-            min_value=10,
-            max_value=len(df),
-            value=min(100, len(df)),
-            step=10,
-            help="Limite a quantidade de linhas exibidas"
+        # Modo de busca
+        search_labels = {
+            "contains": "Contém o texto",
+            "regex": "Expressão regular",
+            "exact": "Célula exata",
+            "token": "Palavras inteiras",
+            "prefix": "Início de palavra"
+        }
+        search_mode = st.selectbox(
+            "Modo de busca:",
+            SEARCH_MODES,
+            format_func=search_labels.get,
+            help="\"Contém o texto\" busca o texto literalmente (mais rápido); use \"Expressão regular\" para padrões. "
+                 "Os modos por palavra usam um índice construído uma vez por arquivo e respondem em milissegundos"
+        )
+        
+        # Threads da busca por varredura (arquivos pequenos continuam seriais)
+        search_workers = st.number_input(
+            "Threads da busca:",
+            min_value=1,
+            max_value=max(DEFAULT_SEARCH_WORKERS, 1) * 2,
+            value=DEFAULT_SEARCH_WORKERS,
+            step=1,
+            help=f"Divide a busca em fatias de linhas e colunas a partir de {PARALLEL_SEARCH_MIN_CELLS:,} células"
         )
     
+    with col3:
+        # Só a página visível é enviada ao navegador
+        page_size = st.selectbox(
+            "Linhas por página:",
+            PAGE_SIZES,
+            index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+            help="Quantidade de linhas exibidas por página da tabela"
+        )
+    
+    # Colunas buscadas (vazio = todas); buscas restritas varrem só essas colunas
+    search_columns = st.multiselect(
+        "Buscar apenas nas colunas:",
+        df.columns.tolist(),
+        help="Deixe vazio para buscar em todas as colunas"
+    )
+    
     # Aplicar filtros usando função utilitária
     start_time = time.time()
-    filtered_df = filter_dataframe_by_text(df, search_text)
+    search_index = get_search_index(df) if search_text and search_mode in ("token", "prefix") and not search_columns else None
+    trigram_index = get_trigram_index(df) if search_mode == "contains" and len(search_text) >= 3 else None
+    search_error = None
+    column_hits = {}
+    mask = None
+    try:
+        search_result = search_dataframe(df, search_text, mode=search_mode, columns=search_columns or None,
+                                         index=search_index, trigram_index=trigram_index,
+                                         n_workers=int(search_workers))
+        column_hits = search_result['column_hits']
+        if search_text.strip():
+            mask = search_result['mask']
+    except ValueError as e:
+        # Expressão regular inválida: exibe os dados sem filtro
+        search_error = str(e)
+    found_rows = len(df) if mask is None else int(mask.sum())
     filter_duration = time.time() - start_time
     
-    if search_text:
-        logger.info(f"Filtro aplicado: '{search_text}' - {len(filtered_df)} registros encontrados - Duração: {filter_duration:.3f}s")
+    if search_error:
+        logger.warning(f"Busca inválida: '{search_text}' (modo={search_mode}) - {search_error}")
+        st.error(f"❌ {search_error}")
+    elif search_text:
+        logger.info(f"Filtro aplicado: '{search_text}' (modo={search_mode}, threads={search_workers}) - {found_rows} registros encontrados - Duração: {filter_duration:.3f}s")
     
     # Feedback sobre busca por texto
-    if search_text:
-        show_search_feedback(search_text, filtered_df)
+    if search_text and not search_error:
+        show_search_feedback(search_text, found_rows, column_hits)
+        
+        # Texto em minúsculas guardado pela busca, liberável sob pouca memória
+        search_memory = get_search_text_memory(df)
+        if search_memory['columns']:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.caption(f"🧠 Texto de busca em cache: {search_memory['columns']} colunas, "
+                           f"{search_memory['bytes'] / 1024 / 1024:.1f} MB")
+            with col2:
+                if st.button("Liberar cache de busca"):
+                    freed = drop_search_text(df)
+                    logger.info(f"Texto de busca descartado: {freed / 1024 / 1024:.1f} MB")
     
-    # Limitar quantidade de linhas
-    display_df = filtered_df.head(max_rows)
+    # Tabela principal, paginada
+    st.subheader("📈 Dados")
     
-    # Exibir informações do filtro
-    if len(filtered_df) > max_rows:
-        st.info(f"📊 Exibindo {max_rows} de {len(filtered_df)} linhas filtradas")
+    # Um novo filtro volta para a primeira página
+    table_filter = (search_text, search_mode, tuple(search_columns), page_size)
+    if st.session_state.get('table_filter') != table_filter:
+        st.session_state['table_filter'] = table_filter
+        st.session_state['table_page'] = 1
     
-    # Tabela principal
-    st.subheader("📈 Dados")
+    n_pages = max(1, -(-found_rows // page_size))
+    col1, col2 = st.columns(2)
+    with col1:
+        # Ir para uma linha do arquivo: abre a página que a contém (ou a próxima linha filtrada)
+        jump_row = st.number_input(
+            "Ir para a linha:",
+            min_value=0,
+            max_value=max(len(df) - 1, 0),
+            value=None,
+            step=1,
+            help="Posição da linha no arquivo (a partir de 0)"
+        )
+        if jump_row is not None and jump_row != st.session_state.get('table_jump_row'):
+            st.session_state['table_page'] = find_row_page(jump_row, mask, page_size)
+        st.session_state['table_jump_row'] = jump_row
+        st.session_state['table_page'] = min(st.session_state.get('table_page', 1), n_pages)
+    with col2:
+        page = st.number_input(
+            "Página:",
+            min_value=1,
+            max_value=n_pages,
+            step=1,
+            key='table_page',
+            help=f"{n_pages} páginas de até {page_size} linhas"
+        )
+    
+    page_data = paginate_dataframe(df, mask, page, page_size)
+    st.caption(f"📊 Linhas {page_data['first_row']}–{page_data['last_row']} de {page_data['total_rows']} "
+               f"(página {page_data['page']} de {page_data['n_pages']})")
     st.dataframe(
-        display_df,
+        page_data['data'],
         use_container_width=True,
         height=400
     )
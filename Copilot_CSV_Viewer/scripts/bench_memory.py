@@ -0,0 +1,142 @@
+"""
+Benchmark de memória do carregamento de CSV.
+
+Mede o pico de memória residente (RSS) ao carregar arquivos CSV sintéticos de
+diferentes tamanhos, comparando o caminho antigo (cópia da entrada em
+io.StringIO/io.BytesIO) com o caminho atual de load_csv_data, que lê direto do
+buffer do upload.
+
+Cada medição roda em um subprocesso separado, para que o pico de RSS de uma
+não contamine a outra.
+
+Uso:
+    python scripts/bench_memory.py                    # 100, 500 e 1000 MB
+    python scripts/bench_memory.py --sizes 10 50      # tamanhos em MB
+    python scripts/bench_memory.py --output reports/memoria.csv
+"""
+
+import argparse
+import csv
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Adicionar o diretório pai ao path para importar utils
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+MODES = {
+    'str-antes': 'String decodificada copiada para io.StringIO',
+    'str-depois': 'String lida diretamente por load_csv_data',
+    'bytes-antes': 'Bytes encapsulados em io.BytesIO',
+    'bytes-depois': 'Bytes lidos diretamente por load_csv_data',
+    'upload-depois': 'Upload (BytesIO) lido do próprio buffer por load_csv_data',
+}
+
+
+def peak_rss_mb() -> float:
+    """Retorna o pico de RSS do processo atual em MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB; macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def generate_csv(path: str, size_mb: int) -> None:
+    """Gera um CSV sintético com aproximadamente size_mb megabytes."""
+    target = size_mb * 1024 * 1024
+    row = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write("id,produto,regiao,quantidade,preco,data\n")
+        written = 0
+        while written < target:
+            lines = []
+            for i in range(row, row + 10000):
+                lines.append(f"{i},Produto {i % 500},Região {i % 7},{i % 97},{(i % 1000) * 1.25:.2f},"
+                             f"2023-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}\n")
+            block = ''.join(lines)
+            f.write(block)
+            written += len(block.encode('utf-8'))
+            row += 10000
+
+
+def run_worker(mode: str, path: str) -> None:
+    """Executa uma medição isolada e imprime 'rss_base rss_pico duracao'."""
+    import pandas as pd
+    from utils import load_csv_data
+
+    # Simula o upload: o Streamlit entrega o arquivo inteiro em um BytesIO
+    with open(path, 'rb') as f:
+        upload = io.BytesIO(f.read())
+    text = upload.getvalue().decode('utf-8') if mode.startswith('str') else None
+    base = peak_rss_mb()
+
+    start = time.perf_counter()
+    if mode == 'str-antes':
+        df = pd.read_csv(io.StringIO(text))
+    elif mode == 'str-depois':
+        df = load_csv_data(text)
+    elif mode == 'bytes-antes':
+        df = pd.read_csv(io.BytesIO(upload.getvalue()))
+    elif mode == 'bytes-depois':
+        df = load_csv_data(upload.getvalue())
+    else:
+        df = load_csv_data(upload)
+    duration = time.perf_counter() - start
+
+    print(f"{base:.1f} {peak_rss_mb():.1f} {duration:.3f} {len(df)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 1000],
+                        help="Tamanhos dos arquivos em MB")
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--output', help="Caminho opcional de um CSV com os resultados")
+    parser.add_argument('--worker', nargs=2, metavar=('MODO', 'ARQUIVO'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_mb in args.sizes:
+            path = os.path.join(tmp_dir, f"bench_{size_mb}mb.csv")
+            generate_csv(path, size_mb)
+            for mode in args.modes:
+                proc = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--worker', mode, path],
+                    capture_output=True, text=True, check=True
+                )
+                base, peak, duration, rows = proc.stdout.split()
+                results.append({
+                    'tamanho_mb': size_mb,
+                    'modo': mode,
+                    'linhas': int(rows),
+                    'rss_entrada_mb': float(base),
+                    'rss_pico_mb': float(peak),
+                    'parse_extra_mb': round(float(peak) - float(base), 1),
+                    'duracao_s': float(duration),
+                })
+                print(f"{size_mb:>6} MB  {mode:<14} pico RSS {float(peak):>9.1f} MB  "
+                      f"(+{float(peak) - float(base):.1f} MB sobre a entrada)  {float(duration):.2f}s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
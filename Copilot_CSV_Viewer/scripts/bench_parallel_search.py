@@ -0,0 +1,83 @@
+"""
+Benchmark da busca por texto paralela.
+
+Mede filter_dataframe_by_text no modo "contains" com 1 a N threads em um
+DataFrame sintético (padrão: 5 milhões de linhas), conferindo que todas as
+execuções retornam as mesmas linhas. O texto em minúsculas das colunas é
+gerado antes das medições, como acontece a partir da segunda busca no app.
+
+Uso:
+    python scripts/bench_parallel_search.py                      # 5M linhas, 1 até N threads
+    python scripts/bench_parallel_search.py --rows 1000000 --workers 1 2 4
+    python scripts/bench_parallel_search.py --queries silva "rio de" --output reports/paralela.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import DEFAULT_SEARCH_WORKERS, get_search_text
+from bench_search import DEFAULT_QUERIES, best_of, fresh_search, generate_dataframe
+
+
+def default_workers() -> list:
+    """Retorna 1, 2, 4, ... até o número de núcleos disponíveis."""
+    workers = [1]
+    while workers[-1] * 2 <= DEFAULT_SEARCH_WORKERS:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != DEFAULT_SEARCH_WORKERS:
+        workers.append(DEFAULT_SEARCH_WORKERS)
+    return workers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000_000, help="Quantidade de linhas do DataFrame")
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers(),
+                        help="Quantidades de threads medidas")
+    parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES, help="Textos buscados")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetições por medição (vale a menor)")
+    parser.add_argument('--output', help="Caminho opcional de um CSV com os resultados")
+    args = parser.parse_args()
+
+    df = generate_dataframe(args.rows)
+    build_time, _ = best_of(1, lambda: [get_search_text(df, position) for position in range(df.shape[1])])
+    print(f"{args.rows:,} linhas - texto de busca gerado em {build_time:.2f}s "
+          f"({os.cpu_count()} núcleos disponíveis)")
+
+    results = []
+    for query in args.queries:
+        baseline, expected = None, None
+        for n_workers in args.workers:
+            duration, found = best_of(args.repeat, lambda: fresh_search(df, query, n_workers=n_workers))
+            if expected is None:
+                baseline, expected = duration, found
+            elif not found.index.equals(expected.index):
+                raise SystemExit(f"Resultado divergente para '{query}' com {n_workers} threads")
+
+            speedup = baseline / duration if duration > 0 else float('inf')
+            results.append({
+                'linhas': args.rows,
+                'busca': query,
+                'threads': n_workers,
+                'encontradas': len(found),
+                'duracao_s': round(duration, 4),
+                'ganho': round(speedup, 2),
+            })
+            print(f"  {query!r:<14} {n_workers:>3} threads  {duration:>8.3f}s  ({speedup:.2f}x)")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
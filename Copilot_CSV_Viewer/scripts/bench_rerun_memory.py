@@ -0,0 +1,109 @@
+"""
+Benchmark da memória alocada a cada execução (rerun) do filtro da tabela.
+
+O Streamlit executa o app inteiro a cada interação. Este script mede, com
+tracemalloc, o pico de memória alocada pelo caminho filtro + exibição em um
+DataFrame sintético (padrão: 1 milhão de linhas), comparando:
+- antes: cópia do DataFrame (df.copy() sem busca, df[mask] com busca) e
+  depois head(linhas exibidas);
+- depois: máscara da busca e paginate_dataframe, que copia só a página exibida.
+
+Cada busca é executada uma vez antes das medições: a partir do segundo rerun
+com o mesmo texto, o app reaproveita a máscara guardada, então fica medido
+apenas o que se repete a cada rerun. O script confere que os dois caminhos
+exibem as mesmas linhas.
+
+Uso:
+    python scripts/bench_rerun_memory.py
+    python scripts/bench_rerun_memory.py --rows 100000 --page-size 1000
+    python scripts/bench_rerun_memory.py --queries "" silva --output reports/rerun.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Adicionar o diretório pai ao path para importar utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_search_mask, paginate_dataframe
+from bench_search import generate_dataframe
+
+# "" = sem busca (tabela completa)
+DEFAULT_QUERIES = ['', 'silva', 'são paulo', 'zzz']
+
+
+def rerun_before(df: pd.DataFrame, query: str, page_size: int) -> pd.DataFrame:
+    """Caminho antigo: materializa o DataFrame filtrado e depois limita as linhas."""
+    if not query:
+        filtered_df = df.copy()
+    else:
+        filtered_df = df[get_search_mask(df, query)]
+    return filtered_df.head(page_size)
+
+
+def rerun_after(df: pd.DataFrame, query: str, page_size: int) -> pd.DataFrame:
+    """Caminho atual: só a máscara e a página exibida."""
+    mask = get_search_mask(df, query) if query else None
+    return paginate_dataframe(df, mask, 1, page_size)['data']
+
+
+def measure(func, *args):
+    """Executa func e retorna (pico alocado em MB, duração em s, resultado)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, duration, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Quantidade de linhas do DataFrame")
+    parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES, help="Textos buscados (\"\" = sem busca)")
+    parser.add_argument('--page-size', type=int, default=100, help="Linhas exibidas por página")
+    parser.add_argument('--output', help="Caminho opcional de um CSV com os resultados")
+    args = parser.parse_args()
+
+    df = generate_dataframe(args.rows)
+    print(f"{args.rows:,} linhas ({df.memory_usage(deep=True).sum() / 1024 / 1024:.0f} MB), "
+          f"página de {args.page_size} linhas\n")
+
+    results = []
+    for query in args.queries:
+        if query:
+            get_search_mask(df, query)
+        before_mb, before_s, expected = measure(rerun_before, df, query, args.page_size)
+        after_mb, after_s, shown = measure(rerun_after, df, query, args.page_size)
+        if not shown.equals(expected):
+            raise SystemExit(f"Resultado divergente para '{query}'")
+
+        results.append({
+            'linhas': args.rows,
+            'busca': query,
+            'antes_mb': round(before_mb, 1),
+            'depois_mb': round(after_mb, 1),
+            'antes_s': round(before_s, 4),
+            'depois_s': round(after_s, 4),
+        })
+        print(f"  {query or '(sem busca)'!s:<14} antes {before_mb:>8.1f} MB {before_s:>7.3f}s   "
+              f"depois {after_mb:>8.1f} MB {after_s:>7.3f}s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark da busca por texto com índice de trigramas.
+
+Compara filter_dataframe_by_text por varredura (modo "contains" sem índice)
+com a mesma busca usando TrigramIndex, em DataFrames sintéticos de 100 mil,
+1 milhão e 5 milhões de linhas. Também mede o tempo de construção e a memória
+do índice, e confere que os dois caminhos retornam as mesmas linhas.
+
+Uso:
+    python scripts/bench_search.py                        # 100k, 1M e 5M linhas
+    python scripts/bench_search.py --rows 100000 --repeat 5
+    python scripts/bench_search.py --queries silva "rio de" --output reports/busca.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório pai ao path para importar utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import TrigramIndex, default_frame_states, filter_dataframe_by_text
+
+DEFAULT_QUERIES = ['silva', 'são paulo', '12345', 'horizonte', 'zzz']
+
+FIRST_NAMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gabriela', 'Heitor']
+LAST_NAMES = ['Silva', 'Costa', 'Souza', 'Lima', 'Oliveira', 'Pereira', 'Almeida']
+CITIES = ['São Paulo', 'Rio de Janeiro', 'Belo Horizonte', 'Curitiba', 'Recife', 'Salvador']
+
+
+def generate_dataframe(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Gera um DataFrame sintético com texto, identificadores, valores e datas."""
+    rng = np.random.default_rng(seed)
+    names = np.char.add(np.char.add(rng.choice(FIRST_NAMES, n_rows), ' '), rng.choice(LAST_NAMES, n_rows))
+    return pd.DataFrame({
+        'id': np.arange(n_rows),
+        'nome': names.astype(object),
+        'cidade': rng.choice(CITIES, n_rows).astype(object),
+        'valor': (rng.random(n_rows) * 1000).round(2),
+        'data': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365, n_rows), unit='D'),
+    })
+
+
+def fresh_search(df: pd.DataFrame, query: str, **kwargs) -> pd.DataFrame:
+    """Busca sem reaproveitar buscas anteriores (refinamento incremental) no DataFrame."""
+    default_frame_states.get(df).pop('search_history', None)
+    return filter_dataframe_by_text(df, query, **kwargs)
+
+
+def best_of(repeat: int, func):
+    """Executa func repeat vezes e retorna (menor duração, último resultado)."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000],
+                        help="Quantidades de linhas dos DataFrames")
+    parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES, help="Textos buscados")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetições por medição (vale a menor)")
+    parser.add_argument('--output', help="Caminho opcional de um CSV com os resultados")
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.rows:
+        df = generate_dataframe(n_rows)
+        build_time, index = best_of(1, lambda: TrigramIndex.build(df))
+        print(f"\n{n_rows:,} linhas - índice construído em {build_time:.2f}s "
+              f"({index.nbytes / 1024 / 1024:.1f} MB)")
+
+        for query in args.queries:
+            scan_time, expected = best_of(args.repeat, lambda: fresh_search(df, query))
+            index_time, found = best_of(args.repeat, lambda: fresh_search(df, query, trigram_index=index))
+            if not found.index.equals(expected.index):
+                raise SystemExit(f"Resultado divergente para '{query}' com {n_rows} linhas")
+
+            speedup = scan_time / index_time if index_time > 0 else float('inf')
+            results.append({
+                'linhas': n_rows,
+                'busca': query,
+                'encontradas': len(found),
+                'varredura_s': round(scan_time, 4),
+                'trigramas_s': round(index_time, 4),
+                'ganho': round(speedup, 1),
+                'construcao_indice_s': round(build_time, 2),
+                'memoria_indice_mb': round(index.nbytes / 1024 / 1024, 1),
+            })
+            print(f"  {query!r:<14} {len(found):>9,} linhas  varredura {scan_time:>8.3f}s  "
+                  f"trigramas {index_time:>8.4f}s  ({speedup:,.0f}x)")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark dos modos de busca literal, por expressão regular e por célula exata.
+
+Para cada texto buscado mede, em um DataFrame sintético (padrão: 1 milhão de
+linhas):
+- a busca antiga: astype(str) + str.contains(case=False) com regex em cada busca;
+- o modo "regex": expressão regular compilada uma vez, sobre o texto guardado;
+- o modo "contains": busca literal (regex=False) sobre o texto guardado;
+- o modo "exact": célula inteira localizada por hash.
+O texto em minúsculas é gerado antes das medições, como acontece a partir da
+segunda busca no app. O script confere que literal e regex retornam as
+mesmas linhas para textos sem metacaracteres.
+
+Uso:
+    python scripts/bench_search_modes.py
+    python scripts/bench_search_modes.py --rows 100000 --repeat 5
+    python scripts/bench_search_modes.py --queries silva "rio de" --output reports/modos.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório pai ao path para importar utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_search_text
+from bench_search import DEFAULT_QUERIES, best_of, fresh_search, generate_dataframe
+
+# Células inteiras buscadas no modo "exact"
+DEFAULT_EXACT = ['são paulo', 'recife', 'inexistente']
+
+
+def legacy_search(df: pd.DataFrame, query: str) -> pd.DataFrame:
+    """Busca como era feita antes dos modos: conversão e regex a cada consulta."""
+    mask = df.apply(lambda column: column.astype(str).str.contains(query, case=False, na=False)).any(axis=1)
+    return df[mask.to_numpy(dtype=bool)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Quantidade de linhas do DataFrame")
+    parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES, help="Textos buscados (sem metacaracteres)")
+    parser.add_argument('--exact', nargs='+', default=DEFAULT_EXACT, help="Células buscadas no modo exato")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetições por medição (vale a menor)")
+    parser.add_argument('--output', help="Caminho opcional de um CSV com os resultados")
+    args = parser.parse_args()
+
+    df = generate_dataframe(args.rows)
+    build_time, _ = best_of(1, lambda: [get_search_text(df, position) for position in range(df.shape[1])])
+    print(f"{args.rows:,} linhas - texto de busca gerado em {build_time:.2f}s\n")
+
+    results = []
+    for query in args.queries:
+        legacy_time, expected = best_of(1, lambda: legacy_search(df, query))
+        regex_time, regex_found = best_of(args.repeat, lambda: fresh_search(df, query, mode="regex"))
+        literal_time, literal_found = best_of(args.repeat, lambda: fresh_search(df, query))
+        if not (literal_found.index.equals(regex_found.index) and literal_found.index.equals(expected.index)):
+            raise SystemExit(f"Resultado divergente para '{query}'")
+
+        speedup = regex_time / literal_time if literal_time > 0 else float('inf')
+        results.append({
+            'busca': query,
+            'modo': 'contains',
+            'encontradas': len(literal_found),
+            'antiga_s': round(legacy_time, 4),
+            'regex_s': round(regex_time, 4),
+            'duracao_s': round(literal_time, 4),
+            'ganho_sobre_regex': round(speedup, 1),
+        })
+        print(f"  {query!r:<14} {len(literal_found):>9,} linhas  antiga {legacy_time:>7.3f}s  "
+              f"regex {regex_time:>7.3f}s  literal {literal_time:>7.3f}s  ({speedup:,.1f}x)")
+
+    for cell in args.exact:
+        exact_time, found = best_of(args.repeat, lambda: fresh_search(df, cell, mode="exact"))
+        expected = np.zeros(len(df), dtype=bool)
+        for column in df.columns:
+            expected |= (df[column].astype(str).str.lower() == cell).to_numpy()
+        if len(found) != expected.sum():
+            raise SystemExit(f"Resultado divergente para a célula '{cell}'")
+
+        results.append({
+            'busca': cell,
+            'modo': 'exact',
+            'encontradas': len(found),
+            'antiga_s': None,
+            'regex_s': None,
+            'duracao_s': round(exact_time, 4),
+            'ganho_sobre_regex': None,
+        })
+        print(f"  {cell!r:<14} {len(found):>9,} linhas  exata  {exact_time:>7.4f}s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
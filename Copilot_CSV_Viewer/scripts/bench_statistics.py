@@ -0,0 +1,136 @@
+"""
+Benchmark das estatísticas descritivas das colunas numéricas.
+
+Compara o cálculo antigo (contagem, média, soma, mínimo, máximo, mediana e
+desvio padrão chamados coluna a coluna, mais o resumo geral recalculado sobre
+todo o DataFrame) com calculate_numeric_statistics, que reduz as colunas de
+mesmo tipo juntas em blocos 2-D e deriva o resumo das estatísticas por coluna.
+O script confere que as duas tabelas e os dois resumos são idênticos e
+também mede o modo aproximado (approximate=True: mediana, P90 e P99
+estimados por amostragem), conferindo que a mediana estimada fica dentro do
+erro de rank garantido.
+
+O DataFrame sintético padrão tem 50 colunas (40 float64, 10% delas com
+valores ausentes, e 10 int64) e 5 milhões de linhas, ocupando cerca de 2 GB.
+
+Uso:
+    python scripts/bench_statistics.py
+    python scripts/bench_statistics.py --rows 1000000 --columns 20 --repeat 3
+    python scripts/bench_statistics.py --output reports/estatisticas.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório pai ao path para importar utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import DEFAULT_QUANTILE_ERROR, calculate_numeric_statistics, get_numeric_columns
+
+
+def generate_dataframe(n_rows: int, n_columns: int, seed: int = 0) -> pd.DataFrame:
+    """Gera um DataFrame numérico com 80% de colunas float64 e 20% int64."""
+    rng = np.random.default_rng(seed)
+    n_float = n_columns - n_columns // 5
+    data = {}
+    for i in range(n_float):
+        values = rng.normal(1000, 250, n_rows)
+        if i % 10 == 0:
+            values[rng.random(n_rows) < 0.1] = np.nan
+        data[f'float_{i}'] = values
+    for i in range(n_columns - n_float):
+        data[f'int_{i}'] = rng.integers(0, 1_000_000, n_rows)
+    return pd.DataFrame(data)
+
+
+def legacy_statistics(df: pd.DataFrame):
+    """Cálculo antigo: uma redução do pandas por estatística e por coluna."""
+    numeric_columns = get_numeric_columns(df)
+    stats_data = []
+    for col in numeric_columns:
+        stats_data.append({
+            'Coluna': col,
+            'Contagem': df[col].count(),
+            'Média': round(df[col].mean(), 2),
+            'Soma': round(df[col].sum(), 2),
+            'Mínimo': df[col].min(),
+            'Máximo': df[col].max(),
+            'Mediana': round(df[col].median(), 2),
+            'Desvio Padrão': round(df[col].std(), 2)
+        })
+    summary = {
+        'total_numeric_columns': len(numeric_columns),
+        'total_values': df[numeric_columns].count().sum(),
+        'total_sum': round(df[numeric_columns].sum().sum(), 2),
+        'overall_mean': round(df[numeric_columns].mean().mean(), 2)
+    }
+    return {'stats_df': pd.DataFrame(stats_data), 'summary': summary}
+
+
+def best_of(repeat: int, func):
+    """Executa func repeat vezes e retorna (menor duração, último resultado)."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[5_000_000], help="Quantidades de linhas")
+    parser.add_argument('--columns', type=int, default=50, help="Quantidade de colunas numéricas")
+    parser.add_argument('--repeat', type=int, default=1, help="Repetições por medição (vale a menor)")
+    parser.add_argument('--output', help="Caminho opcional de um CSV com os resultados")
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.rows:
+        df = generate_dataframe(n_rows, args.columns)
+        print(f"{n_rows:,} linhas × {args.columns} colunas ({df.memory_usage().sum() / 1024 / 1024:,.0f} MB)")
+
+        legacy_time, expected = best_of(args.repeat, lambda: legacy_statistics(df))
+        block_time, result = best_of(args.repeat, lambda: calculate_numeric_statistics(df))
+        pd.testing.assert_frame_equal(result['stats_df'], expected['stats_df'])
+        if result['summary'] != expected['summary']:
+            raise SystemExit(f"Resumo divergente com {n_rows} linhas")
+
+        approximate_time, approximate = best_of(
+            args.repeat, lambda: calculate_numeric_statistics(df, approximate=True))
+        for column, median in zip(approximate['stats_df']['Coluna'], approximate['stats_df']['Mediana ≈']):
+            values = df[column].dropna().to_numpy()
+            # Tolerância extra do arredondamento da tabela (2 casas)
+            low, high = (values < median - 0.005).mean(), (values <= median + 0.005).mean()
+            if low > 0.5 + DEFAULT_QUANTILE_ERROR or high < 0.5 - DEFAULT_QUANTILE_ERROR:
+                raise SystemExit(f"Mediana aproximada fora do erro garantido em {column}")
+
+        speedup = legacy_time / block_time if block_time > 0 else float('inf')
+        results.append({
+            'linhas': n_rows,
+            'colunas': args.columns,
+            'coluna_a_coluna_s': round(legacy_time, 3),
+            'blocos_s': round(block_time, 3),
+            'ganho': round(speedup, 2),
+            'aproximado_s': round(approximate_time, 3),
+        })
+        print(f"  coluna a coluna {legacy_time:>8.2f}s   blocos {block_time:>8.2f}s   ({speedup:.1f}x)   "
+              f"aproximado {approximate_time:>8.2f}s\n")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"Resultados salvos em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Inspeção e limpeza do cache colunar em disco do CSV Viewer.
+
+Os arquivos CSV já processados ficam gravados em formato Feather no diretório
+do cache (padrão: ~/.cache/csv_viewer, ou a variável CSV_VIEWER_CACHE_DIR).
+
+Uso:
+    python scripts/cache.py info                  # lista os arquivos em cache
+    python scripts/cache.py purge                 # remove todo o cache
+    python scripts/cache.py purge --key <CHAVE>   # remove uma entrada
+    python scripts/cache.py evict --max-mb 512    # aplica um novo orçamento
+"""
+
+import argparse
+import os
+import sys
+
+# Adicionar o diretório pai ao path para importar utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import ColumnarDiskCache, DEFAULT_DISK_CACHE_DIR, DEFAULT_DISK_CACHE_MB
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cache-dir', default=DEFAULT_DISK_CACHE_DIR, help="Diretório do cache")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('info', help="Lista os arquivos em cache")
+
+    purge_parser = subparsers.add_parser('purge', help="Remove arquivos do cache")
+    purge_parser.add_argument('--key', help="Chave a remover (padrão: todas)")
+
+    evict_parser = subparsers.add_parser('evict', help="Remove os arquivos menos usados até caber no orçamento")
+    evict_parser.add_argument('--max-mb', type=float, default=DEFAULT_DISK_CACHE_MB, help="Orçamento em MB")
+
+    args = parser.parse_args()
+    cache = ColumnarDiskCache(args.cache_dir)
+
+    if args.command == 'info':
+        info = cache.info()
+        print(f"Diretório: {info['cache_dir']}")
+        print(f"Ocupado: {info['total_mb']} MB de {info['max_mb']} MB ({len(info['entries'])} arquivos)")
+        if not info['entries'].empty:
+            print()
+            print(info['entries'].to_string(index=False))
+    elif args.command == 'purge':
+        removed = cache.purge(args.key)
+        print(f"{removed} arquivo(s) removido(s) de {cache.cache_dir}")
+    else:
+        cache.max_bytes = int(args.max_mb * 1024 * 1024)
+        removed = cache.evict()
+        print(f"{removed} arquivo(s) removido(s) de {cache.cache_dir}")
+
+
+if __name__ == '__main__':
+    main()
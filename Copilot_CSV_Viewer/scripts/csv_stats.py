@@ -0,0 +1,58 @@
+"""
+Estatísticas das colunas numéricas de um CSV lido em blocos.
+
+Usa iter_csv_chunks e calculate_streaming_statistics, então só um bloco do
+arquivo fica em memória por vez: serve para arquivos maiores que a RAM. A
+mediana é estimada por um sketch de quantis (exata em colunas com até
+--sketch-k valores; acima disso, erro de rank perto de 1/--sketch-k).
+
+Uso:
+    python scripts/csv_stats.py dados.csv
+    python scripts/csv_stats.py dados.csv --memory-mb 64 --sketch-k 400
+    python scripts/csv_stats.py dados.csv --approximate      # inclui P90 e P99
+    python scripts/csv_stats.py dados.csv --output reports/estatisticas.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Adicionar o diretório pai ao path para importar utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import DEFAULT_MEMORY_BUDGET_MB, DEFAULT_SKETCH_K, calculate_streaming_statistics, iter_csv_chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help="Arquivo CSV")
+    parser.add_argument('--memory-mb', type=float, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help="Orçamento de memória (MB) de cada bloco")
+    parser.add_argument('--sketch-k', type=int, default=DEFAULT_SKETCH_K, help="Parâmetro k do sketch da mediana")
+    parser.add_argument('--approximate', action='store_true', help="Inclui P90 e P99 (colunas marcadas com ≈)")
+    parser.add_argument('--output', help="Caminho opcional de um CSV com a tabela de estatísticas")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.path, 'rb') as f:
+        result = calculate_streaming_statistics(iter_csv_chunks(f, args.memory_mb), args.sketch_k,
+                                                approximate=args.approximate)
+    duration = time.perf_counter() - start
+
+    if result['stats_df'].empty:
+        raise SystemExit("Nenhuma coluna numérica encontrada")
+
+    print(result['stats_df'].to_string(index=False))
+    summary = result['summary']
+    print(f"\n{summary['total_numeric_columns']} colunas numéricas, {summary['total_values']:,} valores, "
+          f"soma {summary['total_sum']:,}, média geral {summary['overall_mean']:,} ({duration:.2f}s)")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        result['stats_df'].to_csv(args.output, index=False)
+        print(f"Estatísticas salvas em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,7 +10,11 @@ import pytest
 import pandas as pd
 import numpy as np
 import io
+import re
+import gc
+import warnings
 from datetime import datetime, date
+from unittest.mock import patch
 import sys
 import os
 
@@ -19,12 +23,43 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils import (
     load_csv_data,
+    iter_csv_chunks,
+    concat_csv_chunks,
+    sniff_csv_schema,
+    schema_read_options,
+    get_schema_details,
+    resolve_parse_options,
+    compute_content_hash,
+    ParseCache,
+    ColumnarDiskCache,
+    load_csv_data_cached,
+    compact_dataframe,
     filter_dataframe_by_text,
+    get_search_mask,
+    SearchIndex,
+    TrigramIndex,
+    FrameStateRegistry,
+    default_frame_states,
+    get_search_text,
+    get_search_text_memory,
+    drop_search_text,
+    compile_search_pattern,
+    search_dataframe,
+    paginate_dataframe,
+    find_row_page,
+    DatasetProfile,
+    get_dataset_profile,
     get_numeric_columns,
     calculate_numeric_statistics,
+    quantile_sample_size,
+    QuantileSketch,
+    RunningStatistics,
+    calculate_streaming_statistics,
     get_dataset_info,
     get_column_details,
     prepare_chart_data,
+    downsample_chart_data,
+    choose_time_bucket,
     validate_chart_requirements
 )
 
@@ -81,6 +116,462 @@ class TestLoadCSVData:
         assert df.iloc[0]['name'] == 'John'
         assert df.iloc[0]['age'] == 25
 
+    
+    def test_load_csv_buffer_inputs(self):
+        """Teste com bytearray e memoryview (lidos sem cópia do buffer)."""
+        csv_data = b"name,age\nJohn,25\nJane,30"
+        
+        for buffer in (bytearray(csv_data), memoryview(csv_data)):
+            df = load_csv_data(buffer)
+            assert list(df['name']) == ['John', 'Jane']
+    
+    def test_load_csv_bytesio_releases_buffer(self):
+        """Teste que o buffer do upload é liberado e a posição preservada."""
+        upload = io.BytesIO(b"name,age\nJohn,25\nJane,30")
+        df = load_csv_data(upload)
+        
+        assert len(df) == 2
+        assert upload.tell() == 0
+        # Sem exportação pendente o BytesIO pode voltar a ser modificado
+        upload.write(b"x")
+
+
+class TestIterCSVChunks:
+    """Testes para leitura de CSV em blocos (modo streaming)."""
+    
+    @pytest.fixture
+    def large_csv(self):
+        """CSV com linhas suficientes para gerar vários blocos."""
+        lines = ["id,name,value"]
+        lines += [f"{i},item_{i},{i * 1.5}" for i in range(5000)]
+        return "\n".join(lines)
+    
+    def test_iter_chunks_fixed_size(self):
+        """Teste com tamanho de bloco fixo."""
+        csv_data = "name,age\nA,1\nB,2\nC,3\nD,4\nE,5"
+        chunks = list(iter_csv_chunks(csv_data, chunk_rows=2))
+        
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert list(chunks[0].columns) == ['name', 'age']
+    
+    def test_iter_chunks_respects_memory_budget(self, large_csv):
+        """Teste que um orçamento pequeno gera vários blocos."""
+        chunks = list(iter_csv_chunks(large_csv, memory_budget_mb=0.01))
+        
+        assert len(chunks) > 2
+        assert sum(len(chunk) for chunk in chunks) == 5000
+    
+    def test_concat_chunks_matches_full_load(self, large_csv):
+        """Teste que os blocos concatenados equivalem à leitura completa."""
+        streamed = concat_csv_chunks(list(iter_csv_chunks(large_csv, memory_budget_mb=0.01)))
+        
+        pd.testing.assert_frame_equal(streamed, load_csv_data(large_csv))
+    
+    def test_concat_chunks_releases_chunks(self):
+        """Teste que a junção esvazia a lista e reproduz pd.concat com tipos diferentes entre blocos."""
+        chunks = [
+            pd.DataFrame({'i': [1, 2], 'f': [0.5, 1.5], 's': ['a', 'b'], 'm': [1, 2],
+                          'n': pd.array([1, None], dtype='Int64')}),
+            pd.DataFrame({'i': [3, 4], 'f': [2.5, np.nan], 's': ['c', None], 'm': ['x', 'y'],
+                          'n': pd.array([3, 4], dtype='Int64')}, index=[2, 3]),
+            pd.DataFrame({'i': [5.5, 6.0], 'f': [3.5, 4.5], 's': ['e', 'f'], 'm': [3, 4],
+                          'n': pd.array([None, 6], dtype='Int64')}, index=[4, 5]),
+        ]
+        expected = pd.concat(chunks, ignore_index=True)
+        
+        df = concat_csv_chunks(chunks)
+        
+        assert chunks == []
+        pd.testing.assert_frame_equal(df, expected)
+    
+    def test_load_csv_with_memory_budget(self, large_csv):
+        """Teste de load_csv_data no modo streaming."""
+        df = load_csv_data(large_csv.encode('utf-8'), memory_budget_mb=0.01)
+        
+        assert len(df) == 5000
+        assert df.index.is_monotonic_increasing
+        assert df.iloc[-1]['name'] == 'item_4999'
+    
+    def test_iter_chunks_header_only(self):
+        """Teste com CSV contendo apenas cabeçalho."""
+        chunks = list(iter_csv_chunks("name,age\n"))
+        df = concat_csv_chunks(chunks)
+        
+        assert len(df) == 0
+        assert list(df.columns) == ['name', 'age']
+    
+    def test_iter_chunks_empty_file(self):
+        """Teste com arquivo vazio."""
+        with pytest.raises(Exception, match="Erro ao carregar CSV"):
+            list(iter_csv_chunks(io.StringIO("")))
+
+
+class TestSniffCSVSchema:
+    """Testes para a detecção de esquema por amostragem."""
+    
+    @pytest.fixture
+    def large_bytes(self):
+        """CSV com ~20 mil linhas, maior que a amostra inicial."""
+        lines = ["id,price,region,date"]
+        lines += [f"{i},{i * 0.5},R{i % 3},2023-01-{(i % 28) + 1:02d}" for i in range(20000)]
+        return ("\n".join(lines) + "\n").encode('utf-8')
+    
+    def test_sniff_basic(self):
+        """Teste de tipos, datas e cabeçalho em um CSV simples."""
+        csv_data = "name,age,salary,hired\nJohn,25,50000.5,2023-01-15\nJane,30,,2023-02-20"
+        
+        schema = sniff_csv_schema(csv_data)
+        
+        assert schema['delimiter'] == ','
+        assert schema['encoding'] is None
+        assert schema['columns'] == ['name', 'age', 'salary', 'hired']
+        assert schema['dtypes'] == {'name': 'object', 'age': 'int64', 'salary': 'float64', 'hired': 'object'}
+        assert schema['date_columns'] == {'hired': '%Y-%m-%d'}
+        assert list(get_schema_details(schema)['Data Provável']) == ['', '', '', '%Y-%m-%d']
+    
+    def test_sniff_delimiter_and_encoding(self):
+        """Teste com ponto e vírgula e arquivo em latin-1."""
+        csv_bytes = "nome;cidade;valor\nJoão;São Paulo;10\nMaria;Brasília;20\n".encode('latin-1')
+        
+        schema = sniff_csv_schema(csv_bytes)
+        df = load_csv_data(csv_bytes, schema=schema)
+        
+        assert schema['delimiter'] == ';'
+        assert schema['encoding'] == 'latin-1'
+        assert list(df.columns) == ['nome', 'cidade', 'valor']
+        assert df['cidade'].tolist() == ['São Paulo', 'Brasília']
+    
+    def test_sniff_reads_only_samples(self, large_bytes):
+        """Teste que apenas uma amostra é lida e a posição do arquivo é preservada."""
+        upload = io.BytesIO(large_bytes)
+        
+        schema = sniff_csv_schema(upload, sample_kb=4, n_samples=2)
+        
+        assert upload.tell() == 0
+        assert 0 < schema['sampled_rows'] < 20000
+        assert schema['dtypes'] == {'id': 'int64', 'price': 'float64', 'region': 'object', 'date': 'object'}
+        assert 'date' in schema['date_columns']
+    
+    def test_load_with_schema_matches_inference(self, large_bytes):
+        """Teste que os tipos detectados produzem o mesmo DataFrame."""
+        schema = sniff_csv_schema(large_bytes)
+        
+        assert 'dtype' in schema_read_options(schema)
+        expected = load_csv_data(large_bytes)
+        pd.testing.assert_frame_equal(load_csv_data(io.BytesIO(large_bytes), schema=schema), expected)
+        pd.testing.assert_frame_equal(
+            concat_csv_chunks(list(iter_csv_chunks(large_bytes, chunk_rows=3000, schema=schema))), expected
+        )
+    
+    def test_schema_fallback_when_sample_types_fail(self):
+        """Teste que tipos inválidos para o restante do arquivo não quebram a leitura."""
+        csv_data = "a,b\n" + "1,x\n" * 3000 + ",y\n2.5,z\n"
+        schema = sniff_csv_schema(csv_data, sample_kb=1, n_samples=0)
+        assert schema['dtypes']['a'] == 'int64'
+        
+        expected = load_csv_data(csv_data)
+        pd.testing.assert_frame_equal(load_csv_data(csv_data, schema=schema), expected)
+        
+        chunks = list(iter_csv_chunks(csv_data, chunk_rows=1000, schema=schema))
+        assert [chunk.index[0] for chunk in chunks] == [0, 1000, 2000, 3000]
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+    
+    def test_malformed_file_is_read_once(self):
+        """Teste que um CSV malformado não é lido de novo sem os tipos da amostra."""
+        csv_data = "a,b\n" + "1,x\n" * 2500 + "3,y,extra,field\n" + "4,z\n" * 10
+        schema = sniff_csv_schema(csv_data, sample_kb=1, n_samples=0)
+        assert 'dtype' in schema_read_options(schema)
+        
+        with patch('utils.pd.read_csv', wraps=pd.read_csv) as read_csv:
+            with pytest.raises(Exception, match="Error tokenizing data"):
+                load_csv_data(csv_data, schema=schema)
+            assert read_csv.call_count == 1
+            with pytest.raises(Exception, match="Error tokenizing data"):
+                list(iter_csv_chunks(csv_data, chunk_rows=1000, schema=schema))
+            assert read_csv.call_count == 2
+    
+    def test_sniff_empty_file(self):
+        """Teste com arquivo vazio."""
+        schema = sniff_csv_schema("")
+        
+        assert schema['columns'] == []
+        assert schema_read_options(schema) == {}
+
+
+class TestParseEngines:
+    """Testes para o motor pyarrow e tipos Arrow, com fallback."""
+    
+    CSV_DATA = """name,city,age,salary
+John Doe,New York,25,50000.5
+Jane Smith,,30,
+Bob Johnson,Chicago,,70000.0
+Alice Brown,Houston,28,65000.25"""
+    
+    @pytest.fixture
+    def numpy_df(self):
+        """DataFrame carregado com o parser padrão."""
+        return load_csv_data(self.CSV_DATA)
+    
+    @pytest.fixture
+    def arrow_df(self):
+        """DataFrame carregado com motor e tipos pyarrow."""
+        pytest.importorskip("pyarrow")
+        return load_csv_data(self.CSV_DATA, engine="pyarrow", dtype_backend="pyarrow")
+    
+    def test_resolve_options_fallback_without_pyarrow(self):
+        """Teste de fallback quando pyarrow não está instalado."""
+        with patch('utils.is_pyarrow_available', return_value=False):
+            options = resolve_parse_options("pyarrow", "pyarrow")
+        
+        assert options == {'engine': 'c'}
+    
+    def test_resolve_options_invalid_engine(self):
+        """Teste com motor inválido."""
+        with pytest.raises(ValueError):
+            resolve_parse_options("python-fast")
+    
+    def test_load_with_fallback(self, numpy_df):
+        """Teste de carregamento pedindo pyarrow sem a biblioteca instalada."""
+        with patch('utils.is_pyarrow_available', return_value=False):
+            df = load_csv_data(self.CSV_DATA, engine="pyarrow", dtype_backend="pyarrow")
+        
+        pd.testing.assert_frame_equal(df, numpy_df)
+    
+    def test_arrow_backed_dtypes(self, arrow_df):
+        """Teste que as colunas são carregadas com tipos Arrow."""
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in arrow_df.dtypes)
+        assert list(get_numeric_columns(arrow_df)) == ['age', 'salary']
+    
+    def test_arrow_filter_same_results(self, numpy_df, arrow_df):
+        """Teste que a busca retorna as mesmas linhas nos dois backends."""
+        for term in ['john', 'nan', '.5', 'houston']:
+            expected = filter_dataframe_by_text(numpy_df, term).index.tolist()
+            assert filter_dataframe_by_text(arrow_df, term).index.tolist() == expected
+    
+    def test_arrow_statistics_same_results(self, numpy_df, arrow_df):
+        """Teste que as estatísticas são iguais nos dois backends."""
+        expected = calculate_numeric_statistics(numpy_df)
+        result = calculate_numeric_statistics(arrow_df)
+        
+        pd.testing.assert_frame_equal(result['stats_df'], expected['stats_df'], check_dtype=False)
+        assert result['summary'] == expected['summary']
+    
+    def test_arrow_dataset_info_same_results(self, numpy_df, arrow_df):
+        """Teste que o resumo do dataset é igual nos dois backends."""
+        expected = get_dataset_info(numpy_df)['basic_info']
+        result = get_dataset_info(arrow_df)['basic_info']
+        
+        assert result['dimensions'] == expected['dimensions']
+        assert result['unique_values_total'] == expected['unique_values_total']
+        assert result['null_values_total'] == expected['null_values_total']
+
+
+class TestParseCache:
+    """Testes para o cache de parsing por hash de conteúdo."""
+    
+    CSV_DATA = "name,age\nJohn,25\nJane,30"
+    
+    def test_content_hash_same_for_str_and_bytes(self):
+        """Teste que str, bytes e BytesIO do mesmo conteúdo têm o mesmo hash."""
+        expected = compute_content_hash(self.CSV_DATA)
+        
+        assert compute_content_hash(self.CSV_DATA.encode('utf-8')) == expected
+        assert compute_content_hash(io.BytesIO(self.CSV_DATA.encode('utf-8'))) == expected
+        assert compute_content_hash("name,age\nJohn,26") != expected
+    
+    def test_cached_load_hit_and_miss(self):
+        """Teste de falha na primeira carga e acerto na segunda."""
+        cache = ParseCache()
+        
+        df1, hit1 = load_csv_data_cached(self.CSV_DATA, cache=cache)
+        df2, hit2 = load_csv_data_cached(self.CSV_DATA.encode('utf-8'), cache=cache)
+        
+        assert (hit1, hit2) == (False, True)
+        assert df2 is df1
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_cache_key_depends_on_options(self):
+        """Teste que opções de parsing diferentes geram chaves diferentes."""
+        cache = ParseCache()
+        
+        key_c = cache.make_key(self.CSV_DATA, engine="c")
+        key_arrow = cache.make_key(self.CSV_DATA, engine="pyarrow")
+        
+        assert key_c != key_arrow
+        assert key_c.split('-')[0] == key_arrow.split('-')[0]
+    
+    def test_cache_lru_byte_budget(self):
+        """Teste de descarte LRU ao exceder o orçamento de bytes."""
+        df = load_csv_data(self.CSV_DATA)
+        nbytes = int(df.memory_usage(deep=True).sum())
+        cache = ParseCache(max_bytes=nbytes * 2)
+        
+        cache.put('a', df)
+        cache.put('b', df)
+        cache.get('a')  # 'a' passa a ser o mais recente
+        cache.put('c', df)
+        
+        assert cache.get('b') is None
+        assert cache.get('a') is df
+        assert cache.get('c') is df
+        assert cache.total_bytes <= cache.max_bytes
+    
+    def test_uploaded_file_digest_memoized(self):
+        """Teste que o hash de um upload é memorizado pelo file_id."""
+        upload = io.BytesIO(self.CSV_DATA.encode('utf-8'))
+        upload.file_id = 'abc123'
+        upload.size = len(self.CSV_DATA)
+        cache = ParseCache()
+        
+        with patch('utils.compute_content_hash', wraps=compute_content_hash) as hash_mock:
+            first = cache.make_key(upload)
+            second = cache.make_key(upload)
+        
+        assert first == second
+        assert hash_mock.call_count == 1
+
+
+class TestColumnarDiskCache:
+    """Testes para o cache colunar (Feather) em disco."""
+    
+    CSV_DATA = "name,age,salary\nJohn,25,50000.5\nJane,,60000.0\n,35,"
+    
+    @pytest.fixture
+    def disk_cache(self, tmp_path):
+        """Cache em disco em um diretório temporário."""
+        pytest.importorskip("pyarrow")
+        return ColumnarDiskCache(str(tmp_path / "cache"))
+    
+    def test_disk_cache_roundtrip(self, disk_cache):
+        """Teste que o DataFrame relido do disco é idêntico ao original."""
+        df = load_csv_data(self.CSV_DATA)
+        
+        assert disk_cache.put('abc', df)
+        restored = disk_cache.get('abc')
+        
+        pd.testing.assert_frame_equal(restored, df)
+        assert filter_dataframe_by_text(restored, 'nan').index.tolist() == \
+            filter_dataframe_by_text(df, 'nan').index.tolist()
+    
+    def test_disk_cache_roundtrip_arrow_dtypes(self, disk_cache):
+        """Teste que tipos Arrow são preservados."""
+        df = load_csv_data(self.CSV_DATA, dtype_backend="pyarrow")
+        
+        disk_cache.put('arrow', df)
+        
+        pd.testing.assert_frame_equal(disk_cache.get('arrow'), df)
+    
+    def test_disk_cache_miss(self, disk_cache):
+        """Teste com chave inexistente."""
+        assert disk_cache.get('inexistente') is None
+    
+    def test_disk_cache_used_after_memory_miss(self, disk_cache):
+        """Teste que uma nova sessão reaproveita o arquivo gravado em disco."""
+        df, hit = load_csv_data_cached(self.CSV_DATA, cache=ParseCache(), disk_cache=disk_cache)
+        assert not hit
+        
+        restored, hit = load_csv_data_cached(self.CSV_DATA, cache=ParseCache(), disk_cache=disk_cache)
+        assert hit
+        pd.testing.assert_frame_equal(restored, df)
+    
+    def test_disk_cache_eviction_and_purge(self, disk_cache):
+        """Teste de descarte por tamanho, inspeção e limpeza do cache."""
+        df = load_csv_data(self.CSV_DATA)
+        disk_cache.put('a', df)
+        file_size = os.path.getsize(os.path.join(disk_cache.cache_dir, 'a.feather'))
+        os.utime(os.path.join(disk_cache.cache_dir, 'a.feather'), (0, 0))
+        
+        disk_cache.max_bytes = file_size
+        disk_cache.put('b', df)
+        
+        info = disk_cache.info()
+        assert list(info['entries']['Chave']) == ['b']
+        assert disk_cache.purge() == 1
+        assert disk_cache.info()['entries'].empty
+    
+    def test_disk_cache_skips_unsupported_frames(self, disk_cache):
+        """Teste que colunas com tipos misturados não são gravadas."""
+        df = pd.DataFrame({'mixed': ['a', 1, 2.5]})
+        
+        assert disk_cache.put('mixed', df) is False
+        assert disk_cache.get('mixed') is None
+
+
+class TestCompactDataframe:
+    """Testes para o modo compacto (redução de tipos)."""
+    
+    @pytest.fixture
+    def wide_df(self):
+        """DataFrame com tipos largos típicos de um CSV."""
+        return pd.DataFrame({
+            'id': np.arange(1000, dtype='int64'),
+            'delta': np.tile([-5, 0, 5, 10], 250).astype('int64'),
+            'price': np.tile([1.25, 2.5, 3.75, 100.0], 250),
+            'ratio': np.tile([0.1, 0.2, 0.3, 0.7], 250),
+            'region': np.tile(['Norte', 'Sul', 'Leste', 'Oeste'], 250),
+            'code': [f"C{i}" for i in range(1000)]
+        })
+    
+    def test_compact_reduces_types(self, wide_df):
+        """Teste das conversões de cada tipo de coluna."""
+        result = compact_dataframe(wide_df, category_ratio=0.5)
+        compacted = result['dataframe']
+        
+        assert compacted['id'].dtype == np.uint16
+        assert compacted['delta'].dtype == np.int8
+        assert compacted['price'].dtype == np.float32
+        assert compacted['ratio'].dtype == np.float64  # float32 perderia precisão
+        assert isinstance(compacted['region'].dtype, pd.CategoricalDtype)
+        assert compacted['code'].dtype == object  # alta cardinalidade
+        assert set(result['converted']) == {'id', 'delta', 'price', 'region'}
+        assert result['memory_after_kb'] < result['memory_before_kb']
+    
+    def test_compact_preserves_values(self, wide_df):
+        """Teste que os valores não mudam após a compactação."""
+        compacted = compact_dataframe(wide_df)['dataframe']
+        
+        pd.testing.assert_frame_equal(compacted, wide_df, check_dtype=False, check_categorical=False)
+        assert filter_dataframe_by_text(compacted, 'sul').index.tolist() == \
+            filter_dataframe_by_text(wide_df, 'sul').index.tolist()
+    
+    def test_compact_columns_still_numeric(self, wide_df):
+        """Teste que colunas reduzidas continuam nas estatísticas numéricas."""
+        compacted = compact_dataframe(wide_df)['dataframe']
+        
+        assert list(get_numeric_columns(compacted)) == ['id', 'delta', 'price', 'ratio']
+        
+        original = calculate_numeric_statistics(wide_df)
+        reduced = calculate_numeric_statistics(compacted)
+        pd.testing.assert_frame_equal(reduced['stats_df'], original['stats_df'], check_dtype=False)
+        assert reduced['summary'] == original['summary']
+    
+    def test_compact_category_ratio(self, wide_df):
+        """Teste que a razão de cardinalidade controla a conversão para 'category'."""
+        compacted = compact_dataframe(wide_df, category_ratio=0.0)['dataframe']
+        
+        assert compacted['region'].dtype == object
+    
+    def test_load_csv_compact(self):
+        """Teste do modo compacto na carga do CSV."""
+        csv_data = "name,age,salary\nJohn,25,50000.5\nJane,30,60000.0\nJohn,35,"
+        
+        df = load_csv_data(csv_data, compact=True, category_ratio=0.7)
+        
+        assert df['age'].dtype == np.uint8
+        assert df['salary'].dtype == np.float32
+        assert isinstance(df['name'].dtype, pd.CategoricalDtype)
+        assert pd.isna(df['salary'].iloc[2])
+    
+    def test_compact_skips_arrow_dtypes(self):
+        """Teste que colunas com tipos Arrow não são convertidas."""
+        pytest.importorskip("pyarrow")
+        df = load_csv_data("a,b\n1,x\n2,x", dtype_backend="pyarrow")
+        
+        result = compact_dataframe(df)
+        
+        assert result['converted'] == {}
+        pd.testing.assert_frame_equal(result['dataframe'], df)
+
 
 class TestFilterDataframeByText:
     """Testes para filtragem de DataFrame por texto."""
@@ -144,6 +635,528 @@ class TestFilterDataframeByText:
         
         assert len(result) == 1  # Los Angeles
         assert result.iloc[0]['city'] == 'Los Angeles'
+    
+    def test_filter_by_text_without_copies(self, sample_df):
+        """Teste de que a busca vazia não copia e max_rows limita as linhas copiadas."""
+        assert filter_dataframe_by_text(sample_df, '') is sample_df
+        assert len(filter_dataframe_by_text(sample_df, '', max_rows=2)) == 2
+        
+        result = filter_dataframe_by_text(sample_df, 'o', max_rows=2)
+        assert result.index.tolist() == [0, 1]
+        pd.testing.assert_frame_equal(result, filter_dataframe_by_text(sample_df, 'o').head(2))
+
+
+class TestSearchModes:
+    """Testes para os modos de busca literal, por expressão regular e por célula exata."""
+    
+    @pytest.fixture
+    def symbols_df(self):
+        """DataFrame com textos contendo metacaracteres de expressão regular."""
+        default_frame_states.clear()
+        return pd.DataFrame({
+            'code': ['a.b', 'axb', 'f(x)', 'A.B'],
+            'city': ['São Paulo', 'São Paulo Norte', 'são paulo', 'Santos'],
+            'value': [1.5, 10.0, 2.0, 1.0]
+        })
+    
+    def test_contains_is_literal(self, symbols_df):
+        """Teste que "." e "(" são buscados literalmente no modo padrão."""
+        assert filter_dataframe_by_text(symbols_df, 'a.b').index.tolist() == [0, 3]
+        assert filter_dataframe_by_text(symbols_df, 'f(').index.tolist() == [2]
+        assert filter_dataframe_by_text(symbols_df, '1.5').index.tolist() == [0]
+    
+    def test_regex_mode(self, symbols_df):
+        """Teste que o modo regex interpreta a expressão regular."""
+        assert filter_dataframe_by_text(symbols_df, 'a.b', mode="regex").index.tolist() == [0, 1, 3]
+        assert filter_dataframe_by_text(symbols_df, r'paulo$', mode="regex").index.tolist() == [0, 2]
+    
+    def test_regex_compiled_once(self, symbols_df):
+        """Teste que a expressão regular é compilada uma única vez."""
+        compile_search_pattern.cache_clear()
+        filter_dataframe_by_text(symbols_df, 'san.os', mode="regex")
+        filter_dataframe_by_text(symbols_df, 'san.os', mode="regex")
+        
+        info = compile_search_pattern.cache_info()
+        assert info.misses == 1
+        assert info.hits >= 1
+    
+    def test_invalid_regex_raises(self, symbols_df):
+        """Teste que uma expressão regular inválida gera ValueError."""
+        with pytest.raises(ValueError, match="Expressão regular inválida"):
+            filter_dataframe_by_text(symbols_df, 'f(', mode="regex")
+    
+    def test_exact_mode(self, symbols_df):
+        """Teste que o modo exato compara a célula inteira, sem diferenciar maiúsculas."""
+        assert filter_dataframe_by_text(symbols_df, 'são paulo', mode="exact").index.tolist() == [0, 2]
+        assert filter_dataframe_by_text(symbols_df, 'SANTOS', mode="exact").index.tolist() == [3]
+        assert filter_dataframe_by_text(symbols_df, '10.0', mode="exact").index.tolist() == [1]
+        assert filter_dataframe_by_text(symbols_df, 'paulo', mode="exact").empty
+    
+    def test_exact_lookup_counted_in_memory(self, symbols_df):
+        """Teste que o índice de células exatas entra no relatório de memória."""
+        filter_dataframe_by_text(symbols_df, 'axb')
+        before = get_search_text_memory(symbols_df)['bytes']
+        filter_dataframe_by_text(symbols_df, 'axb', mode="exact")
+        
+        after = get_search_text_memory(symbols_df)['bytes']
+        assert after > before
+        assert drop_search_text(symbols_df) == after
+
+
+class TestSearchDataframe:
+    """Testes para a busca restrita a colunas e as ocorrências por coluna."""
+    
+    @pytest.fixture
+    def people_df(self):
+        """DataFrame com o mesmo texto em colunas diferentes."""
+        default_frame_states.clear()
+        return pd.DataFrame({
+            'name': ['Paulo Silva', 'Ana Souza', 'Rita Paulo', 'Caio Lima'],
+            'city': ['São Paulo', 'Recife', 'Santos', 'São Paulo'],
+            'code': [101, 202, 303, 1010]
+        })
+    
+    def test_column_hits_per_mode(self, people_df):
+        """Teste das ocorrências por coluna em cada modo de busca."""
+        contains = search_dataframe(people_df, 'paulo')
+        assert contains['mask'].tolist() == [True, False, True, True]
+        assert contains['column_hits'] == {'name': 2, 'city': 2, 'code': 0}
+        
+        assert search_dataframe(people_df, '10', mode="regex")['column_hits'] == {'name': 0, 'city': 0, 'code': 2}
+        assert search_dataframe(people_df, 'são paulo', mode="exact")['column_hits'] == {'name': 0, 'city': 2, 'code': 0}
+        assert search_dataframe(people_df, 'paulo lima', mode="token")['column_hits'] == {'name': 1, 'city': 1, 'code': 0}
+    
+    def test_index_counts_match_scan(self, people_df):
+        """Teste que as ocorrências com SearchIndex e TrigramIndex são as da varredura."""
+        for mode, search_text, index in [("token", "paulo", SearchIndex.build(people_df)),
+                                         ("prefix", "pau", SearchIndex.build(people_df))]:
+            expected = search_dataframe(people_df, search_text, mode=mode)
+            result = search_dataframe(people_df, search_text, mode=mode, index=index)
+            assert result['mask'].tolist() == expected['mask'].tolist()
+            assert result['column_hits'] == expected['column_hits']
+        
+        trigram_index = TrigramIndex.build(people_df)
+        expected = search_dataframe(people_df, 'paulo', columns=['city'])
+        default_frame_states.clear()
+        result = search_dataframe(people_df, 'paulo', columns=['city'], trigram_index=trigram_index)
+        assert result['mask'].tolist() == expected['mask'].tolist() == [True, False, False, True]
+        assert result['column_hits'] == expected['column_hits'] == {'city': 2}
+    
+    def test_scoped_search_converts_only_selected_columns(self, people_df):
+        """Teste que a busca restrita converte e varre apenas as colunas escolhidas."""
+        import utils
+        with patch.object(utils, '_lower_search_text', wraps=utils._lower_search_text) as lower:
+            result = filter_dataframe_by_text(people_df, 'paulo', columns=['name'])
+        
+        assert lower.call_count == 1
+        assert result.index.tolist() == [0, 2]
+        assert search_dataframe(people_df, 'paulo', columns=[])['mask'].sum() == 0
+    
+    def test_scoped_history_not_reused_for_wider_search(self, people_df):
+        """Teste que uma busca restrita não é refinada para uma busca em mais colunas."""
+        search_dataframe(people_df, 'pa', columns=['name'])
+        result = search_dataframe(people_df, 'paulo')
+        
+        assert result['mask'].tolist() == [True, False, True, True]
+        assert search_dataframe(people_df, 'paulo', columns=['city'])['column_hits'] == {'city': 2}
+    
+    def test_unknown_column_raises(self, people_df):
+        """Teste que colunas inexistentes geram ValueError."""
+        with pytest.raises(ValueError, match="Colunas não encontradas"):
+            search_dataframe(people_df, 'paulo', columns=['missing'])
+    
+    def test_empty_search(self, people_df):
+        """Teste que uma busca vazia seleciona tudo, sem ocorrências."""
+        result = search_dataframe(people_df, '', columns=['city'])
+        
+        assert result['mask'].all()
+        assert result['columns'] == ['city']
+        assert result['column_hits'] == {}
+
+
+class TestSearchIndex:
+    """Testes para o índice invertido de busca por palavras."""
+    
+    @pytest.fixture
+    def cities_df(self):
+        """DataFrame com palavras repetidas, nulos e números."""
+        return pd.DataFrame({
+            'city': ['São Paulo', 'Rio de Janeiro', 'sao paulo', None, 'Paulo_Afonso'],
+            'state': ['SP', 'RJ', 'SP', 'MG', 'BA'],
+            'population': [12300000, 6700000, 12300000, 2500000, 118000]
+        })
+    
+    def test_build_index(self, cities_df):
+        """Teste da estrutura do índice."""
+        index = SearchIndex.build(cities_df)
+        
+        assert list(index.tokens) == sorted(index.tokens)
+        assert len(index.offsets) == len(index.tokens) + 1
+        assert sorted(index.lookup('paulo').tolist()) == [0, 2]
+        assert sorted(set(index.lookup('paulo', prefix=True).tolist())) == [0, 2, 4]
+        assert index.nbytes > 0
+    
+    @pytest.mark.parametrize("search_text,mode", [
+        ('paulo', 'token'),
+        ('PAULO', 'prefix'),
+        ('são paulo', 'token'),
+        ('rio de jan', 'prefix'),
+        ('12300000', 'token'),
+        ('none', 'token'),
+        ('sp', 'token'),
+        ('xyz', 'prefix'),
+    ])
+    def test_index_matches_scan(self, cities_df, search_text, mode):
+        """Teste que o índice retorna o mesmo resultado da varredura."""
+        index = SearchIndex.build(cities_df)
+        
+        expected = get_search_mask(cities_df, search_text, mode)
+        
+        np.testing.assert_array_equal(get_search_mask(cities_df, search_text, mode, index), expected)
+    
+    def test_token_mode_whole_words(self, cities_df):
+        """Teste que o modo por palavra não aceita trechos de palavra."""
+        index = SearchIndex.build(cities_df)
+        
+        assert len(filter_dataframe_by_text(cities_df, 'Pau', mode='token', index=index)) == 0
+        assert len(filter_dataframe_by_text(cities_df, 'Pau', mode='prefix', index=index)) == 3
+        assert len(filter_dataframe_by_text(cities_df, 'Pau')) == 3
+    
+    def test_index_ignored_for_other_dataframe(self, cities_df):
+        """Teste que um índice de outro DataFrame não é usado."""
+        index = SearchIndex.build(cities_df.head(2))
+        
+        result = filter_dataframe_by_text(cities_df, 'paulo', mode='token', index=index)
+        
+        assert result.index.tolist() == [0, 2]
+    
+    def test_empty_dataframe(self):
+        """Teste com DataFrame sem linhas."""
+        df = pd.DataFrame({'a': pd.Series([], dtype=object)})
+        index = SearchIndex.build(df)
+        
+        assert len(index.tokens) == 0
+        assert len(filter_dataframe_by_text(df, 'x', mode='token', index=index)) == 0
+    
+    def test_invalid_mode(self, cities_df):
+        """Teste com modo de busca inválido."""
+        with pytest.raises(ValueError):
+            get_search_mask(cities_df, 'paulo', mode='fuzzy')
+
+
+class TestTrigramIndex:
+    """Testes para o índice de trigramas da busca por trecho de texto."""
+    
+    @pytest.fixture
+    def mixed_df(self):
+        """DataFrame com texto, números, datas e nulos."""
+        return pd.DataFrame({
+            'city': ['São Paulo', 'Rio de Janeiro', 'sao paulo', None, 'Paulo Afonso'],
+            'value': [1.5, 22.0, 3.25, np.nan, 1500.0],
+            'date': pd.to_datetime(['2020-01-01', None, '2021-02-03', '2020-01-01', '2022-05-05'])
+        })
+    
+    @pytest.mark.parametrize("search_text", [
+        'paulo', 'SÃO', 'o p', 'nan', 'nat', 'none', '2020-01', '22.0', '150', 'xyz', 'pa', 'a.b', '(',
+    ])
+    def test_trigram_matches_scan(self, mixed_df, search_text):
+        """Teste que o resultado é idêntico ao da varredura."""
+        index = TrigramIndex.build(mixed_df)
+        
+        try:
+            expected = filter_dataframe_by_text(mixed_df, search_text)
+        except re.error:
+            with pytest.raises(re.error):
+                filter_dataframe_by_text(mixed_df, search_text, trigram_index=index)
+            return
+        
+        pd.testing.assert_frame_equal(filter_dataframe_by_text(mixed_df, search_text, trigram_index=index), expected)
+    
+    def test_short_queries_fall_back(self, mixed_df):
+        """Teste que buscas curtas não usam o índice e metacaracteres são literais."""
+        index = TrigramIndex.build(mixed_df)
+        
+        assert index.search(mixed_df, 'pa') is None
+        assert not index.search(mixed_df, 'pa.lo').any()
+        assert index.search(mixed_df, '.25').tolist() == [False, False, True, False, False]
+        assert index.search(mixed_df, 'paulo').tolist() == [True, False, True, False, True]
+    
+    def test_columns_without_trigrams(self):
+        """Teste com colunas sem valores de 3+ caracteres (números curtos, pontuação) e sem linhas."""
+        df = pd.DataFrame({'nota': np.arange(1000) % 5 + 1, 'sinal': ['!?', '-'] * 500, 'uf': ['SP', 'RJ'] * 500})
+        index = TrigramIndex.build(df)
+        
+        assert len(index.columns[0]['trigrams']) == 0
+        assert index.columns[0]['offsets'].tolist() == [0]
+        assert not index.search(df, 'abc').any()
+        
+        df['nome'] = ['Ana', 'Bia'] * 500
+        index = TrigramIndex.build(df)
+        pd.testing.assert_frame_equal(filter_dataframe_by_text(df, 'ana', trigram_index=index),
+                                      filter_dataframe_by_text(df, 'ana'))
+        
+        empty = df.iloc[:0]
+        assert TrigramIndex.build(empty).search(empty, 'ana').tolist() == []
+    
+    def test_candidates_verified(self):
+        """Teste que trigramas presentes fora de ordem não geram falsos positivos."""
+        df = pd.DataFrame({'text': ['abc xyz', 'xyzabc', 'abcxyz']})
+        index = TrigramIndex.build(df)
+        
+        assert index.search(df, 'cxy').tolist() == [False, False, True]
+    
+    def test_long_and_repeated_values(self):
+        """Teste com valores longos e repetidos em lotes de tamanhos diferentes."""
+        values = ['x' * 500 + 'needle', 'short', 'needle'] * 200
+        df = pd.DataFrame({'text': values})
+        index = TrigramIndex.build(df)
+        
+        np.testing.assert_array_equal(
+            index.search(df, 'NEEDLE'),
+            df['text'].str.contains('needle').to_numpy()
+        )
+        assert index.nbytes > 0
+
+
+class TestIncrementalSearch:
+    """Testes para o refinamento da busca anterior durante a digitação."""
+    
+    @pytest.fixture
+    def people_df(self):
+        """DataFrame com 20 linhas e cidades repetidas."""
+        default_frame_states.clear()
+        return pd.DataFrame({
+            'name': ['João Silva', 'Maria Silva', 'Pedro Silveira', 'Ana Souza'] * 5,
+            'city': ['São Paulo', 'São Pedro', 'Santos', 'São Paulo'] * 5
+        })
+    
+    @staticmethod
+    def scanned_rows(scan):
+        """Quantidade de linhas verificadas em cada chamada de _scan_columns."""
+        return [len(call.args[0]) if len(call.args) < 4 else len(call.args[3])
+                for call in scan.call_args_list]
+    
+    def test_extended_query_refines_previous_matches(self, people_df):
+        """Teste que "são" -> "são paulo" verifica apenas as linhas já encontradas."""
+        import utils
+        filter_dataframe_by_text(people_df, 'são')
+        
+        with patch.object(utils, '_scan_columns', wraps=utils._scan_columns) as scan:
+            refined = filter_dataframe_by_text(people_df, 'SÃO PAULO')
+        
+        assert self.scanned_rows(scan) == [15]
+        pd.testing.assert_frame_equal(refined, filter_dataframe_by_text(people_df.copy(), 'são paulo'))
+    
+    def test_backspace_uses_older_query(self, people_df):
+        """Teste que apagar caracteres reaproveita uma busca mais curta do histórico."""
+        import utils
+        for text in ['s', 'si', 'silv', 'silve']:
+            filter_dataframe_by_text(people_df, text)
+        
+        with patch.object(utils, '_scan_columns', wraps=utils._scan_columns) as scan:
+            result = filter_dataframe_by_text(people_df, 'silva')
+            repeated = filter_dataframe_by_text(people_df, 'silva')
+        
+        assert self.scanned_rows(scan) == [15]
+        assert result.index.tolist() == repeated.index.tolist()
+        assert len(result) == 10
+    
+    def test_unrelated_and_regex_queries_rescan(self, people_df):
+        """Teste que buscas que não estendem a anterior varrem todas as linhas."""
+        import utils
+        filter_dataframe_by_text(people_df, 'silva')
+        
+        with patch.object(utils, '_scan_columns', wraps=utils._scan_columns) as scan:
+            filter_dataframe_by_text(people_df, 'santos')
+            result = filter_dataframe_by_text(people_df, 'santos|silva', mode="regex")
+        
+        assert self.scanned_rows(scan) == [20, 20]
+        assert len(result) == 15
+    
+    def test_registry_bounded_and_released(self):
+        """Teste do limite de DataFrames e da remoção quando o DataFrame é coletado."""
+        registry = FrameStateRegistry(max_frames=2)
+        frames = [pd.DataFrame({'a': [i]}) for i in range(3)]
+        for frame in frames:
+            registry.get(frame)['seen'] = True
+        
+        assert len(registry) == 2
+        assert registry.get(frames[2]) == {'seen': True}
+        assert registry.get(frames[0]) == {}
+        
+        del frames, frame
+        gc.collect()
+        assert len(registry) == 0
+
+
+class TestSearchText:
+    """Testes para o texto em minúsculas guardado para a busca."""
+    
+    @pytest.fixture
+    def mixed_df(self):
+        """DataFrame com texto, números e datas."""
+        default_frame_states.clear()
+        return pd.DataFrame({
+            'name': ['João SILVA', 'Maria Souza', np.nan],
+            'value': [3.5, 10.0, 2023.0],
+            'date': pd.to_datetime(['2023-01-15', '2024-02-20', '2023-03-01'])
+        })
+    
+    def test_text_built_once_and_reused(self, mixed_df):
+        """Teste que o texto de cada coluna é gerado só na primeira busca."""
+        import utils
+        with patch.object(utils, '_lower_search_text', wraps=utils._lower_search_text) as lower:
+            filter_dataframe_by_text(mixed_df, 'silva')
+            filter_dataframe_by_text(mixed_df, 'souza')
+            filter_dataframe_by_text(mixed_df, 'ma|jo')
+        
+        assert lower.call_count == 3
+        assert get_search_text(mixed_df, 0).tolist() == ['joão silva', 'maria souza', 'nan']
+    
+    def test_rendered_numbers_and_dates_match(self, mixed_df):
+        """Teste que números e datas continuam sendo encontrados pelo texto exibido."""
+        assert len(filter_dataframe_by_text(mixed_df, '3.5')) == 1
+        assert len(filter_dataframe_by_text(mixed_df, '2023')) == 2
+        assert len(filter_dataframe_by_text(mixed_df, '02-20')) == 1
+    
+    def test_regex_and_case_insensitive(self, mixed_df):
+        """Teste que expressões regulares e maiúsculas seguem funcionando."""
+        assert filter_dataframe_by_text(mixed_df, 'SILVA').index.tolist() == [0]
+        assert filter_dataframe_by_text(mixed_df, r'^Maria|\bsilva$', mode="regex").index.tolist() == [0, 1]
+        assert filter_dataframe_by_text(mixed_df, r'\D{5}', mode="regex").index.tolist() == [0, 1]
+    
+    def test_memory_reported_and_dropped(self, mixed_df):
+        """Teste do relatório de memória e do descarte do texto guardado."""
+        assert get_search_text_memory(mixed_df) == {'columns': 0, 'bytes': 0}
+        filter_dataframe_by_text(mixed_df, 'silva')
+        
+        memory = get_search_text_memory(mixed_df)
+        assert memory['columns'] == 3
+        assert memory['bytes'] > 0
+        assert get_search_text_memory() == memory
+        
+        assert drop_search_text(mixed_df) == memory['bytes']
+        assert get_search_text_memory(mixed_df)['columns'] == 0
+        assert len(filter_dataframe_by_text(mixed_df, 'silva')) == 1
+    
+    def test_budget_evicts_least_recently_used(self, mixed_df):
+        """Teste que o orçamento descarta as colunas usadas há mais tempo."""
+        get_search_text(mixed_df, 0, max_mb=1e-9)
+        get_search_text(mixed_df, 1, max_mb=1e-9)
+        
+        assert get_search_text_memory(mixed_df)['columns'] == 1
+        assert list(default_frame_states.get(mixed_df)['search_text']) == [1]
+
+
+class TestParallelSearch:
+    """Testes para a busca paralela em fatias de linhas e colunas."""
+    
+    @pytest.fixture
+    def large_df(self):
+        """DataFrame com 1000 linhas de texto, números e datas."""
+        default_frame_states.clear()
+        rng = np.random.default_rng(0)
+        return pd.DataFrame({
+            'name': rng.choice(['Ana Silva', 'Bruno Costa', 'Carla Souza', 'Diego Lima'], 1000),
+            'city': rng.choice(['São Paulo', 'Recife', 'Curitiba'], 1000),
+            'value': rng.integers(0, 5000, 1000),
+            'date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365, 1000), unit='D')
+        })
+    
+    @pytest.mark.parametrize("mode,search_text", [
+        ("contains", "silva"),
+        ("contains", "são paulo"),
+        ("contains", "12"),
+        ("regex", "silva|recife"),
+        ("token", "costa"),
+        ("prefix", "cur"),
+    ])
+    def test_parallel_matches_serial(self, large_df, mode, search_text):
+        """Teste que a busca paralela retorna as mesmas linhas da serial."""
+        import utils
+        serial = filter_dataframe_by_text(large_df, search_text, mode=mode)
+        default_frame_states.clear()
+        
+        with patch.object(utils, 'PARALLEL_SEARCH_MIN_CELLS', 100), \
+                patch.object(utils, '_PARALLEL_SHARD_MIN_ROWS', 64), \
+                patch.object(utils, 'ThreadPoolExecutor', wraps=utils.ThreadPoolExecutor) as pool:
+            parallel = filter_dataframe_by_text(large_df, search_text, mode=mode, n_workers=4)
+        
+        assert pool.called
+        pd.testing.assert_frame_equal(parallel, serial)
+    
+    def test_parallel_refines_previous_search(self, large_df):
+        """Teste que o refinamento da busca anterior também usa as fatias."""
+        import utils
+        expected = filter_dataframe_by_text(large_df, 'ana silva')
+        default_frame_states.clear()
+        
+        with patch.object(utils, 'PARALLEL_SEARCH_MIN_CELLS', 100), \
+                patch.object(utils, '_PARALLEL_SHARD_MIN_ROWS', 64):
+            filter_dataframe_by_text(large_df, 'silva', n_workers=3)
+            refined = filter_dataframe_by_text(large_df, 'ana silva', n_workers=3)
+        
+        pd.testing.assert_frame_equal(refined, expected)
+    
+    def test_small_frames_stay_serial(self, large_df):
+        """Teste que DataFrames abaixo do limite não criam threads."""
+        import utils
+        with patch.object(utils, 'ThreadPoolExecutor') as pool:
+            result = filter_dataframe_by_text(large_df, 'silva', n_workers=8)
+        
+        assert not pool.called
+        assert len(result) == (large_df['name'] == 'Ana Silva').sum()
+
+
+class TestPaginateDataframe:
+    """Testes para a paginação da tabela principal."""
+    
+    @pytest.fixture
+    def numbered_df(self):
+        """Fixture com 25 linhas numeradas."""
+        return pd.DataFrame({'n': range(25)}, index=range(100, 125))
+    
+    def test_pages_without_filter(self, numbered_df):
+        """Teste das páginas do DataFrame completo."""
+        result = paginate_dataframe(numbered_df, page=3, page_size=10)
+        
+        assert result['data']['n'].tolist() == list(range(20, 25))
+        assert result['n_pages'] == 3
+        assert result['total_rows'] == 25
+        assert (result['first_row'], result['last_row']) == (21, 25)
+    
+    def test_pages_from_mask(self, numbered_df):
+        """Teste de que a página sai da máscara sem perder o índice original."""
+        mask = (numbered_df['n'] % 3 == 0).to_numpy()
+        result = paginate_dataframe(numbered_df, mask, page=2, page_size=4)
+        
+        assert result['data']['n'].tolist() == [12, 15, 18, 21]
+        assert result['data'].index.tolist() == [112, 115, 118, 121]
+        assert result['total_rows'] == 9
+        assert result['n_pages'] == 3
+    
+    def test_page_clamped_and_empty_result(self, numbered_df):
+        """Teste de páginas fora do intervalo e de filtros sem resultado."""
+        assert paginate_dataframe(numbered_df, page=99, page_size=10)['page'] == 3
+        assert paginate_dataframe(numbered_df, page=0, page_size=10)['page'] == 1
+        
+        empty = paginate_dataframe(numbered_df, np.zeros(25, dtype=bool), page=2)
+        assert empty['data'].empty
+        assert (empty['page'], empty['n_pages'], empty['first_row'], empty['last_row']) == (1, 1, 0, 0)
+        
+        with pytest.raises(ValueError):
+            paginate_dataframe(numbered_df, page_size=0)
+    
+    def test_find_row_page(self, numbered_df):
+        """Teste do salto para a página que contém uma linha."""
+        mask = (numbered_df['n'] % 2 == 0).to_numpy()
+        
+        assert find_row_page(19, page_size=10) == 2
+        # A linha 9 não passa no filtro: abre a página da linha 10
+        page = find_row_page(9, mask, page_size=2)
+        assert 10 in paginate_dataframe(numbered_df, mask, page, page_size=2)['data']['n'].tolist()
+        # Depois da última linha filtrada: última página
+        assert find_row_page(24, np.append(mask[:24], False), page_size=5) == 3
 
 
 class TestGetNumericColumns:
@@ -181,6 +1194,19 @@ class TestGetNumericColumns:
         assert len(numeric_cols) == 4
         assert all(col in numeric_cols for col in df.columns)
     
+    def test_get_numeric_columns_small_types(self):
+        """Teste com tipos inteiros pequenos e sem sinal."""
+        df = pd.DataFrame({
+            'int8_col': np.array([1, -2, 3], dtype='int8'),
+            'int16_col': np.array([100, 200, 300], dtype='int16'),
+            'uint8_col': np.array([1, 2, 3], dtype='uint8'),
+            'uint32_col': np.array([10, 20, 30], dtype='uint32')
+        })
+        
+        numeric_cols = get_numeric_columns(df)
+        
+        assert list(numeric_cols) == list(df.columns)
+    
     def test_get_numeric_columns_no_numeric(self):
         """Teste com DataFrame sem colunas numéricas."""
         df = pd.DataFrame({
@@ -290,6 +1316,336 @@ class TestCalculateNumericStatistics:
         assert single_stats['Mediana'] == 42
         # Desvio padrão de um único valor deve ser NaN, não 0
         assert pd.isna(single_stats['Desvio Padrão']) or single_stats['Desvio Padrão'] == 0.0
+    
+    @staticmethod
+    def _pandas_statistics(df):
+        """Estatísticas calculadas coluna a coluna com as reduções do pandas."""
+        numeric_columns = get_numeric_columns(df)
+        stats_df = pd.DataFrame([{
+            'Coluna': col,
+            'Contagem': df[col].count(),
+            'Média': round(df[col].mean(), 2),
+            'Soma': round(df[col].sum(), 2),
+            'Mínimo': df[col].min(),
+            'Máximo': df[col].max(),
+            'Mediana': round(df[col].median(), 2),
+            'Desvio Padrão': round(df[col].std(), 2)
+        } for col in numeric_columns])
+        summary = {
+            'total_numeric_columns': len(numeric_columns),
+            'total_values': df[numeric_columns].count().sum(),
+            'total_sum': round(df[numeric_columns].sum().sum(), 2),
+            'overall_mean': round(df[numeric_columns].mean().mean(), 2)
+        }
+        return stats_df, summary
+    
+    def test_matches_pandas_reductions(self):
+        """Teste de que o cálculo em blocos reproduz as reduções do pandas."""
+        rng = np.random.default_rng(7)
+        n = 20_001
+        df = pd.DataFrame({
+            'float': rng.normal(1e6, 3, n),
+            'sparse': np.where(rng.random(n) < 0.2, np.nan, rng.random(n)),
+            'int': rng.integers(-10**9, 10**9, n),
+            'small': rng.integers(0, 100, n).astype(np.uint8),
+            'float32': np.where(rng.random(n) < 0.1, np.nan, rng.normal(5, 2, n)).astype(np.float32),
+            'empty': np.full(n, np.nan),
+            'nullable': pd.array(np.where(rng.random(n) < 0.1, None, rng.integers(0, 1000, n)), dtype='Int64'),
+            'text': ['x'] * n
+        })
+        
+        result = calculate_numeric_statistics(df)
+        expected_df, expected_summary = self._pandas_statistics(df)
+        
+        pd.testing.assert_frame_equal(result['stats_df'], expected_df)
+        assert result['summary'] == expected_summary
+        
+        # Blocos de uma coluna por vez dão o mesmo resultado
+        import utils
+        positions = list(range(7))
+        one_by_one = utils._column_statistics(df, positions, block_mb=1e-6)
+        for name, values in utils._column_statistics(df, positions).items():
+            np.testing.assert_array_equal(np.array(values, dtype=float), np.array(one_by_one[name], dtype=float))
+
+
+class TestApproximateStatistics:
+    """Testes para o modo aproximado das estatísticas."""
+    
+    def test_quantiles_within_error_bound(self):
+        """Teste de que mediana, P90 e P99 aproximados respeitam o erro de rank."""
+        rng = np.random.default_rng(5)
+        n = 200_000
+        df = pd.DataFrame({
+            'normal': rng.normal(50, 10, n),
+            'sparse': np.where(rng.random(n) < 0.3, np.nan, rng.exponential(5, n)),
+            'int': rng.integers(0, 10**6, n),
+            'text': ['x'] * n
+        })
+        exact = calculate_numeric_statistics(df)
+        result = calculate_numeric_statistics(df, approximate=True, error_bound=0.01)
+        stats_df = result['stats_df']
+        
+        assert list(stats_df.columns) == ['Coluna', 'Contagem', 'Média', 'Soma', 'Mínimo', 'Máximo',
+                                          'Mediana ≈', 'P90 ≈', 'P99 ≈', 'Desvio Padrão']
+        # As demais estatísticas continuam exatas
+        pd.testing.assert_frame_equal(stats_df.drop(columns=['Mediana ≈', 'P90 ≈', 'P99 ≈']),
+                                      exact['stats_df'].drop(columns='Mediana'))
+        assert result['summary'] == exact['summary']
+        
+        for i, column in enumerate(stats_df['Coluna']):
+            values = df[column].dropna().to_numpy()
+            for name, q in [('Mediana ≈', 0.5), ('P90 ≈', 0.9), ('P99 ≈', 0.99)]:
+                # Posição do valor estimado, com a tolerância do arredondamento da tabela
+                estimate = stats_df[name].iloc[i]
+                low, high = (values < estimate - 0.005).mean(), (values <= estimate + 0.005).mean()
+                assert low <= q + 0.01 and high >= q - 0.01
+    
+    def test_small_columns_are_exact(self):
+        """Teste de que colunas menores que a amostra têm quantis exatos."""
+        df = pd.DataFrame({'a': [1.0, 2.0, np.nan, 4.0, 10.0], 'b': [np.nan] * 5})
+        stats_df = calculate_numeric_statistics(df, approximate=True)['stats_df']
+        
+        assert stats_df['Mediana ≈'].iloc[0] == 3.0
+        assert stats_df['P90 ≈'].iloc[0] == round(df['a'].quantile(0.9), 2)
+        assert np.isnan(stats_df['Mediana ≈'].iloc[1])
+    
+    def test_repeatable(self):
+        """Teste de que o sorteio é o mesmo a cada chamada."""
+        df = pd.DataFrame({'a': np.random.default_rng(0).random(100_000)})
+        first = calculate_numeric_statistics(df, approximate=True)['stats_df']
+        second = calculate_numeric_statistics(df, approximate=True)['stats_df']
+        pd.testing.assert_frame_equal(first, second)
+    
+    def test_sample_size(self):
+        """Teste do tamanho da amostra e de limites de erro inválidos."""
+        assert quantile_sample_size(0.01) < quantile_sample_size(0.005)
+        assert quantile_sample_size(0.01) == 38_005
+        for error_bound in (0, 0.5, -0.1):
+            with pytest.raises(ValueError):
+                calculate_numeric_statistics(pd.DataFrame({'a': [1, 2]}), approximate=True,
+                                             error_bound=error_bound)
+    
+    def test_streaming_approximate(self):
+        """Teste das colunas aproximadas no cálculo em blocos."""
+        values = np.random.default_rng(6).random(50_000)
+        chunks = [pd.DataFrame({'a': part}) for part in np.array_split(values, 5)]
+        stats_df = calculate_streaming_statistics(chunks, approximate=True)['stats_df']
+        
+        for name, q in [('Mediana ≈', 0.5), ('P90 ≈', 0.9), ('P99 ≈', 0.99)]:
+            assert abs(stats_df[name].iloc[0] - q) < 0.03
+
+
+class TestQuantileSketch:
+    """Testes para o sketch de quantis."""
+    
+    def test_exact_while_small(self):
+        """Teste de que o sketch é exato enquanto guarda todos os valores."""
+        values = np.array([5.0, 1.0, np.nan, 3.0, 2.0])
+        sketch = QuantileSketch(k=10)
+        sketch.update(values)
+        
+        assert sketch.exact
+        assert sketch.count == 4
+        assert sketch.quantile(0.5) == 2.5
+        assert np.isnan(QuantileSketch().quantile(0.5))
+    
+    def test_rank_error_and_memory(self):
+        """Teste do erro de rank da mediana e da memória limitada."""
+        rng = np.random.default_rng(3)
+        values = rng.standard_normal(200_000)
+        sketch = QuantileSketch(k=200)
+        for start in range(0, len(values), 10_000):
+            sketch.update(values[start:start + 10_000])
+        
+        assert not sketch.exact
+        assert sketch.count == len(values)
+        for q in (0.1, 0.5, 0.9):
+            rank = (values < sketch.quantile(q)).mean()
+            assert abs(rank - q) < 0.02
+        assert sketch.nbytes < 4 * 200 * 8
+    
+    def test_merge(self):
+        """Teste de que sketches de partes dos dados podem ser combinados."""
+        rng = np.random.default_rng(4)
+        values = rng.exponential(size=100_000)
+        parts = [QuantileSketch(k=200, seed=i) for i in range(4)]
+        for sketch, part in zip(parts, np.array_split(values, 4)):
+            sketch.update(part)
+        merged = parts[0]
+        for sketch in parts[1:]:
+            merged.merge(sketch)
+        
+        assert merged.count == len(values)
+        assert abs((values < merged.quantile(0.5)).mean() - 0.5) < 0.02
+    
+    def test_invalid_k(self):
+        """Teste de k inválido."""
+        with pytest.raises(ValueError):
+            QuantileSketch(k=1)
+
+
+class TestStreamingStatistics:
+    """Testes para as estatísticas calculadas bloco a bloco."""
+    
+    @staticmethod
+    def _sample_dataframe(n=50_000):
+        rng = np.random.default_rng(11)
+        return pd.DataFrame({
+            'float': rng.normal(1e6, 3, n),
+            'sparse': np.where(rng.random(n) < 0.2, np.nan, rng.random(n)),
+            'int': rng.integers(-10**9, 10**9, n),
+            'small': rng.integers(0, 100, n).astype(np.uint8),
+            'nullable': pd.array(np.where(rng.random(n) < 0.1, None, rng.integers(0, 1000, n)), dtype='Int64'),
+            'text': ['x'] * n
+        })
+    
+    @staticmethod
+    def _chunks(df, size):
+        return (df.iloc[start:start + size] for start in range(0, len(df), size))
+    
+    def test_matches_in_memory(self):
+        """Teste de que o cálculo em blocos reproduz o cálculo em memória."""
+        df = self._sample_dataframe()
+        expected = calculate_numeric_statistics(df)
+        result = calculate_streaming_statistics(self._chunks(df, 7_000))
+        
+        stats_df, expected_df = result['stats_df'], expected['stats_df']
+        assert list(stats_df.columns) == list(expected_df.columns)
+        assert list(stats_df['Coluna']) == list(expected_df['Coluna'])
+        for column in ['Contagem', 'Mínimo', 'Máximo']:
+            assert list(stats_df[column]) == list(expected_df[column])
+        for column in ['Soma', 'Média', 'Desvio Padrão']:
+            np.testing.assert_allclose(stats_df[column].astype(float), expected_df[column].astype(float),
+                                       rtol=1e-9, atol=0.01)
+        assert result['summary']['total_numeric_columns'] == expected['summary']['total_numeric_columns']
+        assert result['summary']['total_values'] == expected['summary']['total_values']
+        assert result['summary']['total_sum'] == pytest.approx(expected['summary']['total_sum'])
+        
+        # Mediana dentro do erro de rank do sketch
+        for column, median in zip(stats_df['Coluna'], stats_df['Mediana']):
+            values = df[column].dropna().to_numpy(dtype=float)
+            assert abs((values < median).mean() - 0.5) < 0.02 or (values == median).any()
+    
+    def test_exact_median_for_small_data(self):
+        """Teste de que a mediana é exata quando cabe no sketch."""
+        df = pd.DataFrame({'a': [3, 1, 2, 8, 5, 4], 'b': [1.5, np.nan, 2.5, 0.5, 4.0, 3.0]})
+        result = calculate_streaming_statistics(self._chunks(df, 2))
+        expected = calculate_numeric_statistics(df)
+        
+        pd.testing.assert_frame_equal(result['stats_df'], expected['stats_df'])
+        assert result['summary'] == expected['summary']
+    
+    def test_merge_partial_results(self):
+        """Teste de que acumuladores de partes do arquivo podem ser combinados."""
+        df = self._sample_dataframe(20_000)
+        first = RunningStatistics()
+        second = RunningStatistics()
+        for chunk in self._chunks(df.iloc[:8_000], 3_000):
+            first.update(chunk)
+        for chunk in self._chunks(df.iloc[8_000:], 5_000):
+            second.update(chunk)
+        merged = first.merge(second).result()['stats_df']
+        single = calculate_streaming_statistics([df])['stats_df']
+        
+        assert list(merged['Contagem']) == list(single['Contagem'])
+        np.testing.assert_allclose(merged['Média'], single['Média'], atol=0.01)
+        np.testing.assert_allclose(merged['Desvio Padrão'], single['Desvio Padrão'], atol=0.01)
+        
+        with pytest.raises(ValueError):
+            first.merge(RunningStatistics().update(pd.DataFrame({'other': [1, 2]})))
+    
+    def test_large_integers_are_exact(self):
+        """Teste de que mínimo, máximo e soma de inteiros acima de 2**53 não passam por float64."""
+        df = pd.DataFrame({'big': np.array([2**53 + 1, 2**53 + 3, 1], dtype=np.int64)})
+        result = calculate_streaming_statistics(self._chunks(df, 1))
+        expected = calculate_numeric_statistics(df)
+        
+        row = result['stats_df'].iloc[0]
+        assert row['Mínimo'] == 1
+        assert row['Máximo'] == 2**53 + 3
+        assert row['Soma'] == 2**54 + 5
+        for column in ['Mínimo', 'Máximo', 'Soma']:
+            assert row[column] == expected['stats_df'][column].iloc[0]
+    
+    def test_non_numeric_values_in_later_chunks(self):
+        """Teste de valores não numéricos em blocos seguintes."""
+        chunks = [pd.DataFrame({'a': [1, 2]}), pd.DataFrame({'a': ['3', 'x']})]
+        result = calculate_streaming_statistics(chunks)
+        
+        row = result['stats_df'].iloc[0]
+        assert row['Contagem'] == 3
+        assert row['Soma'] == 6
+        assert row['Máximo'] == 3
+    
+    def test_without_numeric_columns(self):
+        """Teste sem colunas numéricas ou sem blocos."""
+        assert calculate_streaming_statistics([pd.DataFrame({'a': ['x']})])['summary'] == {}
+        assert calculate_streaming_statistics([])['stats_df'].empty
+    
+    def test_with_csv_chunks(self):
+        """Teste com os blocos produzidos por iter_csv_chunks."""
+        df = self._sample_dataframe(5_000).drop(columns='nullable')
+        csv_file = io.BytesIO(df.to_csv(index=False).encode('utf-8'))
+        result = calculate_streaming_statistics(iter_csv_chunks(csv_file, chunk_rows=1_000))
+        expected = calculate_numeric_statistics(df)
+        
+        assert list(result['stats_df']['Contagem']) == list(expected['stats_df']['Contagem'])
+        np.testing.assert_allclose(result['stats_df']['Média'], expected['stats_df']['Média'], atol=0.01)
+
+
+class TestDatasetProfile:
+    """Testes para o perfil compartilhado pelas funções de resumo."""
+    
+    def test_profile_is_reused(self):
+        """Teste de que o mesmo DataFrame usa sempre o mesmo perfil."""
+        df = pd.DataFrame({'a': [1, 2, None], 'b': ['x', 'y', 'x']})
+        profile = get_dataset_profile(df)
+        
+        assert isinstance(profile, DatasetProfile)
+        assert get_dataset_profile(df) is profile
+        assert list(profile.numeric_columns) == ['a']
+        assert list(profile.null_counts) == [1, 0]
+        assert list(profile.unique_counts) == [2, 2]
+        assert profile.memory_usage == df.memory_usage(deep=True).sum()
+    
+    def test_full_table_scans_run_once(self):
+        """Teste de que resumos seguidos não varrem a tabela de novo."""
+        df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', None, 'x']})
+        
+        with patch.object(pd.DataFrame, 'nunique', autospec=True, side_effect=pd.DataFrame.nunique) as nunique, \
+             patch.object(pd.DataFrame, 'memory_usage', autospec=True,
+                          side_effect=pd.DataFrame.memory_usage) as memory_usage:
+            for _ in range(2):
+                get_numeric_columns(df)
+                info = get_dataset_info(df)
+                details = get_column_details(df)
+        
+        assert nunique.call_count == 1
+        assert memory_usage.call_count == 1
+        assert info['basic_info']['unique_values_total'] == details['Valores Únicos'].sum() == 4
+        assert info['basic_info']['null_values_total'] == details['Valores Nulos'].sum() == 1
+    
+    def test_profile_rebuilt_for_new_frame_or_schema(self):
+        """Teste de que o perfil é refeito para outro DataFrame ou quando os tipos mudam."""
+        df = pd.DataFrame({'a': [1, 2], 'b': ['1', '2']})
+        profile = get_dataset_profile(df)
+        
+        assert get_dataset_profile(df.copy()) is not profile
+        
+        df['b'] = df['b'].astype(int)
+        rebuilt = get_dataset_profile(df)
+        assert rebuilt is not profile
+        assert list(rebuilt.numeric_columns) == ['a', 'b']
+    
+    def test_profile_does_not_keep_frame_alive(self):
+        """Teste de que o perfil não impede a coleta do DataFrame."""
+        df = pd.DataFrame({'a': [1, 2]})
+        profile = get_dataset_profile(df)
+        del df
+        gc.collect()
+        
+        with pytest.raises(ReferenceError):
+            profile.null_counts
 
 
 class TestGetDatasetInfo:
@@ -456,6 +1812,204 @@ class TestPrepareChartData:
         # O comportamento pode variar dependendo da implementação do pandas
         assert isinstance(result['is_date'], bool)
         assert len(result['chart_df']) <= 3
+    
+    def test_prepare_chart_data_downsampling(self):
+        """Teste de que séries longas são reduzidas mantendo extremos e o eixo X completo."""
+        rng = np.random.default_rng(8)
+        n = 100_003
+        df = pd.DataFrame({'x': np.arange(n), 'a': np.cumsum(rng.standard_normal(n)), 'b': rng.random(n)})
+        
+        result = prepare_chart_data(df, 'x', ['a', 'b'], max_points=600)
+        chart_df = result['chart_df']
+        
+        assert len(chart_df) <= 600
+        assert result['total_points'] == n
+        assert chart_df.index[0] == 0 and chart_df.index[-1] == n - 1
+        assert chart_df.index.is_monotonic_increasing
+        for col in ['a', 'b']:
+            assert chart_df[col].min() == df[col].min()
+            assert chart_df[col].max() == df[col].max()
+            # Estatísticas calculadas sobre todas as linhas
+            assert result['stats'][col]['mean'] == pytest.approx(df[col].mean())
+        
+        # Sem limite, todas as linhas são mantidas
+        assert len(prepare_chart_data(df, 'x', ['a'], max_points=None)['chart_df']) == n
+    
+    def test_prepare_chart_data_dates_parsed_once(self):
+        """Teste de que as datas são detectadas e convertidas uma única vez por coluna."""
+        df = pd.DataFrame({'date': ['31/01/2023', '01/01/2023', None, '02/01/2023', '13/01/2023'],
+                           'value': [31, 1, 9, 2, 13]})
+        
+        with patch('utils.pd.to_datetime', wraps=pd.to_datetime) as to_datetime:
+            first = prepare_chart_data(df, 'date', ['value'])
+            second = prepare_chart_data(df, 'date', ['value'], max_points=2)
+        
+        # Uma chamada na detecção (amostra) e uma na conversão da coluna
+        assert to_datetime.call_count == 2
+        assert to_datetime.call_args.kwargs['format'] == '%d/%m/%Y'
+        assert get_dataset_profile(df).date_format('date') == '%d/%m/%Y'
+        assert first['is_date'] and second['is_date']
+        assert list(first['chart_df']['value']) == [1, 2, 13, 31]
+        assert first['chart_df']['date'].iloc[-1] == pd.Timestamp('2023-01-31')
+    
+    def test_prepare_chart_data_sort_order_cached(self):
+        """Teste de que a ordem cronológica de X é calculada uma vez e reaproveitada com outras colunas Y."""
+        rng = np.random.default_rng(11)
+        n = 5000
+        df = pd.DataFrame({'ts': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 50, n), unit='D'),
+                           'a': rng.random(n), 'b': rng.random(n)})
+        df.loc[::97, 'a'] = np.nan
+        df.loc[::89, 'ts'] = pd.NaT
+        
+        with patch.object(pd.arrays.DatetimeArray, 'argsort', autospec=True,
+                          side_effect=pd.arrays.DatetimeArray.argsort) as argsort:
+            first = prepare_chart_data(df, 'ts', ['a'], max_points=None)
+            second = prepare_chart_data(df, 'ts', ['b', 'a'], max_points=None)
+        
+        assert argsort.call_count == 1
+        # Mesma ordem de uma ordenação estável, sem as linhas com nulos
+        expected = df[['ts', 'a']].dropna().sort_values('ts', kind='stable')
+        pd.testing.assert_frame_equal(first['chart_df'], expected)
+        assert second['chart_df'].index.equals(df[['ts', 'a', 'b']].dropna().sort_values('ts', kind='stable').index)
+        assert list(second['chart_df'].columns) == ['ts', 'b', 'a']
+    
+    def test_prepare_chart_data_ambiguous_day_first_dates(self):
+        """Teste de datas dd/mm/aaaa cujo primeiro valor também é uma data mm/dd/aaaa válida."""
+        days = pd.date_range('2024-03-01', '2024-03-28', freq='D')
+        df = pd.DataFrame({'data': days.strftime('%d/%m/%Y'), 'valor': range(len(days))})
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            result = prepare_chart_data(df, 'data', ['valor'])
+        
+        assert get_dataset_profile(df).date_format('data') == '%d/%m/%Y'
+        assert result['is_date'] == True
+        assert list(result['chart_df']['data']) == list(days)
+    
+    def test_prepare_chart_data_numeric_and_categorical_x(self):
+        """Teste de que números não viram datas e datas em 'category' são reconhecidas."""
+        df = pd.DataFrame({'n': [3, 1, 2], 'day': pd.Categorical(['2023-01-02', '2023-01-01', '2023-01-02']),
+                           'value': [30, 10, 20]})
+        
+        numeric = prepare_chart_data(df, 'n', ['value'])
+        assert numeric['is_date'] == False
+        assert list(numeric['chart_df']['n']) == [3, 1, 2]
+        
+        dates = prepare_chart_data(df, 'day', ['value'])
+        assert dates['is_date'] == True
+        assert list(dates['chart_df']['value']) == [10, 30, 20]
+        assert get_dataset_profile(df).date_format('n') is None
+    
+    def test_downsample_chart_data_extremes_per_interval(self):
+        """Teste dos extremos de cada intervalo, ignorando valores ausentes."""
+        values = np.arange(1000, dtype=float)
+        values[[10, 500]] = [5000.0, -5000.0]
+        values[::7] = np.nan
+        df = pd.DataFrame({'y': values, 'n': pd.array(np.arange(1000) % 13, dtype='Int64')})
+        
+        reduced = downsample_chart_data(df, ['y', 'n'], max_points=60)
+        
+        assert len(reduced) <= 60
+        assert {10, 500, 0, 999} <= set(reduced.index)
+        assert reduced['n'].max() == 12
+        
+        # DataFrames pequenos são retornados sem cópia
+        assert downsample_chart_data(df, ['y'], max_points=1000) is df
+    
+    def test_prepare_chart_data_time_buckets(self):
+        """Teste dos intervalos de tempo escolhidos pelo período e pela quantidade de pontos."""
+        rng = np.random.default_rng(10)
+        n = 200_000
+        seconds = np.sort(rng.integers(0, 2 * 365 * 86400, n))
+        df = pd.DataFrame({'ts': pd.Timestamp('2022-01-01') + pd.to_timedelta(seconds, unit='s'),
+                           'value': rng.random(n)})
+        
+        result = prepare_chart_data(df, 'ts', ['value'], max_points=500)
+        chart_df = result['chart_df']
+        
+        # Dois anos: dias passariam de 500 pontos, semanas cabem
+        assert result['time_bucket'] == 'W'
+        assert result['time_aggregation'] == 'mean'
+        assert result['is_date'] is True
+        assert len(chart_df) <= 500
+        assert chart_df['ts'].is_monotonic_increasing
+        expected = df.resample('W', on='ts')['value'].mean().dropna()
+        np.testing.assert_allclose(chart_df['value'], expected.to_numpy())
+        assert result['stats']['value']['max'] == df['value'].max()
+        
+        # Soma mantém os intervalos vazios com 0
+        summed = prepare_chart_data(df.iloc[::100], 'ts', ['value'], max_points=100, time_aggregation='sum')
+        assert summed['time_bucket'] == 'MS'
+        assert summed['time_aggregation'] == 'sum'
+        assert summed['chart_df']['value'].sum() == pytest.approx(df['value'].iloc[::100].sum())
+        
+        # Sem intervalos, a redução M4 continua valendo
+        raw = prepare_chart_data(df, 'ts', ['value'], max_points=1000, time_aggregation=None)
+        assert raw['time_bucket'] is None
+        assert raw['time_aggregation'] is None
+        assert raw['chart_df']['value'].max() == df['value'].max()
+    
+    def test_choose_time_bucket(self):
+        """Teste da escolha da largura dos intervalos de tempo."""
+        start = pd.Timestamp('2024-01-01')
+        
+        assert choose_time_bucket(start, start + pd.Timedelta(seconds=30), 100) is None
+        assert choose_time_bucket(start, start + pd.Timedelta(hours=1), 100) == 'min'
+        assert choose_time_bucket(start, start + pd.Timedelta(days=3), 100) == 'h'
+        assert choose_time_bucket(start, start + pd.Timedelta(days=60), 100) == 'D'
+        assert choose_time_bucket(start, start + pd.Timedelta(days=365), 100) == 'W'
+        assert choose_time_bucket(start, start + pd.Timedelta(days=3650), 100) == 'MS'
+        assert choose_time_bucket(start, start + pd.Timedelta(days=36500), 100) == 'MS'
+    
+    @pytest.mark.parametrize("aggregation", ['sum', 'mean', 'count', 'min', 'max'])
+    def test_prepare_chart_data_aggregation(self, aggregation):
+        """Teste da agregação por X com os maiores grupos e "Outros"."""
+        rng = np.random.default_rng(9)
+        n = 10_000
+        df = pd.DataFrame({
+            'id': rng.integers(0, 500, n),
+            'sales': rng.random(n) * 100,
+            'units': rng.integers(1, 10, n)
+        })
+        
+        result = prepare_chart_data(df, 'id', ['sales', 'units'], aggregation=aggregation, top_groups=5)
+        chart_df = result['chart_df']
+        
+        # Empates ficam na ordem em que os grupos aparecem
+        expected = df.groupby('id', sort=False)[['sales', 'units']].agg(aggregation)
+        top = expected.sort_values('sales', ascending=False, kind='stable').head(5)
+        rest = df[~df['id'].isin(top.index)][['sales', 'units']].agg(aggregation)
+        
+        assert result['n_groups'] == expected.shape[0]
+        assert result['total_points'] == n
+        assert list(chart_df.columns) == ['id', 'sales', 'units']
+        assert chart_df['id'].tolist() == [str(i) for i in top.index] + ['Outros']
+        np.testing.assert_allclose(chart_df[['sales', 'units']].to_numpy(dtype=float)[:5], top.to_numpy(dtype=float))
+        np.testing.assert_allclose(chart_df[['sales', 'units']].to_numpy(dtype=float)[5], rest.to_numpy(dtype=float))
+    
+    def test_prepare_chart_data_aggregation_few_groups(self, chart_df):
+        """Teste de agregação sem grupo "Outros" e com parâmetros inválidos."""
+        result = prepare_chart_data(chart_df, 'category', ['sales'], aggregation='sum')
+        
+        assert result['chart_df']['category'].tolist() == ['A', 'B']
+        assert result['chart_df']['sales'].tolist() == [220, 150]
+        assert result['is_date'] is False
+        
+        with pytest.raises(ValueError):
+            prepare_chart_data(chart_df, 'category', ['sales'], aggregation='median')
+        with pytest.raises(ValueError):
+            prepare_chart_data(chart_df, 'category', ['sales'], aggregation='sum', top_groups=0)
+    
+    def test_prepare_chart_data_aggregation_real_others_group(self):
+        """Teste de que um grupo real chamado "Outros" não é sobrescrito pelo grupo dos demais."""
+        df = pd.DataFrame({'cat': ['Outros'] * 50 + [f'g{i}' for i in range(30)] * 2, 'v': range(110)})
+        
+        result = prepare_chart_data(df, 'cat', ['v'], aggregation='sum', top_groups=5)
+        chart_df = result['chart_df']
+        
+        assert chart_df['cat'].tolist() == ['Outros', 'g29', 'g28', 'g27', 'g26', 'Outros (2)']
+        assert chart_df['v'].tolist() == [1225, 188, 186, 184, 182, 4030]
+        assert chart_df['v'].sum() == df['v'].sum()
 
 
 class TestValidateChartRequirements:
@@ -5,139 +5,3099 @@ Este módulo contém funções puras para manipulação e análise de dados CSV,
 separando a lógica de negócio da interface do usuário Streamlit.
 """
 
+import numpy as np
 import pandas as pd
+import codecs
+import csv
 import io
-from typing import List, Dict, Any, Tuple, Optional
+import os
+import random
+import re
+import time
+import hashlib
+import importlib.util
+import threading
+import warnings
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from pandas.api.types import (
+    is_bool_dtype,
+    is_datetime64_any_dtype,
+    is_float_dtype,
+    is_integer_dtype,
+    is_numeric_dtype,
+    is_object_dtype,
+    is_string_dtype,
+)
+from typing import List, Dict, Any, Tuple, Optional, Iterator, Iterable
 
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
 
-def load_csv_data(uploaded_file) -> pd.DataFrame:
+
+# Orçamento padrão de memória (em MB) para cada bloco lido no modo streaming
+DEFAULT_MEMORY_BUDGET_MB = 64.0
+
+# Quantidade de linhas do primeiro bloco, usado para estimar o custo por linha
+_PROBE_ROWS = 1000
+
+# Motores de parsing aceitos por load_csv_data
+CSV_ENGINES = ("c", "pyarrow")
+
+# Orçamento padrão (em MB) do cache de DataFrames já carregados
+DEFAULT_PARSE_CACHE_MB = 512.0
+
+# Tamanho dos pedaços lidos ao calcular o hash de conteúdo
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+# Diretório e orçamento padrão do cache em disco (arquivos Feather)
+DEFAULT_DISK_CACHE_DIR = os.environ.get(
+    "CSV_VIEWER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "csv_viewer")
+)
+DEFAULT_DISK_CACHE_MB = 2048.0
+
+# Amostragem do esquema: KB lidos do início do arquivo e trechos aleatórios extras
+DEFAULT_SNIFF_KB = 64
+DEFAULT_SNIFF_SAMPLES = 4
+
+# Separadores candidatos na detecção do delimitador
+_SNIFF_DELIMITERS = ",;\t|"
+
+# Fração mínima de valores da amostra convertidos para considerar uma coluna de datas
+_DATE_MATCH_RATIO = 0.9
+
+# Valores (espalhados pela coluna) usados para detectar datas no gráfico
+_DATE_SAMPLE_SIZE = 1000
+
+# Razão máxima valores únicos / linhas para converter texto em 'category'
+DEFAULT_CATEGORY_RATIO = 0.5
+
+# DataFrames com estado auxiliar guardado (buscas anteriores) e buscas por DataFrame
+DEFAULT_FRAME_STATES = 8
+_SEARCH_HISTORY = 4
+
+# Orçamento (MB) do texto em minúsculas guardado para a busca, somando todos os DataFrames
+DEFAULT_SEARCH_TEXT_MB = 256.0
+
+# Busca paralela: threads padrão, células (linhas x colunas) mínimas e linhas mínimas por fatia
+DEFAULT_SEARCH_WORKERS = os.cpu_count() or 1
+PARALLEL_SEARCH_MIN_CELLS = 2_000_000
+_PARALLEL_SHARD_MIN_ROWS = 50_000
+
+# Modos de busca: trecho literal, expressão regular, célula inteira, palavra inteira e início de palavra
+SEARCH_MODES = ("contains", "regex", "exact", "token", "prefix")
+
+# Tokens do índice de busca: sequências de letras, dígitos e '_'
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+# Expressões regulares compiladas mantidas em cache
+_REGEX_CACHE_SIZE = 128
+
+# Linhas a partir das quais o app constrói o índice de trigramas
+TRIGRAM_INDEX_MIN_ROWS = 100_000
+
+# Caracteres (linhas x largura) de cada lote convertido para array Unicode ao extrair trigramas
+_TRIGRAM_BATCH_CHARS = 4_000_000
+
+# Estatísticas calculadas por _column_statistics e tamanho máximo (MB) de cada bloco de colunas
+_STATISTICS = ('count', 'sum', 'mean', 'm2', 'std', 'min', 'max', 'median')
+_STATS_BLOCK_MB = 64.0
+
+# Quantis do modo aproximado, erro de rank padrão e probabilidade de o erro passar do limite
+APPROXIMATE_QUANTILES = {'median': 0.5, 'p90': 0.9, 'p99': 0.99}
+DEFAULT_QUANTILE_ERROR = 0.01
+_QUANTILE_FAILURE = 1e-3
+
+# Parâmetro k do QuantileSketch (itens do maior compactador); o erro de rank fica perto de 1/k
+DEFAULT_SKETCH_K = 200
+
+# Linhas por página da tabela principal
+PAGE_SIZES = (25, 50, 100, 250, 500, 1000)
+DEFAULT_PAGE_SIZE = 100
+
+# Máximo de pontos enviados ao gráfico (séries maiores são reduzidas por M4)
+DEFAULT_CHART_POINTS = 2000
+
+# Agregações do gráfico por valor de X, grupos exibidos e rótulo dos demais
+CHART_AGGREGATIONS = ("sum", "mean", "count", "min", "max")
+DEFAULT_TOP_GROUPS = 20
+_OTHERS_LABEL = "Outros"
+
+# Larguras dos intervalos de tempo do gráfico, da menor para a maior (mês com duração média)
+TIME_BUCKETS = {
+    'min': pd.Timedelta(minutes=1),
+    'h': pd.Timedelta(hours=1),
+    'D': pd.Timedelta(days=1),
+    'W': pd.Timedelta(weeks=1),
+    'MS': pd.Timedelta(days=30.436875)
+}
+
+# Metadado gravado no Feather para restaurar DataFrames com tipos Arrow
+_ARROW_BACKEND_METADATA = b'csv_viewer_dtype_backend'
+
+
+def is_pyarrow_available() -> bool:
+    """
+    Verifica se a biblioteca opcional pyarrow está instalada.
+    
+    Returns:
+        bool: True se pyarrow puder ser importado
+    """
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def resolve_parse_options(engine: str = "c", dtype_backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Monta os argumentos de motor e backend de tipos para pd.read_csv.
+    
+    O motor "pyarrow" faz o parsing em múltiplas threads e o backend "pyarrow"
+    guarda strings de forma compacta. Quando pyarrow não está instalado, ambos
+    voltam automaticamente para o parser C e os tipos NumPy padrão.
+    
+    Args:
+        engine: Motor de parsing ("c" ou "pyarrow")
+        dtype_backend: Backend de tipos (None, "numpy_nullable" ou "pyarrow")
+        
+    Returns:
+        Dict com as chaves 'engine' e, se aplicável, 'dtype_backend'
+        
+    Raises:
+        ValueError: Se o motor informado não for suportado
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Motor de parsing inválido: {engine}")
+    
+    if not is_pyarrow_available():
+        engine = "c"
+        if dtype_backend == "pyarrow":
+            dtype_backend = None
+    
+    options = {'engine': engine}
+    if dtype_backend is not None:
+        options['dtype_backend'] = dtype_backend
+    return options
+
+
+class _BufferReader(io.RawIOBase):
+    """
+    Leitor binário somente leitura sobre um buffer já existente em memória.
+    
+    O parser do pandas lê o arquivo em pedaços; cada leitura copia apenas o
+    pedaço solicitado, sem duplicar o buffer inteiro como faria io.BytesIO
+    com bytearray/memoryview.
+    """
+    
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._pos = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self._pos
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = min(max(base + offset, 0), len(self._view))
+        return self._pos
+    
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos:end].tobytes()
+        self._pos = end
+        return data
+    
+    def readinto(self, b) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+    
+    def close(self) -> None:
+        # Libera o buffer de origem (ex.: permite redimensionar o BytesIO do upload)
+        self._view.release()
+        super().close()
+
+
+class _StringReader(io.TextIOBase):
+    """
+    Leitor de texto somente leitura sobre uma string, sem copiá-la por inteiro.
+    
+    io.StringIO guarda uma cópia interna da string (até 4 bytes por caractere);
+    aqui cada leitura fatia apenas o pedaço solicitado pelo parser.
+    """
+    
+    def __init__(self, text: str):
+        self._text = text
+        self._pos = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> str:
+        end = len(self._text) if size is None or size < 0 else self._pos + size
+        data = self._text[self._pos:end]
+        self._pos += len(data)
+        return data
+
+
+@contextmanager
+def _open_csv_source(uploaded_file):
+    """
+    Converte a entrada aceita pelos carregadores em algo legível por pd.read_csv.
+    
+    Strings, bytes e buffers em memória (incluindo o UploadedFile do Streamlit,
+    que é um BytesIO) são lidos diretamente do buffer original, de modo que o
+    conteúdo do upload fica em memória uma única vez.
+    
+    Args:
+        uploaded_file: Arquivo CSV, string com dados CSV, ou file-like object
+        
+    Yields:
+        Objeto que pode ser passado diretamente para pd.read_csv
+    """
+    if isinstance(uploaded_file, str):
+        reader = _StringReader(uploaded_file)
+    elif isinstance(uploaded_file, (bytes, bytearray, memoryview)):
+        reader = _BufferReader(uploaded_file)
+    elif hasattr(uploaded_file, 'getbuffer'):
+        # BytesIO/UploadedFile: lê a partir da posição atual sem copiar o buffer
+        reader = _BufferReader(uploaded_file.getbuffer())
+        reader.seek(uploaded_file.tell())
+    else:
+        # Demais file-like objects já são lidos em pedaços pelo pandas
+        yield uploaded_file
+        return
+    
+    try:
+        yield reader
+    finally:
+        reader.close()
+
+
+def _rows_per_chunk(chunk: pd.DataFrame, memory_budget_mb: float) -> int:
+    """
+    Estima quantas linhas cabem no orçamento de memória de um bloco.
+    
+    Args:
+        chunk: Bloco já lido, usado como amostra do custo por linha
+        memory_budget_mb: Orçamento de memória por bloco, em MB
+        
+    Returns:
+        int: Número de linhas por bloco (no mínimo 1)
+    """
+    row_bytes = chunk.memory_usage(deep=True).sum() / max(len(chunk), 1)
+    budget_bytes = memory_budget_mb * 1024 * 1024
+    return max(1, int(budget_bytes // max(row_bytes, 1)))
+
+
+def _source_position(uploaded_file) -> Optional[int]:
+    """
+    Posição atual de um file-like object lido diretamente pelo pandas.
+    
+    Strings, bytes e buffers em memória são sempre relidos do início por
+    _open_csv_source, então não precisam ser reposicionados.
+    
+    Args:
+        uploaded_file: Arquivo CSV, string com dados CSV, ou file-like object
+        
+    Returns:
+        Optional[int]: Posição para voltar antes de reler, ou None
+    """
+    if isinstance(uploaded_file, (str, bytes, bytearray, memoryview)) or hasattr(uploaded_file, 'getbuffer'):
+        return None
+    try:
+        return uploaded_file.tell() if uploaded_file.seekable() else None
+    except (AttributeError, OSError):
+        return None
+
+
+def _read_csv_samples(uploaded_file, head_size: int, n_samples: int,
+                      sample_size: int) -> Optional[Tuple[Any, List[Any], bool]]:
+    """
+    Lê o início do arquivo e alguns trechos em posições aleatórias.
+    
+    Apenas os trechos são lidos (fatias do buffer ou seek + read), então o
+    custo não depende do tamanho do arquivo. File-like objects voltam para a
+    posição original ao final.
+    
+    Args:
+        uploaded_file: Arquivo CSV, string com dados CSV, ou file-like object
+        head_size: Quantidade lida do início do arquivo
+        n_samples: Quantidade de trechos aleatórios
+        sample_size: Tamanho de cada trecho aleatório
+        
+    Returns:
+        Tuple (início, trechos, arquivo_completo) com str ou bytes, ou None se
+        a entrada não permitir releitura
+    """
+    if isinstance(uploaded_file, str):
+        size = len(uploaded_file)
+        read_at = lambda offset, length: uploaded_file[offset:offset + length]
+        restore = None
+    elif isinstance(uploaded_file, (bytes, bytearray, memoryview)):
+        view = memoryview(uploaded_file)
+        size = view.nbytes
+        read_at = lambda offset, length: bytes(view[offset:offset + length])
+        restore = view.release
+    else:
+        # Inclui BytesIO/UploadedFile: seek + read evita que getbuffer copie o upload
+        try:
+            position = uploaded_file.tell() if uploaded_file.seekable() else None
+        except (AttributeError, OSError):
+            position = None
+        if position is None:
+            return None
+        if isinstance(uploaded_file, io.TextIOBase):
+            # Em modo texto só o início pode ser relido com segurança
+            n_samples = 0
+            size = head_size + 1
+        else:
+            size = uploaded_file.seek(0, io.SEEK_END) - position
+        
+        def read_at(offset, length):
+            uploaded_file.seek(position + offset)
+            return uploaded_file.read(length)
+        
+        restore = lambda: uploaded_file.seek(position)
+    
+    try:
+        head = read_at(0, head_size)
+        complete = size <= head_size
+        samples = []
+        if not complete and n_samples > 0:
+            rng = random.Random(size)
+            offsets = sorted(rng.randrange(head_size, size) for _ in range(n_samples))
+            samples = [read_at(offset, sample_size) for offset in offsets]
+        return head, samples, complete
+    finally:
+        if restore is not None:
+            restore()
+
+
+def _complete_lines(block, skip_first: bool, keep_last: bool):
+    """
+    Recorta um trecho lido para conter apenas linhas completas.
+    
+    Args:
+        block: Trecho em str ou bytes
+        skip_first: Se True, descarta o texto até a primeira quebra de linha
+        keep_last: Se True, mantém a última linha mesmo sem quebra de linha
+        
+    Returns:
+        Trecho recortado (vazio se não houver linha completa)
+    """
+    newline = '\n' if isinstance(block, str) else b'\n'
+    if skip_first:
+        first = block.find(newline)
+        block = block[first + 1:] if first >= 0 else block[:0]
+    if not keep_last:
+        last = block.rfind(newline)
+        block = block[:last + 1] if last >= 0 else block[:0]
+    return block
+
+
+def _detect_encoding(head: bytes) -> str:
+    """
+    Detecta a codificação do arquivo a partir do seu início.
+    
+    Args:
+        head: Primeiros bytes do arquivo, terminando em fim de linha
+        
+    Returns:
+        str: 'utf-8-sig' (com BOM), 'utf-8' ou 'latin-1'
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def _detect_delimiter(lines: List[str]) -> str:
+    """
+    Detecta o delimitador a partir das primeiras linhas do arquivo.
+    
+    A vírgula tem preferência sempre que aparece o mesmo número de vezes em
+    todas as linhas, mantendo o comportamento padrão do pd.read_csv.
+    
+    Args:
+        lines: Primeiras linhas do arquivo
+        
+    Returns:
+        str: Delimitador detectado (',' se nenhum for identificado)
+    """
+    comma_counts = {line.count(',') for line in lines}
+    if len(comma_counts) == 1 and comma_counts.pop() > 0:
+        return ','
+    try:
+        delimiter = csv.Sniffer().sniff('\n'.join(lines), delimiters=_SNIFF_DELIMITERS).delimiter
+    except csv.Error:
+        return ','
+    return delimiter if lines and delimiter in lines[0] else ','
+
+
+def _detect_date_format(values: pd.Series) -> Optional[str]:
+    """
+    Verifica se uma coluna de texto da amostra contém datas.
+    
+    O primeiro valor pode ser ambíguo (01/03/2024 é 1º de março ou 3 de
+    janeiro), então os formatos com mês primeiro e com dia primeiro são
+    testados na amostra inteira e vence o que converte mais valores.
+    
+    Args:
+        values: Valores não nulos da coluna na amostra
+        
+    Returns:
+        Optional[str]: Formato das datas (ex.: '%Y-%m-%d'), ou None
+    """
+    first = str(values.iloc[0])
+    best_format, best_ratio = None, 0.0
+    for dayfirst in (False, True):
+        # O aviso do pandas sobre dayfirst não se aplica: o formato é conferido abaixo
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            date_format = guess_datetime_format(first, dayfirst=dayfirst)
+        if date_format is None or date_format == best_format:
+            continue
+        ratio = pd.to_datetime(values, format=date_format, errors='coerce').notna().mean()
+        if ratio > best_ratio:
+            best_format, best_ratio = date_format, ratio
+    return best_format if best_ratio >= _DATE_MATCH_RATIO else None
+
+
+def sniff_csv_schema(uploaded_file,
+                     sample_kb: float = DEFAULT_SNIFF_KB,
+                     n_samples: int = DEFAULT_SNIFF_SAMPLES) -> Dict[str, Any]:
+    """
+    Detecta o esquema de um CSV a partir de uma amostra, sem ler o arquivo todo.
+    
+    Lê os primeiros ``sample_kb`` KB e ``n_samples`` trechos em posições
+    aleatórias do arquivo e infere delimitador, codificação, cabeçalho, tipos
+    e colunas que provavelmente contêm datas. Os tipos podem ser repassados à
+    leitura completa (ver schema_read_options), que assim não precisa inferi-los.
+    
+    Args:
+        uploaded_file: Arquivo CSV, string com dados CSV, ou file-like object
+        sample_kb: KB lidos do início do arquivo
+        n_samples: Quantidade de trechos aleatórios lidos além do início
+        
+    Returns:
+        Dict contendo:
+            - delimiter: Delimitador detectado
+            - encoding: Codificação detectada (None para strings)
+            - has_header: Se a primeira linha parece ser um cabeçalho
+            - columns: Nomes das colunas
+            - dtypes: Dict coluna -> tipo inferido ('int64', 'float64' ou 'object')
+            - date_columns: Dict coluna -> formato das datas prováveis
+            - sampled_rows: Linhas analisadas na amostra
+    """
+    schema = {
+        'delimiter': ',',
+        'encoding': None,
+        'has_header': True,
+        'columns': [],
+        'dtypes': {},
+        'date_columns': {},
+        'sampled_rows': 0
+    }
+    
+    head_size = max(int(sample_kb * 1024), 1024)
+    samples = _read_csv_samples(uploaded_file, head_size, n_samples, max(head_size // 4, 1024))
+    if samples is None:
+        return schema
+    head, random_blocks, complete = samples
+    
+    head = _complete_lines(head, skip_first=False, keep_last=complete)
+    if isinstance(head, bytes):
+        schema['encoding'] = _detect_encoding(head)
+        head = head.decode(schema['encoding'])
+    
+    lines = head.splitlines()[:20]
+    if not lines:
+        return schema
+    schema['delimiter'] = _detect_delimiter(lines)
+    try:
+        schema['has_header'] = csv.Sniffer().has_header('\n'.join(lines))
+    except csv.Error:
+        pass
+    
+    text = head if head.endswith('\n') else head + '\n'
+    # Campos entre aspas podem ter quebras de linha, o que torna os trechos
+    # aleatórios ambíguos; nesse caso apenas o início do arquivo é usado
+    if random_blocks and '"' not in head:
+        n_fields = lines[0].count(schema['delimiter'])
+        for block in random_blocks:
+            block = _complete_lines(block, skip_first=True, keep_last=False)
+            if isinstance(block, bytes):
+                block = block.decode(schema['encoding'], errors='replace')
+            text += ''.join(line for line in block.splitlines(keepends=True)
+                            if line.count(schema['delimiter']) == n_fields)
+    
+    try:
+        sample_df = pd.read_csv(io.StringIO(text), sep=schema['delimiter'], low_memory=False)
+    except Exception:
+        return schema
+    
+    schema['columns'] = sample_df.columns.tolist()
+    schema['sampled_rows'] = len(sample_df)
+    if not sample_df.columns.is_unique:
+        return schema
+    
+    for col in sample_df.columns:
+        values = sample_df[col].dropna()
+        if values.empty or is_bool_dtype(values.dtype):
+            continue
+        if is_integer_dtype(values.dtype):
+            schema['dtypes'][col] = 'int64'
+        elif is_float_dtype(values.dtype):
+            schema['dtypes'][col] = 'float64'
+        elif is_object_dtype(values.dtype):
+            schema['dtypes'][col] = 'object'
+            date_format = _detect_date_format(values)
+            if date_format is not None:
+                schema['date_columns'][col] = date_format
+    
+    return schema
+
+
+def schema_read_options(schema: Optional[Dict[str, Any]],
+                        dtype_backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Converte o esquema detectado em argumentos para pd.read_csv.
+    
+    Os tipos só são repassados com o backend NumPy padrão; com tipos Arrow o
+    próprio backend faz a inferência.
+    
+    Args:
+        schema: Esquema retornado por sniff_csv_schema (ou None)
+        dtype_backend: Backend de tipos usado na leitura
+        
+    Returns:
+        Dict com 'sep', 'encoding' e 'dtype', quando aplicáveis
+    """
+    if not schema:
+        return {}
+    
+    options = {}
+    if schema['delimiter'] != ',':
+        options['sep'] = schema['delimiter']
+    if schema['encoding'] not in (None, 'utf-8'):
+        options['encoding'] = schema['encoding']
+    if schema['dtypes'] and dtype_backend is None:
+        options['dtype'] = dict(schema['dtypes'])
+    return options
+
+
+def get_schema_details(schema: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Cria DataFrame com os tipos inferidos na amostra de cada coluna.
+    
+    Args:
+        schema: Esquema retornado por sniff_csv_schema
+        
+    Returns:
+        pd.DataFrame: DataFrame com colunas 'Coluna', 'Tipo Inferido' e 'Data Provável'
+    """
+    return pd.DataFrame({
+        'Coluna': schema['columns'],
+        'Tipo Inferido': [schema['dtypes'].get(col, 'indefinido') for col in schema['columns']],
+        'Data Provável': [schema['date_columns'].get(col, '') for col in schema['columns']]
+    })
+
+
+def iter_csv_chunks(uploaded_file,
+                    memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                    chunk_rows: Optional[int] = None,
+                    dtype_backend: Optional[str] = None,
+                    schema: Optional[Dict[str, Any]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê um arquivo CSV em blocos, produzindo DataFrames parciais à medida que são lidos.
+    
+    O primeiro bloco tem no máximo ``_PROBE_ROWS`` linhas e serve para estimar o
+    custo em memória de cada linha. Os blocos seguintes são dimensionados para
+    caber em ``memory_budget_mb``, de modo que o pico de memória do parsing
+    depende do orçamento e não do tamanho do arquivo. A leitura em blocos usa
+    sempre o parser C, pois o motor pyarrow não suporta ``chunksize``.
+    
+    Se os tipos do esquema não servirem para algum bloco, a leitura continua a
+    partir desse bloco com inferência de tipos do pandas.
+    
+    Args:
+        uploaded_file: Arquivo CSV, string com dados CSV, ou file-like object
+        memory_budget_mb: Orçamento de memória por bloco, em MB
+        chunk_rows: Tamanho fixo do bloco em linhas (ignora o orçamento se informado)
+        dtype_backend: Backend de tipos (ver resolve_parse_options)
+        schema: Esquema detectado por sniff_csv_schema (delimitador, codificação e tipos)
+        
+    Yields:
+        pd.DataFrame: Blocos consecutivos do arquivo, com índice contínuo
+        
+    Raises:
+        Exception: Se houver erro na leitura do arquivo CSV
+    """
+    try:
+        options = resolve_parse_options("c", dtype_backend)
+        options.update(schema_read_options(schema, dtype_backend))
+        position = _source_position(uploaded_file)
+        rows = chunk_rows
+        yielded = 0
+        while True:
+            # Ao recomeçar, pula as linhas já entregues e mantém o índice contínuo
+            offset = yielded
+            skiprows = range(1, offset + 1) if offset else None
+            try:
+                with _open_csv_source(uploaded_file) as source, \
+                        pd.read_csv(source, chunksize=rows or _PROBE_ROWS, skiprows=skiprows, **options) as reader:
+                    while True:
+                        try:
+                            with np.errstate(invalid='ignore'):
+                                chunk = reader.get_chunk(rows)
+                        except StopIteration:
+                            return
+                        if rows is None:
+                            rows = _rows_per_chunk(chunk, memory_budget_mb)
+                        if offset:
+                            chunk.index = chunk.index + offset
+                        yielded += len(chunk)
+                        yield chunk
+            except pd.errors.ParserError:
+                # Arquivo malformado: ler de novo sem os tipos daria o mesmo erro
+                raise
+            except ValueError:
+                if 'dtype' not in options:
+                    raise
+                # Tipos da amostra não valem para o restante do arquivo
+                del options['dtype']
+                if position is not None:
+                    uploaded_file.seek(position)
+    except Exception as e:
+        raise Exception(f"Erro ao carregar CSV: {str(e)}")
+
+
+def _common_chunk_dtype(dtypes: List[Any]) -> Optional[np.dtype]:
+    """
+    Tipo NumPy comum de uma coluna em todos os blocos, como o de pd.concat.
+    
+    Retorna None quando a coluna precisa de pd.concat: tipos de extensão
+    (nullable, Arrow, datas com fuso) ou tipos NumPy diferentes que não sejam
+    só inteiros com sinal e floats (ex.: int64 em um bloco e object em outro).
+    """
+    if not all(isinstance(dtype, np.dtype) for dtype in dtypes):
+        return None
+    first = dtypes[0]
+    if all(dtype == first for dtype in dtypes):
+        return first
+    if all(dtype.kind in "if" for dtype in dtypes):
+        return np.result_type(*dtypes)
+    return None
+
+
+def concat_csv_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Junta os blocos produzidos por iter_csv_chunks em um único DataFrame.
+    
+    As colunas do resultado são alocadas uma única vez e cada bloco é copiado
+    para elas e liberado em seguida (a lista é esvaziada), então o pico de
+    memória fica perto do tamanho final mais um bloco, e não do dobro do
+    DataFrame como em pd.concat. Colunas cujo tipo não tem um tipo NumPy
+    comum entre os blocos (ver _common_chunk_dtype) ainda são juntadas por
+    pd.concat; só elas ocupam o dobro durante a junção.
+    
+    Args:
+        chunks: Lista de blocos na ordem em que foram lidos (esvaziada pela função)
+        
+    Returns:
+        pd.DataFrame: DataFrame completo com índice sequencial
+    """
+    if len(chunks) == 1:
+        return chunks.pop()
+    columns = chunks[0].columns if chunks else None
+    if columns is None or not all(chunk.columns.equals(columns) for chunk in chunks):
+        df = pd.concat(chunks, ignore_index=True)
+        chunks.clear()
+        return df
+    
+    n_rows = sum(len(chunk) for chunk in chunks)
+    dtypes = [_common_chunk_dtype([chunk.dtypes.iloc[i] for chunk in chunks]) for i in range(len(columns))]
+    # Por coluna: array do resultado, ou lista de partes juntadas no final
+    arrays = [np.empty(n_rows, dtype=dtype) if dtype is not None else [] for dtype in dtypes]
+    
+    chunks.reverse()
+    start = 0
+    while chunks:
+        chunk = chunks.pop()
+        end = start + len(chunk)
+        for i, array in enumerate(arrays):
+            if isinstance(array, list):
+                # Cópia própria, para não manter vivo o bloco inteiro do pedaço
+                array.append(chunk.iloc[:, i].copy())
+            else:
+                array[start:end] = chunk.iloc[:, i].to_numpy()
+        start = end
+        del chunk
+    
+    # Séries com o tipo explícito: o construtor não reinfere (nem copia) colunas object
+    data = {i: pd.concat(array, ignore_index=True) if isinstance(array, list)
+            else pd.Series(array, dtype=array.dtype, copy=False)
+            for i, array in enumerate(arrays)}
+    df = pd.DataFrame(data, copy=False)
+    df.columns = columns
+    return df
+
+
+def load_csv_data(uploaded_file,
+                  memory_budget_mb: Optional[float] = None,
+                  engine: str = "c",
+                  dtype_backend: Optional[str] = None,
+                  compact: bool = False,
+                  category_ratio: float = DEFAULT_CATEGORY_RATIO,
+                  schema: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
     """
     Carrega dados de um arquivo CSV em um DataFrame.
     
     Args:
         uploaded_file: Arquivo CSV, string com dados CSV, ou file-like object
+        memory_budget_mb: Se informado, lê o arquivo em blocos limitados a esse
+            orçamento de memória (ver iter_csv_chunks)
+        engine: Motor de parsing ("c" ou "pyarrow", com fallback para "c")
+        dtype_backend: Backend de tipos (None, "numpy_nullable" ou "pyarrow")
+        compact: Se True, reduz os tipos após a carga (ver compact_dataframe)
+        category_ratio: Razão de cardinalidade usada no modo compacto
+        schema: Esquema detectado por sniff_csv_schema; os tipos inferidos na
+            amostra são usados na leitura, com nova tentativa sem eles se a
+            conversão falhar (erros de estrutura do arquivo não são repetidos)
         
     Returns:
         pd.DataFrame: DataFrame com os dados do arquivo CSV
         
     Raises:
-        Exception: Se houver erro na leitura do arquivo CSV
+        Exception: Se houver erro na leitura do arquivo CSV
+    """
+    if memory_budget_mb is not None:
+        chunks = iter_csv_chunks(uploaded_file, memory_budget_mb, dtype_backend=dtype_backend, schema=schema)
+        df = concat_csv_chunks(list(chunks))
+    else:
+        try:
+            options = resolve_parse_options(engine, dtype_backend)
+            options.update(schema_read_options(schema, dtype_backend))
+            position = _source_position(uploaded_file)
+            try:
+                with _open_csv_source(uploaded_file) as source, np.errstate(invalid='ignore'):
+                    df = pd.read_csv(source, **options)
+            except pd.errors.ParserError:
+                # Arquivo malformado: ler de novo sem os tipos daria o mesmo erro
+                raise
+            except ValueError:
+                if 'dtype' not in options:
+                    raise
+                # Tipos da amostra não valem para o arquivo todo: o pandas infere
+                del options['dtype']
+                if position is not None:
+                    uploaded_file.seek(position)
+                with _open_csv_source(uploaded_file) as source:
+                    df = pd.read_csv(source, **options)
+        except Exception as e:
+            raise Exception(f"Erro ao carregar CSV: {str(e)}")
+    
+    if compact:
+        df = compact_dataframe(df, category_ratio)['dataframe']
+    return df
+
+
+def _downcast_column(series: pd.Series, category_ratio: float) -> pd.Series:
+    """
+    Reduz o tipo de uma coluna sem perder informação.
+    
+    Inteiros vão para o menor tipo (sem sinal quando não há negativos), floats
+    vão para float32 apenas quando todos os valores são representados exatamente
+    e colunas de texto com poucos valores distintos viram 'category'.
+    
+    Args:
+        series: Coluna a ser reduzida
+        category_ratio: Razão máxima valores únicos / linhas para usar 'category'
+        
+    Returns:
+        pd.Series: Coluna com o tipo reduzido (ou a própria coluna)
+    """
+    # Tipos de extensão (Arrow, nullable, category) já têm representação própria
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) or is_bool_dtype(series.dtype):
+        return series
+    
+    if is_integer_dtype(series.dtype):
+        if len(series) == 0:
+            return series
+        downcast = 'unsigned' if series.min() >= 0 else 'integer'
+        return pd.to_numeric(series, downcast=downcast)
+    
+    if is_float_dtype(series.dtype) and series.dtype.itemsize > 4:
+        values = series.to_numpy()
+        with np.errstate(over='ignore'):
+            reduced = values.astype(np.float32)
+        if np.array_equal(reduced.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(reduced, index=series.index, name=series.name)
+        return series
+    
+    if is_object_dtype(series.dtype) and len(series) > 0:
+        if series.nunique() / len(series) <= category_ratio:
+            return series.astype('category')
+    
+    return series
+
+
+def compact_dataframe(df: pd.DataFrame, category_ratio: float = DEFAULT_CATEGORY_RATIO) -> Dict[str, Any]:
+    """
+    Reduz o uso de memória de um DataFrame convertendo os tipos das colunas.
+    
+    Colunas numéricas reduzidas continuam sendo reconhecidas por
+    get_numeric_columns e calculate_numeric_statistics.
+    
+    Args:
+        df: DataFrame a ser compactado
+        category_ratio: Razão máxima valores únicos / linhas para converter
+            colunas de texto em 'category'
+        
+    Returns:
+        Dict contendo:
+            - dataframe: DataFrame compactado
+            - memory_before_kb: Memória antes da conversão, em KB
+            - memory_after_kb: Memória depois da conversão, em KB
+            - converted: Dict coluna -> "tipo_antigo → tipo_novo"
+    """
+    memory_before = df.memory_usage(deep=True).sum()
+    
+    columns = {}
+    converted = {}
+    for i, col in enumerate(df.columns):
+        series = df.iloc[:, i]
+        reduced = _downcast_column(series, category_ratio)
+        if reduced.dtype != series.dtype:
+            converted[col] = f"{series.dtype} → {reduced.dtype}"
+        columns[i] = reduced
+    
+    compacted = pd.concat(columns, axis=1) if columns else df.copy()
+    compacted.columns = df.columns
+    
+    return {
+        'dataframe': compacted,
+        'memory_before_kb': round(memory_before / 1024, 1),
+        'memory_after_kb': round(compacted.memory_usage(deep=True).sum() / 1024, 1),
+        'converted': converted
+    }
+
+
+def compute_content_hash(uploaded_file) -> str:
+    """
+    Calcula um hash rápido (BLAKE2b) do conteúdo de um arquivo CSV.
+    
+    Buffers em memória são lidos sem cópia; strings são codificadas em UTF-8
+    aos pedaços, gerando o mesmo hash que os bytes equivalentes.
+    
+    Args:
+        uploaded_file: Arquivo CSV, string com dados CSV, ou file-like object
+        
+    Returns:
+        str: Hash hexadecimal do conteúdo
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    if isinstance(uploaded_file, str):
+        for start in range(0, len(uploaded_file), _HASH_BLOCK_SIZE):
+            hasher.update(uploaded_file[start:start + _HASH_BLOCK_SIZE].encode('utf-8'))
+    elif isinstance(uploaded_file, (bytes, bytearray, memoryview)):
+        hasher.update(uploaded_file)
+    elif hasattr(uploaded_file, 'getbuffer'):
+        with uploaded_file.getbuffer() as view:
+            hasher.update(view[uploaded_file.tell():])
+    else:
+        position = uploaded_file.tell()
+        while True:
+            block = uploaded_file.read(_HASH_BLOCK_SIZE)
+            if not block:
+                break
+            hasher.update(block.encode('utf-8') if isinstance(block, str) else block)
+        uploaded_file.seek(position)
+    return hasher.hexdigest()
+
+
+class ParseCache:
+    """
+    Cache LRU de DataFrames já carregados, limitado por orçamento de bytes.
+    
+    As entradas são indexadas pelo hash do conteúdo do arquivo mais as opções
+    de parsing, de modo que recarregar o mesmo arquivo não exige novo parsing.
+    Para uploads do Streamlit, o hash é memorizado por ``file_id`` e uma nova
+    execução do script com o mesmo arquivo custa O(1).
+    
+    Os DataFrames devolvidos são compartilhados entre as execuções e não
+    devem ser modificados no local.
+    """
+    
+    def __init__(self, max_bytes: int = int(DEFAULT_PARSE_CACHE_MB * 1024 * 1024), max_digests: int = 64):
+        self.max_bytes = max_bytes
+        self.max_digests = max_digests
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._digests: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def total_bytes(self) -> int:
+        """Total de bytes ocupados pelos DataFrames em cache."""
+        return sum(nbytes for _, nbytes in self._entries.values())
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def make_key(self, uploaded_file, **options) -> str:
+        """
+        Monta a chave de cache para um arquivo e suas opções de parsing.
+        
+        Args:
+            uploaded_file: Arquivo CSV, string com dados CSV, ou file-like object
+            **options: Opções de parsing que alteram o DataFrame resultante
+            
+        Returns:
+            str: Chave no formato "<hash do conteúdo>-<hash das opções>"
+        """
+        file_id = getattr(uploaded_file, 'file_id', None)
+        memo_key = (file_id, getattr(uploaded_file, 'size', None))
+        
+        with self._lock:
+            digest = self._digests.get(memo_key) if file_id is not None else None
+            if digest is not None:
+                self._digests.move_to_end(memo_key)
+        
+        if digest is None:
+            digest = compute_content_hash(uploaded_file)
+            if file_id is not None:
+                with self._lock:
+                    self._digests[memo_key] = digest
+                    while len(self._digests) > self.max_digests:
+                        self._digests.popitem(last=False)
+        
+        options_repr = repr(sorted(options.items()))
+        options_digest = hashlib.blake2b(options_repr.encode('utf-8'), digest_size=4).hexdigest()
+        return f"{digest}-{options_digest}"
+    
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Busca um DataFrame no cache, contabilizando acerto ou falha.
+        
+        Args:
+            key: Chave gerada por make_key
+            
+        Returns:
+            O DataFrame em cache ou None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        """
+        Armazena um DataFrame, descartando os menos usados se exceder o orçamento.
+        
+        DataFrames maiores que o orçamento inteiro não são armazenados.
+        
+        Args:
+            key: Chave gerada por make_key
+            df: DataFrame carregado
+        """
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (df, nbytes)
+            while self.total_bytes > self.max_bytes:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove todas as entradas e zera os contadores."""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class ColumnarDiskCache:
+    """
+    Cache em disco de DataFrames já carregados, em formato Feather (Arrow IPC).
+    
+    Cada DataFrame é gravado sem compressão em ``<cache_dir>/<chave>.feather``,
+    usando a mesma chave do ParseCache. Cargas seguintes do mesmo conteúdo
+    mapeiam o arquivo em memória em vez de refazer o parsing do CSV. Quando o
+    total ultrapassa o orçamento, os arquivos acessados há mais tempo são
+    removidos. Sem pyarrow instalado o cache fica desativado.
+    """
+    
+    SUFFIX = '.feather'
+    
+    def __init__(self, cache_dir: str = DEFAULT_DISK_CACHE_DIR,
+                 max_bytes: int = int(DEFAULT_DISK_CACHE_MB * 1024 * 1024)):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+    
+    @property
+    def enabled(self) -> bool:
+        """Indica se o cache pode ser usado (requer pyarrow)."""
+        return is_pyarrow_available()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{self.SUFFIX}")
+    
+    def _list_files(self) -> List[os.DirEntry]:
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                return [entry for entry in entries if entry.is_file() and entry.name.endswith(self.SUFFIX)]
+        except FileNotFoundError:
+            return []
+    
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Carrega um DataFrame do disco, se existir, via memory-map.
+        
+        Args:
+            key: Chave gerada por ParseCache.make_key
+            
+        Returns:
+            O DataFrame armazenado ou None
+        """
+        path = self._path(key)
+        if not self.enabled or not os.path.exists(path):
+            return None
+        
+        from pyarrow import feather
+        
+        try:
+            table = feather.read_table(path, memory_map=True)
+            metadata = table.schema.metadata or {}
+            if metadata.get(_ARROW_BACKEND_METADATA) == b'pyarrow':
+                df = table.to_pandas(types_mapper=pd.ArrowDtype)
+            else:
+                df = table.to_pandas()
+                # O Arrow devolve None nos nulos de texto; o parser do CSV usa NaN
+                for col in df.columns[df.dtypes == object]:
+                    if df[col].hasnans:
+                        df[col] = df[col].fillna(float('nan'))
+            os.utime(path)  # Marca o acesso para o descarte LRU
+            return df
+        except Exception:
+            return None
+    
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        """
+        Grava um DataFrame no disco e aplica o descarte por tamanho.
+        
+        DataFrames que o Arrow não consegue representar (ex.: colunas com tipos
+        misturados) simplesmente não são armazenados.
+        
+        Args:
+            key: Chave gerada por ParseCache.make_key
+            df: DataFrame carregado
+            
+        Returns:
+            bool: True se o arquivo foi gravado
+        """
+        if not self.enabled:
+            return False
+        
+        import pyarrow as pa
+        from pyarrow import feather
+        
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            table = pa.Table.from_pandas(df)
+            if len(df.columns) > 0 and all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes):
+                metadata = dict(table.schema.metadata or {})
+                metadata[_ARROW_BACKEND_METADATA] = b'pyarrow'
+                table = table.replace_schema_metadata(metadata)
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        
+        self.evict()
+        return True
+    
+    def evict(self) -> int:
+        """
+        Remove os arquivos acessados há mais tempo até caber no orçamento.
+        
+        Returns:
+            int: Quantidade de arquivos removidos
+        """
+        files = sorted(self._list_files(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in files)
+        removed = 0
+        for entry in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+    
+    def info(self) -> Dict[str, Any]:
+        """
+        Resume o conteúdo do cache em disco.
+        
+        Returns:
+            Dict contendo:
+                - cache_dir: Diretório do cache
+                - entries: DataFrame com chave, tamanho e último acesso de cada arquivo
+                - total_mb: Tamanho total ocupado, em MB
+                - max_mb: Orçamento configurado, em MB
+        """
+        files = sorted(self._list_files(), key=lambda entry: entry.stat().st_mtime, reverse=True)
+        entries = pd.DataFrame({
+            'Chave': [entry.name[:-len(self.SUFFIX)] for entry in files],
+            'Tamanho (MB)': [round(entry.stat().st_size / 1024 / 1024, 2) for entry in files],
+            'Último acesso': [time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.stat().st_mtime))
+                              for entry in files]
+        })
+        return {
+            'cache_dir': self.cache_dir,
+            'entries': entries,
+            'total_mb': round(sum(entry.stat().st_size for entry in files) / 1024 / 1024, 2),
+            'max_mb': round(self.max_bytes / 1024 / 1024, 2)
+        }
+    
+    def purge(self, key: Optional[str] = None) -> int:
+        """
+        Remove arquivos do cache em disco.
+        
+        Args:
+            key: Chave a remover; se None, remove todo o cache
+            
+        Returns:
+            int: Quantidade de arquivos removidos
+        """
+        paths = [self._path(key)] if key is not None else [entry.path for entry in self._list_files()]
+        removed = 0
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+# Caches compartilhados pelas execuções do app
+default_parse_cache = ParseCache()
+default_disk_cache = ColumnarDiskCache()
+
+
+def load_csv_data_cached(uploaded_file, cache: Optional[ParseCache] = None,
+                         disk_cache: Optional[ColumnarDiskCache] = None,
+                         **options) -> Tuple[pd.DataFrame, bool]:
+    """
+    Carrega um CSV reaproveitando o resultado de cargas anteriores do mesmo conteúdo.
+    
+    Procura primeiro no cache em memória, depois no cache em disco (se
+    informado) e só então faz o parsing, gravando o resultado nos dois caches.
+    
+    Args:
+        uploaded_file: Arquivo CSV, string com dados CSV, ou file-like object
+        cache: Cache em memória a utilizar (padrão: default_parse_cache)
+        disk_cache: Cache em disco opcional (ex.: default_disk_cache)
+        **options: Opções repassadas para load_csv_data (engine, dtype_backend)
+        
+    Returns:
+        Tuple[pd.DataFrame, bool]: (DataFrame, veio_de_algum_cache)
+        
+    Raises:
+        Exception: Se houver erro na leitura do arquivo CSV
+    """
+    cache = cache if cache is not None else default_parse_cache
+    key = cache.make_key(uploaded_file, **options)
+    df = cache.get(key)
+    if df is not None:
+        return df, True
+    
+    if disk_cache is not None:
+        df = disk_cache.get(key)
+        if df is not None:
+            cache.put(key, df)
+            return df, True
+    
+    df = load_csv_data(uploaded_file, **options)
+    cache.put(key, df)
+    if disk_cache is not None:
+        disk_cache.put(key, df)
+    return df, False
+
+
+class FrameStateRegistry:
+    """
+    Estado auxiliar associado a cada DataFrame carregado, pela sua identidade.
+    
+    Guarda resultados que podem ser reaproveitados entre reruns do Streamlit
+    enquanto o mesmo objeto DataFrame estiver em uso (por exemplo, as últimas
+    buscas). A entrada some quando o DataFrame é coletado, e no máximo
+    ``max_frames`` DataFrames são mantidos, descartando o usado há mais tempo.
+    """
+    
+    def __init__(self, max_frames: int = DEFAULT_FRAME_STATES):
+        """
+        Args:
+            max_frames: Quantidade máxima de DataFrames com estado guardado
+        """
+        self.max_frames = max_frames
+        self._states: "OrderedDict[int, Tuple[weakref.ref, Dict[str, Any]]]" = OrderedDict()
+        # RLock: o callback do weakref pode rodar durante uma coleta dentro de get()
+        self._lock = threading.RLock()
+    
+    def get(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Retorna o dicionário de estado do DataFrame, criando-o se necessário.
+        
+        Args:
+            df: DataFrame dono do estado
+            
+        Returns:
+            Dict[str, Any]: Estado mutável associado ao DataFrame
+        """
+        key = id(df)
+        with self._lock:
+            entry = self._states.get(key)
+            if entry is not None and entry[0]() is df:
+                self._states.move_to_end(key)
+                return entry[1]
+            
+            state: Dict[str, Any] = {}
+            ref = weakref.ref(df, lambda dead_ref, key=key: self._discard(key, dead_ref))
+            self._states[key] = (ref, state)
+            while len(self._states) > self.max_frames:
+                self._states.popitem(last=False)
+            return state
+    
+    def _discard(self, key: int, dead_ref: weakref.ref) -> None:
+        """Remove o estado de um DataFrame coletado."""
+        with self._lock:
+            entry = self._states.get(key)
+            if entry is not None and entry[0] is dead_ref:
+                del self._states[key]
+    
+    def clear(self) -> None:
+        """Descarta o estado de todos os DataFrames."""
+        with self._lock:
+            self._states.clear()
+    
+    def states(self) -> List[Dict[str, Any]]:
+        """Retorna o estado de cada DataFrame ainda vivo."""
+        with self._lock:
+            return [state for ref, state in self._states.values() if ref() is not None]
+    
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+default_frame_states = FrameStateRegistry()
+
+# Relógio lógico usado para descartar o texto de busca usado há mais tempo
+_search_text_clock = 0
+_search_text_lock = threading.Lock()
+
+
+def _render_text(series: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna para texto, como usado na busca.
+    
+    Colunas com tipos de extensão (ex.: Arrow) exibem nulos como '<NA>'; aqui
+    eles são normalizados para 'nan', o mesmo texto gerado pelas colunas NumPy,
+    para que a busca retorne os mesmos resultados em qualquer backend.
+    
+    Args:
+        series: Coluna a ser convertida
+        
+    Returns:
+        pd.Series: Coluna com a representação textual de cada célula
+    """
+    text = series.astype(str)
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and series.hasnans:
+        text = text.mask(series.isna(), 'nan')
+    return text
+
+
+def _lower_search_text(series: pd.Series) -> pd.Series:
+    """
+    Gera o texto em minúsculas de uma coluna, no formato guardado para a busca.
+    
+    Com PyArrow disponível o texto fica em uma coluna 'string[pyarrow]', mais
+    compacta que objetos Python e com busca literal vetorizada.
+    
+    Args:
+        series: Coluna a ser convertida
+        
+    Returns:
+        pd.Series: Texto em minúsculas, com índice posicional
+    """
+    text = _render_text(series).reset_index(drop=True)
+    if is_pyarrow_available():
+        text = text.astype(pd.StringDtype("pyarrow"))
+    return text.str.lower()
+
+
+def get_search_text(df: pd.DataFrame, position: int,
+                    max_mb: float = DEFAULT_SEARCH_TEXT_MB) -> pd.Series:
+    """
+    Retorna o texto em minúsculas de uma coluna, gerando-o na primeira busca.
+    
+    O texto fica no estado do DataFrame em default_frame_states e é reutilizado
+    pelas buscas seguintes. Numéricos e datas guardam o texto exibido, para que
+    a busca continue encontrando valores como "2023" ou "3.5". Quando a soma de
+    todos os DataFrames passa de ``max_mb``, as colunas usadas há mais tempo
+    são descartadas (e geradas de novo se forem buscadas outra vez).
+    
+    Args:
+        df: DataFrame buscado
+        position: Posição da coluna em df
+        max_mb: Orçamento em MB do texto guardado
+        
+    Returns:
+        pd.Series: Texto em minúsculas da coluna, com índice posicional
+    """
+    global _search_text_clock
+    columns = default_frame_states.get(df).setdefault('search_text', {})
+    with _search_text_lock:
+        _search_text_clock += 1
+        entry = columns.get(position)
+        if entry is not None:
+            entry[2] = _search_text_clock
+            return entry[0]
+    
+    text = _lower_search_text(df.iloc[:, position])
+    nbytes = int(text.memory_usage(index=False, deep=True))
+    with _search_text_lock:
+        # [texto, bytes, último uso, índice de células exatas (ver _exact_lookup)]
+        columns[position] = [text, nbytes, _search_text_clock, None]
+        
+        # Descarta as colunas usadas há mais tempo até caber no orçamento
+        entries = [(entry[2], state_columns, key, entry[1])
+                   for state_columns in (state.get('search_text', {}) for state in default_frame_states.states())
+                   for key, entry in state_columns.items()]
+        total = sum(entry[3] for entry in entries)
+        for _, state_columns, key, size in sorted(entries, key=lambda entry: entry[0]):
+            if total <= max_mb * 1024 * 1024 or state_columns is columns and key == position:
+                break
+            state_columns.pop(key, None)
+            total -= size
+    return text
+
+
+def get_search_text_memory(df: Optional[pd.DataFrame] = None) -> Dict[str, int]:
+    """
+    Informa a memória ocupada pelo texto de busca guardado.
+    
+    Args:
+        df: DataFrame consultado (padrão: todos os DataFrames com estado)
+        
+    Returns:
+        Dict[str, int]: Quantidade de colunas ('columns') e bytes ('bytes') guardados
+    """
+    states = [default_frame_states.get(df)] if df is not None else default_frame_states.states()
+    with _search_text_lock:
+        sizes = [entry[1] for state in states for entry in state.get('search_text', {}).values()]
+    return {'columns': len(sizes), 'bytes': sum(sizes)}
+
+
+def drop_search_text(df: Optional[pd.DataFrame] = None) -> int:
+    """
+    Descarta o texto de busca guardado, por exemplo sob pouca memória.
+    
+    As próximas buscas geram o texto de novo, coluna a coluna.
+    
+    Args:
+        df: DataFrame cujo texto será descartado (padrão: todos)
+        
+    Returns:
+        int: Bytes liberados
+    """
+    states = [default_frame_states.get(df)] if df is not None else default_frame_states.states()
+    with _search_text_lock:
+        dropped = [state.pop('search_text', {}) for state in states]
+    return sum(entry[1] for columns in dropped for entry in columns.values())
+
+
+def _column_tokens(text: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extrai os pares (token, linha) de uma coluna já convertida para texto.
+    
+    Cada valor distinto é tokenizado uma única vez; as linhas são associadas
+    aos tokens do seu valor por operações vetorizadas, o que torna colunas com
+    muitos valores repetidos baratas de indexar.
+    
+    Args:
+        text: Coluna em texto minúsculo
+        
+    Returns:
+        Tuple (tokens, ids, linhas): tokens distintos da coluna e, para cada
+        ocorrência, a posição do token em ``tokens`` e a posição da linha
+    """
+    codes, values = pd.factorize(text.to_numpy())
+    exploded = pd.Series(values, dtype=object).str.findall(_TOKEN_PATTERN).explode().dropna()
+    if exploded.empty:
+        empty = np.array([], dtype=np.int64)
+        return np.array([], dtype=object), empty, empty
+    
+    value_ids = exploded.index.to_numpy()
+    token_ids, tokens = pd.factorize(exploded.to_numpy())
+    
+    # Linhas agrupadas por valor: cada par (valor, token) recebe as linhas do valor
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(values))
+    order = order[len(codes) - counts.sum():]
+    starts = np.cumsum(counts) - counts
+    repeats = counts[value_ids]
+    within = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    rows = order[np.repeat(starts[value_ids], repeats) + within]
+    
+    return np.asarray(tokens, dtype=object), np.repeat(token_ids, repeats), rows
+
+
+class SearchIndex:
+    """
+    Índice invertido token -> linhas para a busca por texto.
+    
+    Os tokens (palavras em minúsculas das células, renderizadas como na busca
+    por varredura) ficam em um array ordenado. As linhas de cada token ficam
+    contíguas em ``postings``, delimitadas por ``offsets``, então consultas por
+    palavra inteira ou por início de palavra viram buscas binárias e fatias.
+    """
+    
+    def __init__(self, tokens: np.ndarray, offsets: np.ndarray, postings: np.ndarray, n_rows: int):
+        """
+        Args:
+            tokens: Tokens distintos, em ordem crescente
+            offsets: Início de cada token em ``postings`` (len(tokens) + 1 posições)
+            postings: Posições das linhas de cada token, concatenadas
+            n_rows: Número de linhas do DataFrame indexado
+        """
+        self.tokens = tokens
+        self.offsets = offsets
+        self.postings = postings
+        self.n_rows = n_rows
+    
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> 'SearchIndex':
+        """
+        Constrói o índice a partir de todas as colunas de um DataFrame.
+        
+        Args:
+            df: DataFrame a ser indexado
+            
+        Returns:
+            SearchIndex: Índice pronto para consultas
+        """
+        n_rows = len(df)
+        column_tokens, column_ids, column_rows = [], [], []
+        offset = 0
+        for i in range(df.shape[1]):
+            tokens, ids, rows = _column_tokens(_render_text(df.iloc[:, i]).str.lower())
+            column_tokens.append(tokens)
+            column_ids.append(ids + offset)
+            column_rows.append(rows)
+            offset += len(tokens)
+        
+        if offset == 0:
+            return cls(np.array([], dtype=object), np.zeros(1, dtype=np.int64),
+                       np.array([], dtype=np.int32), n_rows)
+        
+        # Numeração global e ordenada dos tokens de todas as colunas
+        global_ids, tokens = pd.factorize(np.concatenate(column_tokens), sort=True)
+        ids = global_ids[np.concatenate(column_ids)].astype(np.int64)
+        
+        # Pares (token, linha) únicos, ordenados por token e depois por linha
+        keys = np.sort(ids * n_rows + np.concatenate(column_rows))
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        ids, rows = np.divmod(keys, n_rows)
+        
+        offsets = np.searchsorted(ids, np.arange(len(tokens) + 1))
+        postings = rows.astype(np.int32 if n_rows < 2 ** 31 else np.int64)
+        return cls(np.asarray(tokens, dtype=object), offsets, postings, n_rows)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memória aproximada do índice, em bytes."""
+        token_bytes = sum(len(token) for token in self.tokens) + 8 * len(self.tokens)
+        return token_bytes + self.offsets.nbytes + self.postings.nbytes
+    
+    def _token_range(self, term: str, prefix: bool) -> Tuple[int, int]:
+        """Faixa de posições em ``tokens`` iguais a ``term`` (ou que começam com ele)."""
+        start = np.searchsorted(self.tokens, term, side='left')
+        if prefix:
+            end = np.searchsorted(self.tokens, term + '\U0010ffff', side='left')
+        else:
+            end = np.searchsorted(self.tokens, term, side='right')
+        return int(start), int(end)
+    
+    def lookup(self, term: str, prefix: bool = False) -> np.ndarray:
+        """
+        Retorna as linhas que contêm um token.
+        
+        Args:
+            term: Token em minúsculas
+            prefix: Se True, aceita qualquer token que comece com ``term``
+            
+        Returns:
+            np.ndarray: Posições das linhas (podem se repetir em buscas por prefixo)
+        """
+        start, end = self._token_range(term, prefix)
+        return self.postings[self.offsets[start]:self.offsets[end]]
+    
+    def search(self, search_text: str, prefix: bool = False) -> Optional[np.ndarray]:
+        """
+        Busca linhas que contêm todas as palavras do texto buscado.
+        
+        Args:
+            search_text: Texto buscado (case-insensitive)
+            prefix: Se True, a última palavra é tratada como início de palavra
+            
+        Returns:
+            Optional[np.ndarray]: Máscara booleana por linha, ou None se o texto
+            não contiver nenhuma palavra
+        """
+        terms = _TOKEN_PATTERN.findall(search_text.lower())
+        if not terms:
+            return None
+        
+        mask = None
+        for i, term in enumerate(terms):
+            term_mask = np.zeros(self.n_rows, dtype=bool)
+            term_mask[self.lookup(term, prefix and i == len(terms) - 1)] = True
+            mask = term_mask if mask is None else mask & term_mask
+        return mask
+
+
+def _trigram_codes(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extrai os trigramas de um array de strings.
+    
+    As strings são convertidas em lotes para arrays Unicode de largura fixa
+    (um uint32 por caractere) e cada trigrama vira um inteiro de 63 bits com os
+    três pontos de código (21 bits cada). Os lotes agrupam strings de tamanho
+    parecido para limitar o preenchimento.
+    
+    Args:
+        values: Array de strings
+        
+    Returns:
+        Tuple (códigos, posições): código de cada trigrama e a posição da string
+        de onde ele veio
+    """
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    order = np.argsort(lengths, kind='stable')
+    order = order[lengths[order] >= 3]
+    
+    code_parts, id_parts = [], []
+    start = 0
+    while start < len(order):
+        end = min(len(order), start + max(1, _TRIGRAM_BATCH_CHARS // lengths[order[start]]))
+        while end - start > 1 and (end - start) * lengths[order[end - 1]] > _TRIGRAM_BATCH_CHARS:
+            end = start + max(1, _TRIGRAM_BATCH_CHARS // lengths[order[end - 1]])
+        batch = order[start:end]
+        width = int(lengths[batch[-1]])
+        
+        chars = np.array(values[batch].tolist(), dtype=f'<U{width}').view(np.uint32)
+        chars = chars.reshape(len(batch), width).astype(np.uint64)
+        codes = (chars[:, :-2] << np.uint64(42)) | (chars[:, 1:-1] << np.uint64(21)) | chars[:, 2:]
+        valid = chars[:, 2:] != 0
+        code_parts.append(codes[valid])
+        id_parts.append(np.broadcast_to(batch[:, None], codes.shape)[valid])
+        start = end
+    
+    if not code_parts:
+        return np.array([], dtype=np.uint64), np.array([], dtype=np.int64)
+    return np.concatenate(code_parts), np.concatenate(id_parts)
+
+
+class TrigramIndex:
+    """
+    Índice de trigramas para a busca por trecho de texto.
+    
+    Para cada coluna, os valores distintos (renderizados e em minúsculas como
+    na busca por varredura) são decompostos em trigramas, guardados em um
+    array ordenado com as listas de valores de cada trigrama (formato CSR).
+    Uma busca com 3 ou mais caracteres intersecta as listas dos trigramas do
+    texto buscado e verifica apenas os valores candidatos com str.contains, de
+    modo que o resultado é idêntico ao da varredura.
+    """
+    
+    def __init__(self, columns: List[Dict[str, np.ndarray]], n_rows: int):
+        """
+        Args:
+            columns: Para cada coluna do DataFrame, um dict com 'codes' (valor
+                distinto de cada linha), 'rows' (uma linha de cada valor),
+                'trigrams', 'offsets' e 'postings'
+            n_rows: Número de linhas do DataFrame indexado
+        """
+        self.columns = columns
+        self.n_rows = n_rows
+    
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> 'TrigramIndex':
+        """
+        Constrói o índice a partir de todas as colunas de um DataFrame.
+        
+        Args:
+            df: DataFrame a ser indexado
+            
+        Returns:
+            TrigramIndex: Índice pronto para consultas
+        """
+        columns = []
+        for i in range(df.shape[1]):
+            series = df.iloc[:, i]
+            codes, uniques = pd.factorize(series)
+            missing = codes < 0
+            
+            # Texto de cada valor distinto; nulos ganham um código próprio no final
+            text = _render_text(pd.Series(uniques, dtype=series.dtype)).str.lower().to_numpy(dtype=object)
+            if missing.any():
+                first_missing = int(np.argmax(missing))
+                missing_text = _render_text(series.iloc[[first_missing]]).str.lower().to_numpy(dtype=object)
+                codes = np.where(missing, len(uniques), codes)
+                text = np.concatenate([text, missing_text])
+            
+            # Uma linha qualquer de cada valor, usada para verificar candidatos
+            rows = np.empty(len(text), dtype=np.int64)
+            rows[codes] = np.arange(len(codes))
+            
+            # Pares (trigrama, valor) únicos, ordenados por trigrama e valor
+            trigram_codes, value_ids = _trigram_codes(text)
+            order = np.lexsort((value_ids, trigram_codes))
+            trigram_codes, value_ids = trigram_codes[order], value_ids[order]
+            keep = np.ones(len(order), dtype=bool)
+            keep[1:] = (trigram_codes[1:] != trigram_codes[:-1]) | (value_ids[1:] != value_ids[:-1])
+            trigram_codes, value_ids = trigram_codes[keep], value_ids[keep]
+            
+            # Início da lista de cada trigrama (nenhum se não houver valor com 3+ caracteres)
+            first = np.ones(len(trigram_codes), dtype=bool)
+            first[1:] = trigram_codes[1:] != trigram_codes[:-1]
+            starts = np.flatnonzero(first)
+            columns.append({
+                'codes': codes.astype(np.int32 if len(text) < 2 ** 31 else np.int64),
+                'rows': rows,
+                'trigrams': trigram_codes[starts],
+                'offsets': np.append(starts, len(trigram_codes)),
+                'postings': value_ids.astype(np.int32 if len(text) < 2 ** 31 else np.int64)
+            })
+        return cls(columns, len(df))
+    
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelo índice, em bytes."""
+        return sum(array.nbytes for column in self.columns for array in column.values())
+    
+    def _candidates(self, column: Dict[str, np.ndarray], query_codes: np.ndarray) -> np.ndarray:
+        """Valores distintos da coluna que contêm todos os trigramas buscados."""
+        trigrams = column['trigrams']
+        positions = np.searchsorted(trigrams, query_codes)
+        lists = []
+        for code, position in zip(query_codes, positions):
+            if position >= len(trigrams) or trigrams[position] != code:
+                return column['postings'][:0]
+            lists.append(column['postings'][column['offsets'][position]:column['offsets'][position + 1]])
+        
+        # Começa pela lista mais curta para reduzir o custo das interseções
+        lists.sort(key=len)
+        candidates = lists[0]
+        for values in lists[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, values, assume_unique=True)
+        return candidates
+    
+    def search_columns(self, df: pd.DataFrame, search_text: str,
+                       positions: Optional[List[int]] = None) -> Optional[Dict[int, np.ndarray]]:
+        """
+        Busca o texto em qualquer posição das células, coluna a coluna.
+        
+        Args:
+            df: DataFrame indexado (usado para verificar os candidatos)
+            search_text: Texto buscado (case-insensitive)
+            positions: Posições das colunas buscadas (padrão: todas)
+            
+        Returns:
+            Optional[Dict[int, np.ndarray]]: Máscara booleana por linha de cada
+            coluna, ou None se a busca tiver menos de 3 caracteres
+        """
+        if len(search_text) < 3:
+            return None
+        query = search_text.lower()
+        query_codes, _ = _trigram_codes(np.array([query], dtype=object))
+        query_codes = np.unique(query_codes)
+        
+        column_hits = {}
+        for i in (range(len(self.columns)) if positions is None else positions):
+            column = self.columns[i]
+            column_hits[i] = np.zeros(self.n_rows, dtype=bool)
+            candidates = self._candidates(column, query_codes)
+            if len(candidates) == 0:
+                continue
+            
+            # Verifica os candidatos com a mesma lógica da varredura
+            sample = df.iloc[column['rows'][candidates], i]
+            matched = _render_text(sample).str.lower().str.contains(query, regex=False).to_numpy(dtype=bool)
+            if not matched.any():
+                continue
+            
+            hit = np.zeros(len(column['rows']), dtype=bool)
+            hit[candidates[matched]] = True
+            column_hits[i] = hit[column['codes']]
+        return column_hits
+    
+    def search(self, df: pd.DataFrame, search_text: str) -> Optional[np.ndarray]:
+        """
+        Busca linhas com o texto em qualquer posição de alguma célula.
+        
+        Args:
+            df: DataFrame indexado (usado para verificar os candidatos)
+            search_text: Texto buscado (case-insensitive)
+            
+        Returns:
+            Optional[np.ndarray]: Máscara booleana por linha, ou None se a busca
+            tiver menos de 3 caracteres
+        """
+        column_hits = self.search_columns(df, search_text)
+        if column_hits is None:
+            return None
+        return _any_hit(column_hits, self.n_rows)
+
+
+@lru_cache(maxsize=_REGEX_CACHE_SIZE)
+def compile_search_pattern(pattern: str) -> re.Pattern:
+    """
+    Compila uma expressão regular de busca (case-insensitive), uma vez por texto.
+    
+    Args:
+        pattern: Expressão regular digitada pelo usuário
+        
+    Returns:
+        re.Pattern: Expressão compilada
+        
+    Raises:
+        ValueError: Se a expressão regular for inválida
+    """
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Expressão regular inválida: {e}") from e
+
+
+def _match_text(text: pd.Series, pattern: str, regex: bool = False) -> np.ndarray:
+    """
+    Verifica quais células de um texto em minúsculas contêm a expressão.
+    
+    Textos literais são comparados diretamente, sem expressão regular (bem
+    mais rápido); expressões regulares usam o padrão compilado em cache, do
+    módulo re (o motor do PyArrow não aceita, por exemplo, lookbehind).
+    
+    Args:
+        text: Texto em minúsculas (ver get_search_text)
+        pattern: Texto ou expressão regular buscada
+        regex: Se pattern é uma expressão regular
+        
+    Returns:
+        np.ndarray: Máscara booleana por célula
+    """
+    if regex:
+        search = compile_search_pattern(pattern).search
+        values = text.to_numpy(dtype=object)
+        return np.fromiter((search(value) is not None for value in values), dtype=bool, count=len(values))
+    return text.str.contains(pattern.lower(), regex=False).to_numpy(dtype=bool)
+
+
+def _any_hit(column_hits: Dict[int, np.ndarray], n_rows: int) -> np.ndarray:
+    """Combina as máscaras de cada coluna: linhas encontradas em alguma coluna."""
+    mask = np.zeros(n_rows, dtype=bool)
+    for hits in column_hits.values():
+        mask |= hits
+    return mask
+
+
+def _scan_columns(df: pd.DataFrame, pattern: str, positions: List[int],
+                  rows: Optional[np.ndarray] = None, n_workers: int = 1,
+                  regex: bool = False) -> Dict[int, np.ndarray]:
+    """
+    Varre as colunas indicadas buscando um texto ou expressão (case-insensitive).
+    
+    Usa o texto em minúsculas guardado por get_search_text. Com ``n_workers``
+    maior que 1 e ao menos PARALLEL_SEARCH_MIN_CELLS células, o trabalho é
+    dividido em fatias de linhas de cada coluna, verificadas em threads (as
+    buscas literais do PyArrow liberam o GIL).
+    
+    Args:
+        df: DataFrame a ser varrido
+        pattern: Texto ou expressão regular buscada
+        positions: Posições das colunas varridas
+        rows: Posições das linhas a verificar (padrão: todas)
+        n_workers: Número de threads da busca
+        regex: Se pattern é uma expressão regular
+        
+    Returns:
+        Dict[int, np.ndarray]: Para cada coluna, máscara booleana com uma
+        posição por linha verificada
+        
+    Raises:
+        ValueError: Se a expressão regular for inválida
+    """
+    if regex:
+        compile_search_pattern(pattern)
+    n_rows = len(df) if rows is None else len(rows)
+    if n_workers <= 1 or n_rows * len(positions) < PARALLEL_SEARCH_MIN_CELLS:
+        column_hits = {}
+        for position in positions:
+            text = get_search_text(df, position)
+            if rows is not None:
+                text = text.iloc[rows]
+            column_hits[position] = _match_text(text, pattern, regex)
+        return column_hits
+    
+    shard_rows = max(_PARALLEL_SHARD_MIN_ROWS, -(-n_rows // n_workers))
+    
+    def match_shard(text: pd.Series, start: int) -> np.ndarray:
+        selection = slice(start, start + shard_rows) if rows is None else rows[start:start + shard_rows]
+        return _match_text(text.iloc[selection], pattern, regex)
+    
+    column_hits = {position: np.zeros(n_rows, dtype=bool) for position in positions}
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        # Cada coluna é convertida uma única vez antes de ser fatiada
+        texts = list(executor.map(lambda position: get_search_text(df, position), positions))
+        shards = [(position, start, executor.submit(match_shard, text, start))
+                  for position, text in zip(positions, texts) for start in range(0, n_rows, shard_rows)]
+        for position, start, future in shards:
+            column_hits[position][start:start + shard_rows] = future.result()
+    return column_hits
+
+
+def _exact_lookup(df: pd.DataFrame, position: int) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Retorna o índice de células inteiras de uma coluna, construindo-o uma vez.
+    
+    Cada valor distinto do texto em minúsculas recebe um código; a busca exata
+    encontra o código do texto por hash e compara apenas inteiros. O índice é
+    guardado junto do texto de get_search_text e entra no mesmo orçamento.
+    
+    Args:
+        df: DataFrame buscado
+        position: Posição da coluna em df
+        
+    Returns:
+        Tuple[np.ndarray, pd.Index]: Código de cada linha e valores distintos
+    """
+    text = get_search_text(df, position)
+    columns = default_frame_states.get(df)['search_text']
+    with _search_text_lock:
+        entry = columns.get(position)
+        if entry is not None and entry[0] is text and entry[3] is not None:
+            return entry[3]
+    
+    codes, uniques = pd.factorize(text)
+    codes = codes.astype(np.int32 if len(uniques) < np.iinfo(np.int32).max else np.int64)
+    uniques = pd.Index(np.asarray(uniques, dtype=object))
+    lookup = (codes, uniques)
+    with _search_text_lock:
+        entry = columns.get(position)
+        if entry is not None and entry[0] is text and entry[3] is None:
+            entry[3] = lookup
+            entry[1] += codes.nbytes + int(uniques.memory_usage(deep=True))
+    return lookup
+
+
+def _exact_columns(df: pd.DataFrame, search_text: str, positions: List[int]) -> Dict[int, np.ndarray]:
+    """
+    Busca células iguais ao texto (case-insensitive) nas colunas indicadas.
+    
+    Args:
+        df: DataFrame buscado
+        search_text: Conteúdo completo da célula procurada
+        positions: Posições das colunas buscadas
+        
+    Returns:
+        Dict[int, np.ndarray]: Máscara booleana por linha de cada coluna
+    """
+    query = search_text.lower()
+    column_hits = {}
+    for position in positions:
+        codes, uniques = _exact_lookup(df, position)
+        code = uniques.get_indexer([query])[0]
+        column_hits[position] = codes == code if code >= 0 else np.zeros(len(df), dtype=bool)
+    return column_hits
+
+
+def _narrow_from_history(df: pd.DataFrame, search_text: str, positions: List[int],
+                         history: List[Tuple[str, int, Tuple[int, ...], np.ndarray, Dict[int, int]]],
+                         n_workers: int = 1) -> Optional[Dict[int, np.ndarray]]:
+    """
+    Refina uma busca anterior cujo texto está contido no texto atual.
+    
+    As linhas que contêm "sao paulo" são um subconjunto das que contêm
+    "sao p", então basta verificar as linhas encontradas antes, desde que a
+    busca anterior tenha coberto todas as colunas buscadas agora.
+    
+    Args:
+        df: DataFrame buscado
+        search_text: Texto buscado agora
+        positions: Posições das colunas buscadas agora
+        history: Buscas anteriores no mesmo DataFrame, como (texto, linhas,
+            colunas, máscara, ocorrências por coluna)
+        n_workers: Número de threads da busca (ver _scan_columns)
+        
+    Returns:
+        Optional[Dict[int, np.ndarray]]: Máscara de cada coluna na busca atual,
+        ou None se nenhuma busca anterior puder ser refinada
+    """
+    query = search_text.lower()
+    best = None
+    for previous_text, n_rows, previous_positions, previous_mask, _ in history:
+        if (n_rows != len(df) or previous_text.lower() not in query
+                or not set(positions).issubset(previous_positions)):
+            continue
+        if best is None or previous_mask.sum() < best.sum():
+            best = previous_mask
+    if best is None:
+        return None
+    
+    rows = np.flatnonzero(best)
+    column_hits = {position: np.zeros(len(df), dtype=bool) for position in positions}
+    if len(rows):
+        for position, hits in _scan_columns(df, search_text, positions, rows, n_workers).items():
+            column_hits[position][rows] = hits
+    return column_hits
+
+
+def _word_patterns(terms: List[str], prefix: bool) -> List[str]:
+    """Expressões regulares de palavra inteira (ou início de palavra, na última em "prefix")."""
+    return [rf'(?<!\w){re.escape(term)}' + ('' if prefix and i == len(terms) - 1 else r'(?!\w)')
+            for i, term in enumerate(terms)]
+
+
+def _column_positions(df: pd.DataFrame, columns: Optional[List[str]]) -> List[int]:
+    """
+    Converte nomes de colunas em posições.
+    
+    Args:
+        df: DataFrame buscado
+        columns: Nomes das colunas (padrão: todas)
+        
+    Returns:
+        List[int]: Posições das colunas, na ordem do DataFrame
+        
+    Raises:
+        ValueError: Se alguma coluna não existir no DataFrame
+    """
+    if columns is None:
+        return list(range(df.shape[1]))
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas não encontradas: {missing}")
+    return [int(position) for position in np.flatnonzero(df.columns.isin(columns))]
+
+
+def search_dataframe(df: pd.DataFrame, search_text: str, mode: str = "contains",
+                     columns: Optional[List[str]] = None,
+                     index: Optional[SearchIndex] = None,
+                     trigram_index: Optional[TrigramIndex] = None,
+                     n_workers: int = 1) -> Dict[str, Any]:
+    """
+    Busca texto no DataFrame e conta as ocorrências de cada coluna.
+    
+    No modo "contains" o texto é buscado literalmente (".", "(" etc. não têm
+    significado especial) em qualquer posição das células; no modo "regex" ele
+    é uma expressão regular, compilada uma vez e mantida em cache; no modo
+    "exact" a célula inteira deve ser igual ao texto, localizada por hash. Nos
+    modos "token" e "prefix" cada palavra do texto deve aparecer inteira (ou,
+    para a última palavra em "prefix", como início de palavra) em alguma coluna
+    da linha; com um SearchIndex a consulta não percorre o DataFrame, e sem ele
+    o mesmo resultado é obtido por varredura. No modo "contains", um
+    TrigramIndex restringe a varredura às células candidatas quando o texto
+    tem 3 ou mais caracteres; sem ele, uma busca anterior no mesmo DataFrame
+    cujo texto está contido no atual (digitação incremental) é refinada em vez
+    de varrer todas as linhas.
+    
+    Com ``columns``, apenas essas colunas são convertidas e varridas. As
+    ocorrências por coluna saem da mesma varredura que gera a máscara; nos
+    modos por palavra com SearchIndex (que não separa colunas), só as linhas
+    encontradas são verificadas coluna a coluna.
+    
+    Args:
+        df: DataFrame a ser buscado
+        search_text: Texto a ser buscado (case-insensitive)
+        mode: Modo de busca (um de SEARCH_MODES)
+        columns: Colunas buscadas (padrão: todas)
+        index: Índice construído com SearchIndex.build(df), se disponível
+        trigram_index: Índice construído com TrigramIndex.build(df), se disponível
+        n_workers: Threads usadas nas varreduras de DataFrames grandes
+            (a partir de PARALLEL_SEARCH_MIN_CELLS células)
+        
+    Returns:
+        Dict[str, Any]: 'mask' (máscara booleana por linha), 'columns' (colunas
+        buscadas) e 'column_hits' (linhas encontradas em cada coluna; vazio
+        sem texto buscado)
+        
+    Raises:
+        ValueError: Se o modo de busca não for suportado, alguma coluna não
+        existir ou a expressão regular for inválida
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Modo de busca inválido: {mode}")
+    
+    positions = _column_positions(df, columns)
+    result = {'columns': [df.columns[position] for position in positions], 'column_hits': {}}
+    if not search_text or search_text.strip() == "":
+        result['mask'] = np.ones(len(df), dtype=bool)
+        return result
+    
+    counts = None
+    if mode == "contains":
+        history = default_frame_states.get(df).setdefault('search_history', [])
+        key = tuple(positions)
+        repeated = [entry for entry in history if entry[:3] == (search_text, len(df), key)]
+        if repeated:
+            mask, counts = repeated[0][3], repeated[0][4]
+        else:
+            column_hits = None
+            if trigram_index is not None and trigram_index.n_rows == len(df):
+                column_hits = trigram_index.search_columns(df, search_text, positions)
+            if column_hits is None:
+                column_hits = _narrow_from_history(df, search_text, positions, history, n_workers)
+            if column_hits is None:
+                column_hits = _scan_columns(df, search_text, positions, n_workers=n_workers)
+            mask = _any_hit(column_hits, len(df))
+            counts = {position: int(hits.sum()) for position, hits in column_hits.items()}
+        
+        # Guarda as últimas buscas (mais recente no fim) para as próximas digitações
+        history[:] = [entry for entry in history if entry[:3] != (search_text, len(df), key)][-(_SEARCH_HISTORY - 1):]
+        history.append((search_text, len(df), key, mask, counts))
+        mask = mask.copy()
+    elif mode == "regex":
+        column_hits = _scan_columns(df, search_text, positions, n_workers=n_workers, regex=True)
+    elif mode == "exact":
+        column_hits = _exact_columns(df, search_text, positions)
+    else:
+        terms = _TOKEN_PATTERN.findall(search_text.lower())
+        patterns = _word_patterns(terms, mode == "prefix")
+        if not terms:
+            # Sem palavras para procurar: busca o texto em qualquer posição
+            column_hits = _scan_columns(df, search_text, positions, n_workers=n_workers)
+        elif index is not None and index.n_rows == len(df) and len(positions) == df.shape[1]:
+            mask = index.search(search_text, mode == "prefix")
+            rows = np.flatnonzero(mask)
+            row_hits = _scan_columns(df, '|'.join(patterns), positions, rows, n_workers, regex=True)
+            counts = {position: int(hits.sum()) for position, hits in row_hits.items()}
+        else:
+            mask = np.ones(len(df), dtype=bool)
+            any_term = {position: np.zeros(len(df), dtype=bool) for position in positions}
+            for pattern in patterns:
+                term_hits = _scan_columns(df, pattern, positions, n_workers=n_workers, regex=True)
+                mask &= _any_hit(term_hits, len(df))
+                for position, hits in term_hits.items():
+                    any_term[position] |= hits
+            counts = {position: int((hits & mask).sum()) for position, hits in any_term.items()}
+    
+    if counts is None:
+        mask = _any_hit(column_hits, len(df))
+        counts = {position: int(hits.sum()) for position, hits in column_hits.items()}
+    result['mask'] = mask
+    result['column_hits'] = {df.columns[position]: count for position, count in counts.items()}
+    return result
+
+
+def get_search_mask(df: pd.DataFrame, search_text: str, mode: str = "contains",
+                    index: Optional[SearchIndex] = None,
+                    trigram_index: Optional[TrigramIndex] = None,
+                    n_workers: int = 1, columns: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Calcula a máscara de linhas que correspondem ao texto buscado.
+    
+    Args:
+        df: DataFrame a ser filtrado
+        search_text: Texto a ser buscado (case-insensitive)
+        mode: Modo de busca (ver search_dataframe)
+        index: Índice construído com SearchIndex.build(df), se disponível
+        trigram_index: Índice construído com TrigramIndex.build(df), se disponível
+        n_workers: Número de threads da busca (1 = serial)
+        columns: Colunas buscadas (padrão: todas)
+        
+    Returns:
+        np.ndarray: Máscara booleana por linha
+        
+    Raises:
+        ValueError: Se o modo de busca não for suportado, alguma coluna não
+        existir ou a expressão regular for inválida
     """
-    try:
-        # Se for string, criar StringIO
-        if isinstance(uploaded_file, str):
-            return pd.read_csv(io.StringIO(uploaded_file))
-        # Se for bytes, criar BytesIO  
-        elif isinstance(uploaded_file, bytes):
-            return pd.read_csv(io.BytesIO(uploaded_file))
-        # Caso contrário, assumir que é file-like object
-        else:
-            return pd.read_csv(uploaded_file)
-    except Exception as e:
-        raise Exception(f"Erro ao carregar CSV: {str(e)}")
+    return search_dataframe(df, search_text, mode, columns, index, trigram_index, n_workers)['mask']
 
 
-def filter_dataframe_by_text(df: pd.DataFrame, search_text: str) -> pd.DataFrame:
+def filter_dataframe_by_text(df: pd.DataFrame, search_text: str, mode: str = "contains",
+                             index: Optional[SearchIndex] = None,
+                             trigram_index: Optional[TrigramIndex] = None,
+                             n_workers: int = 1, columns: Optional[List[str]] = None,
+                             max_rows: Optional[int] = None) -> pd.DataFrame:
     """
-    Filtra DataFrame buscando texto em todas as colunas.
+    Filtra DataFrame buscando texto em todas as colunas (ou nas indicadas).
+    
+    Sem texto buscado, retorna o próprio df (ou suas primeiras max_rows
+    linhas), sem copiá-lo. Com max_rows, só as primeiras linhas encontradas
+    são copiadas; as demais ficam apenas na máscara.
     
     Args:
         df: DataFrame a ser filtrado
         search_text: Texto a ser buscado (case-insensitive)
+        mode: Modo de busca (ver search_dataframe)
+        index: Índice de busca do DataFrame, usado nos modos "token" e "prefix"
+        trigram_index: Índice de trigramas do DataFrame, usado no modo "contains"
+        n_workers: Número de threads da busca (1 = serial)
+        columns: Colunas buscadas (padrão: todas)
+        max_rows: Máximo de linhas retornadas (padrão: todas)
         
     Returns:
         pd.DataFrame: DataFrame filtrado contendo apenas linhas com o texto buscado
     """
     if not search_text or search_text.strip() == "":
-        return df.copy()
+        return df if max_rows is None else df.iloc[:max_rows]
+    
+    mask = get_search_mask(df, search_text, mode, index, trigram_index, n_workers, columns)
+    return df.iloc[np.flatnonzero(mask)[:max_rows]]
+
+
+def paginate_dataframe(df: pd.DataFrame, mask: Optional[np.ndarray] = None, page: int = 1,
+                       page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Seleciona uma página das linhas do DataFrame que passam no filtro.
+    
+    Só as linhas da página são copiadas: o total e o número de páginas vêm
+    da máscara, sem montar o DataFrame filtrado completo.
+    
+    Args:
+        df: DataFrame completo
+        mask: Máscara booleana das linhas filtradas (padrão: todas as linhas)
+        page: Número da página (a partir de 1), ajustado ao intervalo válido
+        page_size: Linhas por página
+        
+    Returns:
+        Dict[str, Any]: Dicionário com:
+            - 'data': DataFrame com as linhas da página
+            - 'page': Página exibida
+            - 'n_pages': Total de páginas (ao menos 1)
+            - 'total_rows': Total de linhas filtradas
+            - 'first_row', 'last_row': Posição (a partir de 1) da primeira e da
+              última linha da página entre as filtradas (0 se não houver linhas)
+            
+    Raises:
+        ValueError: Se page_size não for positivo
+    """
+    if page_size < 1:
+        raise ValueError(f"Linhas por página inválidas: {page_size}")
+    
+    total_rows = len(df) if mask is None else int(np.count_nonzero(mask))
+    n_pages = max(1, -(-total_rows // page_size))
+    page = min(max(int(page), 1), n_pages)
+    start = (page - 1) * page_size
+    end = min(start + page_size, total_rows)
+    
+    if mask is None:
+        data = df.iloc[start:end]
+    else:
+        data = df.iloc[np.flatnonzero(mask)[start:end]]
+    
+    return {
+        'data': data,
+        'page': page,
+        'n_pages': n_pages,
+        'total_rows': total_rows,
+        'first_row': start + 1 if end > start else 0,
+        'last_row': end
+    }
+
+
+def find_row_page(row: int, mask: Optional[np.ndarray] = None, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    Calcula a página que exibe uma linha do DataFrame completo.
+    
+    Se a linha não passou no filtro, retorna a página da próxima linha
+    filtrada (ou a última página, se não houver nenhuma depois dela).
+    
+    Args:
+        row: Posição da linha no DataFrame completo (a partir de 0)
+        mask: Máscara booleana das linhas filtradas (padrão: todas as linhas)
+        page_size: Linhas por página
+        
+    Returns:
+        int: Número da página (a partir de 1)
+    """
+    row = max(int(row), 0)
+    if mask is None:
+        rank = row
+    else:
+        # Linhas filtradas antes da linha procurada
+        rank = int(np.count_nonzero(mask[:row]))
+        rank = min(rank, max(int(np.count_nonzero(mask)) - 1, 0))
+    return rank // page_size + 1
+
+
+class DatasetProfile:
+    """
+    Perfil de um DataFrame carregado, compartilhado pelas funções de resumo.
+    
+    Tipos, colunas numéricas e distribuição de tipos vêm de df.dtypes e são
+    calculados na criação. Contagens de nulos e de valores únicos por coluna
+    e a memória ocupada exigem varrer a tabela inteira, então só são
+    calculados no primeiro acesso e depois reaproveitados. O perfil guarda
+    apenas uma referência fraca ao DataFrame, para não impedir sua coleta.
+    
+    Use get_dataset_profile, que mantém um perfil por DataFrame em
+    default_frame_states: ele é refeito quando outro arquivo é carregado (um
+    novo DataFrame) ou quando as colunas ou tipos mudam.
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: DataFrame descrito pelo perfil
+        """
+        self._df = weakref.ref(df)
+        self.shape: Tuple[int, int] = df.shape
+        self.dtypes: pd.Series = df.dtypes
+        self.numeric_positions: List[int] = _numeric_positions(df)
+        self.numeric_columns: pd.Index = df.columns[self.numeric_positions]
+        self.type_distribution: Dict[Any, int] = self.dtypes.value_counts().to_dict()
+        self._null_counts: Optional[np.ndarray] = None
+        self._unique_counts: Optional[np.ndarray] = None
+        self._memory_usage: Optional[int] = None
+        self._date_formats: Dict[Any, Optional[str]] = {}
+        self._parsed_dates: Dict[Any, pd.Series] = {}
+        self._sort_orders: Dict[Any, np.ndarray] = {}
+    
+    def _frame(self) -> pd.DataFrame:
+        """Retorna o DataFrame descrito pelo perfil."""
+        df = self._df()
+        if df is None:
+            raise ReferenceError("O DataFrame deste perfil já foi descartado")
+        return df
+    
+    def matches(self, df: pd.DataFrame) -> bool:
+        """Se o perfil ainda descreve df (mesmo formato, colunas e tipos)."""
+        return self._df() is df and df.shape == self.shape and df.dtypes.equals(self.dtypes)
+    
+    @property
+    def null_counts(self) -> np.ndarray:
+        """Quantidade de valores nulos de cada coluna."""
+        if self._null_counts is None:
+            df = self._frame()
+            self._null_counts = np.array([df.iloc[:, i].isna().sum() for i in range(df.shape[1])], dtype=np.int64)
+        return self._null_counts
+    
+    @property
+    def unique_counts(self) -> np.ndarray:
+        """Quantidade de valores únicos (sem contar nulos) de cada coluna."""
+        if self._unique_counts is None:
+            self._unique_counts = self._frame().nunique().to_numpy(dtype=np.int64)
+        return self._unique_counts
+    
+    @property
+    def memory_usage(self) -> int:
+        """Memória ocupada pelo DataFrame, em bytes (incluindo o conteúdo dos objetos)."""
+        if self._memory_usage is None:
+            self._memory_usage = int(self._frame().memory_usage(deep=True).sum())
+        return self._memory_usage
+    
+    def date_format(self, column: Any) -> Optional[str]:
+        """
+        Formato das datas de uma coluna de texto, detectado uma única vez.
+        
+        A detecção usa até _DATE_SAMPLE_SIZE valores espalhados pela coluna
+        (não só o início do arquivo), com a mesma regra do esquema da leitura
+        (_detect_date_format); em colunas 'category', a amostra vem das
+        categorias. Colunas numéricas nunca são tratadas como datas.
+        
+        Args:
+            column: Nome da coluna
+            
+        Returns:
+            Optional[str]: Formato das datas, ou None se a coluna não for de texto com datas
+        """
+        if column not in self._date_formats:
+            series = self._frame()[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                series = pd.Series(series.cat.categories)
+            date_format = None
+            if is_string_dtype(series.dtype) and len(series):
+                positions = np.unique(np.linspace(0, len(series) - 1, _DATE_SAMPLE_SIZE).astype(np.int64))
+                sample = series.iloc[positions].dropna()
+                if sample.empty:
+                    sample = series.dropna().iloc[:_DATE_SAMPLE_SIZE]
+                if not sample.empty:
+                    date_format = _detect_date_format(sample)
+            self._date_formats[column] = date_format
+        return self._date_formats[column]
+    
+    def parsed_dates(self, column: Any) -> Optional[pd.Series]:
+        """
+        Coluna convertida para datas, ou None se ela não contiver datas.
+        
+        Colunas já do tipo data são retornadas como estão. Colunas de texto
+        são convertidas uma única vez com o formato de date_format (valores
+        fora do formato viram NaT; em colunas 'category', só as categorias são
+        convertidas) e a conversão fica guardada no perfil, então os reruns do
+        gráfico não convertem a coluna de novo.
+        
+        Args:
+            column: Nome da coluna
+            
+        Returns:
+            Optional[pd.Series]: Datas alinhadas às linhas do DataFrame
+        """
+        series = self._frame()[column]
+        if is_datetime64_any_dtype(series.dtype):
+            return series
+        if column not in self._parsed_dates:
+            date_format = self.date_format(column)
+            if date_format is None:
+                return None
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                categories = pd.to_datetime(series.cat.categories, format=date_format, errors='coerce')
+                parsed = pd.Series(categories.take(series.cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT),
+                                   index=series.index, name=series.name)
+            else:
+                parsed = pd.to_datetime(series, format=date_format, errors='coerce')
+            self._parsed_dates[column] = parsed
+        return self._parsed_dates[column]
+    
+    def sort_order(self, column: Any) -> Optional[np.ndarray]:
+        """
+        Posições das linhas em ordem cronológica de uma coluna de datas.
+        
+        A ordenação é estável (datas iguais mantêm a ordem do arquivo), deixa
+        NaT no fim e é calculada uma única vez por coluna: os reruns do
+        gráfico, com qualquer combinação de colunas Y, só reordenam as linhas
+        por essas posições.
+        
+        Args:
+            column: Nome da coluna
+            
+        Returns:
+            Optional[np.ndarray]: Posições ordenadas, ou None se a coluna não contiver datas
+        """
+        if column not in self._sort_orders:
+            dates = self.parsed_dates(column)
+            if dates is None:
+                return None
+            self._sort_orders[column] = np.asarray(dates.array.argsort(kind='stable'))
+        return self._sort_orders[column]
+
+
+def get_dataset_profile(df: pd.DataFrame) -> DatasetProfile:
+    """
+    Retorna o perfil do DataFrame, criando-o na primeira chamada.
     
-    # Converte todas as colunas para string e busca o texto
-    mask = df.astype(str).apply(
-        lambda x: x.str.contains(search_text, case=False, na=False)
-    ).any(axis=1)
+    O perfil fica no estado do DataFrame em default_frame_states, então todos
+    os resumos de um rerun (e dos reruns seguintes) leem as mesmas contagens.
     
-    return df[mask]
+    Args:
+        df: DataFrame a ser analisado
+        
+    Returns:
+        DatasetProfile: Perfil do DataFrame
+    """
+    state = default_frame_states.get(df)
+    profile = state.get('profile')
+    if profile is None or not profile.matches(df):
+        profile = state['profile'] = DatasetProfile(df)
+    return profile
 
 
 def get_numeric_columns(df: pd.DataFrame) -> pd.Index:
     """
     Identifica colunas numéricas em um DataFrame.
     
+    Considera qualquer tipo numérico (NumPy, nullable ou Arrow), exceto booleanos.
+    
     Args:
         df: DataFrame a ser analisado
         
     Returns:
         pd.Index: Índice com nomes das colunas numéricas
     """
-    return df.select_dtypes(include=['int64', 'float64', 'int32', 'float32']).columns
+    return get_dataset_profile(df).numeric_columns
+
+
+def _numeric_positions(df: pd.DataFrame) -> List[int]:
+    """Posições das colunas numéricas (exceto booleanas) do DataFrame."""
+    return [position for position, dtype in enumerate(df.dtypes)
+            if is_numeric_dtype(dtype) and not is_bool_dtype(dtype)]
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    """
+    Converte uma coluna numérica para um array NumPy.
+    
+    Tipos de extensão (nullable ou Arrow) viram float64 com NaN quando há
+    valores ausentes; sem ausentes, mantêm o tipo NumPy equivalente.
+    """
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+    numpy_dtype = getattr(series.dtype, 'numpy_dtype', np.dtype(np.float64))
+    if series.hasnans or numpy_dtype.kind not in "iuf":
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return series.to_numpy(dtype=numpy_dtype)
+
+
+def _partition_median(values: np.ndarray) -> np.ndarray:
+    """
+    Mediana de cada linha, reordenando values no lugar.
+    
+    Uma única partição pelo elemento central (e o máximo da metade inferior,
+    quando a quantidade é par) dá o mesmo resultado de np.median, que
+    particiona pelos dois elementos centrais.
+    """
+    half = values.shape[1] // 2
+    values.partition(half, axis=1)
+    high = values[:, half]
+    if values.shape[1] % 2:
+        return high.copy()
+    return (values[:, :half].max(axis=1) + high) / 2
+
+
+def _block_statistics(block: np.ndarray, median: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Calcula as estatísticas de cada linha de um bloco 2-D (uma linha por coluna).
+    
+    Segue as mesmas reduções do pandas (pandas.core.nanops), mas sobre o bloco
+    inteiro: a máscara de ausentes é calculada uma única vez e compartilhada
+    por todas as estatísticas. Além delas, retorna 'm2' (soma dos quadrados
+    dos desvios), usada para combinar blocos. O bloco é modificado (ausentes
+    viram 0 e as linhas são particionadas para a mediana).
+    """
+    dtype = block.dtype
+    is_float = dtype.kind == "f"
+    n_columns, n_values = block.shape
+    if n_values == 0:
+        empty = np.full(n_columns, np.nan)
+        return {'count': np.zeros(n_columns, dtype=np.int64), 'sum': block.sum(axis=1), 'mean': empty,
+                'm2': np.zeros(n_columns), 'std': empty, 'min': empty, 'max': empty, 'median': empty}
+    
+    # Mínimo e máximo ignorando NaN, antes de preencher os ausentes
+    minimums, maximums = np.fmin.reduce(block, axis=1), np.fmax.reduce(block, axis=1)
+    mask = np.isnan(block) if is_float else None
+    if mask is not None and mask.any():
+        missing = mask.sum(axis=1)
+        np.putmask(block, mask, 0)
+    else:
+        mask = None
+        missing = np.zeros(n_columns, dtype=np.int64)
+    count = n_values - missing
+    
+    # Floats somam no próprio tipo; inteiros somam em int64/uint64 e calculam a média em float64
+    sums = block.sum(axis=1, dtype=dtype if is_float else np.dtype(np.uint64 if dtype.kind == "u" else np.int64))
+    as_float = block if is_float else block.astype(np.float64)
+    with np.errstate(all="ignore"):
+        if is_float:
+            means = sums / count.astype(dtype)
+            float_sums = sums if dtype == np.float64 else block.sum(axis=1, dtype=np.float64)
+        else:
+            means = block.sum(axis=1, dtype=np.float64) / count
+            float_sums = as_float.sum(axis=1)
+        
+        # Variância em duas passadas: média e soma dos quadrados dos desvios (ddof=1)
+        squares = (float_sums / count)[:, None] - as_float
+        squares **= 2
+        if mask is not None:
+            np.putmask(squares, mask, 0)
+        m2 = squares.sum(axis=1, dtype=np.float64)
+        del squares
+        variances = m2 / np.where(count > 1, count - 1, np.nan)
+        stds = np.sqrt(variances.astype(dtype) if is_float else variances)
+    
+    # Mediana: linhas sem ausentes particionadas juntas, as demais só com os valores presentes
+    medians = np.full(n_columns, np.nan, dtype=as_float.dtype)
+    complete = missing == 0
+    if median and complete.all():
+        medians = _partition_median(as_float)
+    elif median:
+        if complete.any():
+            medians[complete] = _partition_median(as_float[complete])
+        for i in np.flatnonzero(~complete & (count > 0)):
+            medians[i] = _partition_median(as_float[i][~mask[i]][None, :])[0]
+    
+    return {'count': count, 'sum': sums, 'mean': means, 'm2': m2, 'std': stds,
+            'min': minimums, 'max': maximums, 'median': medians}
+
+
+def _values_statistics(values: List[np.ndarray], n_rows: int, block_mb: float = _STATS_BLOCK_MB,
+                       median: bool = True) -> Dict[str, List[Any]]:
+    """
+    Agrupa arrays de mesmo tipo em blocos de até block_mb megabytes e os reduz com _block_statistics.
+    
+    Args:
+        values: Valores de cada coluna, todos com n_rows posições
+        n_rows: Número de linhas
+        block_mb: Tamanho máximo (MB) de cada bloco empilhado
+        median: Se False, a mediana não é calculada (fica NaN)
+        
+    Returns:
+        Dict com uma lista por estatística (ver _STATISTICS), na ordem de values
+    """
+    groups: Dict[np.dtype, List[int]] = {}
+    for i, array in enumerate(values):
+        groups.setdefault(array.dtype, []).append(i)
+    
+    results: Dict[str, List[Any]] = {name: [None] * len(values) for name in _STATISTICS}
+    for dtype, members in groups.items():
+        width = max(1, int(block_mb * 1024 * 1024 // max(n_rows * dtype.itemsize, 1)))
+        for start in range(0, len(members), width):
+            chunk = members[start:start + width]
+            block_stats = _block_statistics(np.stack([values[i] for i in chunk]), median)
+            for name, column_values in block_stats.items():
+                for j, i in enumerate(chunk):
+                    results[name][i] = column_values[j]
+    return results
+
+
+def quantile_sample_size(error_bound: float = DEFAULT_QUANTILE_ERROR) -> int:
+    """
+    Tamanho da amostra aleatória que garante o erro de rank dos quantis aproximados.
+    
+    Pela desigualdade de Dvoretzky-Kiefer-Wolfowitz, com n valores sorteados a
+    distribuição da amostra fica a no máximo error_bound da distribuição da
+    coluna, para todos os quantis ao mesmo tempo, com probabilidade de pelo
+    menos 1 - _QUANTILE_FAILURE. O tamanho não depende do número de linhas.
+    
+    Args:
+        error_bound: Erro de rank máximo (0.01 = o valor estimado fica entre os quantis q-1% e q+1%)
+        
+    Returns:
+        int: Número de valores sorteados por coluna
+        
+    Raises:
+        ValueError: Se error_bound não estiver entre 0 e 0.5
+    """
+    if not 0 < error_bound < 0.5:
+        raise ValueError(f"O erro dos quantis deve estar entre 0 e 0.5: {error_bound}")
+    return int(np.ceil(np.log(2 / _QUANTILE_FAILURE) / (2 * error_bound ** 2)))
+
+
+def _approximate_quantiles(values: List[np.ndarray], error_bound: float = DEFAULT_QUANTILE_ERROR,
+                           seed: int = 0) -> Dict[str, List[float]]:
+    """
+    Estima os quantis de APPROXIMATE_QUANTILES de cada coluna a partir de uma amostra aleatória.
+    
+    Colunas com até quantile_sample_size(error_bound) valores presentes têm os
+    quantis exatos. A semente fixa faz cada rerun do app mostrar os mesmos valores.
+    
+    Args:
+        values: Valores de cada coluna (NaN = ausente)
+        error_bound: Erro de rank máximo dos quantis
+        seed: Semente do sorteio
+        
+    Returns:
+        Dict com uma lista por quantil (chaves de APPROXIMATE_QUANTILES), na ordem de values
+    """
+    sample_size = quantile_sample_size(error_bound)
+    levels = list(APPROXIMATE_QUANTILES.values())
+    rng = np.random.default_rng(seed)
+    results: Dict[str, List[float]] = {name: [] for name in APPROXIMATE_QUANTILES}
+    
+    for column_values in values:
+        sample = column_values
+        if len(column_values) > sample_size:
+            sample = column_values[rng.integers(0, len(column_values), sample_size)]
+        if sample.dtype.kind == "f" and np.isnan(sample).any():
+            # Com ausentes, o sorteio é feito só entre os valores presentes
+            present = column_values[~np.isnan(column_values)]
+            sample = present if len(present) <= sample_size else present[rng.integers(0, len(present), sample_size)]
+        quantiles = np.quantile(sample, levels) if len(sample) else np.full(len(levels), np.nan)
+        for name, quantile in zip(APPROXIMATE_QUANTILES, quantiles):
+            results[name].append(quantile)
+    return results
+
+
+def _column_statistics(df: pd.DataFrame, positions: List[int],
+                       block_mb: float = _STATS_BLOCK_MB, approximate: bool = False,
+                       error_bound: float = DEFAULT_QUANTILE_ERROR) -> Dict[str, List[Any]]:
+    """
+    Calcula contagem, soma, média, desvio padrão, mínimo, máximo e mediana de colunas numéricas.
+    
+    As colunas de mesmo tipo são empilhadas em blocos 2-D de até block_mb
+    megabytes e reduzidas juntas por _block_statistics. Os resultados são
+    iguais aos das reduções do pandas coluna a coluna. No modo aproximado, a
+    mediana e os percentis 90 e 99 vêm de _approximate_quantiles.
+    
+    Args:
+        df: DataFrame com os dados
+        positions: Posições das colunas numéricas
+        block_mb: Tamanho máximo (MB) de cada bloco empilhado
+        approximate: Se True, estima os quantis em vez de calcular a mediana exata
+        error_bound: Erro de rank máximo dos quantis aproximados
+        
+    Returns:
+        Dict com uma lista por estatística (ver _STATISTICS, mais 'p90' e
+        'p99' no modo aproximado), na ordem de positions
+    """
+    values = [_numeric_values(df.iloc[:, position]) for position in positions]
+    results = _values_statistics(values, len(df), block_mb, median=not approximate)
+    if approximate:
+        results.update(_approximate_quantiles(values, error_bound))
+    
+    # Inteiros nullable com ausentes foram reduzidos em float64: soma, mínimo e máximo voltam a ser inteiros
+    for i, position in enumerate(positions):
+        dtype = df.dtypes.iloc[position]
+        if (not isinstance(dtype, np.dtype) and getattr(dtype, 'numpy_dtype', dtype).kind in "iu"
+                and values[i].dtype.kind == "f" and results['count'][i] > 0):
+            for name in ('sum', 'min', 'max'):
+                results[name][i] = np.int64(results[name][i])
+    return results
 
 
-def calculate_numeric_statistics(df: pd.DataFrame) -> Dict[str, Any]:
+def calculate_numeric_statistics(df: pd.DataFrame, approximate: bool = False,
+                                 error_bound: float = DEFAULT_QUANTILE_ERROR) -> Dict[str, Any]:
     """
     Calcula estatísticas descritivas para colunas numéricas.
     
+    Todas as estatísticas saem de _column_statistics, que reduz as colunas
+    numéricas em blocos; o resumo geral é derivado dessas estatísticas, sem
+    varrer os dados de novo.
+    
+    A mediana exata exige particionar cada coluna inteira. No modo aproximado
+    ela é estimada, junto com os percentis 90 e 99, a partir de uma amostra
+    de tamanho fixo (ver quantile_sample_size), e a tabela traz as colunas
+    'Mediana ≈', 'P90 ≈' e 'P99 ≈' no lugar de 'Mediana'.
+    
     Args:
         df: DataFrame com dados numéricos
+        approximate: Se True, estima mediana, P90 e P99
+        error_bound: Erro de rank máximo dos quantis aproximados
         
     Returns:
         Dict contendo:
             - stats_df: DataFrame com estatísticas por coluna
             - summary: Dict com resumo geral das estatísticas
+            
+    Raises:
+        ValueError: Se approximate for True e error_bound não estiver entre 0 e 0.5
     """
-    numeric_columns = get_numeric_columns(df)
+    positions = get_dataset_profile(df).numeric_positions
     
-    if len(numeric_columns) == 0:
+    if len(positions) == 0:
         return {'stats_df': pd.DataFrame(), 'summary': {}}
     
+    stats = _column_statistics(df, positions, approximate=approximate, error_bound=error_bound)
+    return _statistics_tables(df.columns[positions], stats, approximate)
+
+
+def _statistics_tables(columns: pd.Index, stats: Dict[str, List[Any]],
+                       approximate: bool = False) -> Dict[str, Any]:
+    """
+    Monta a tabela de estatísticas e o resumo geral a partir das estatísticas por coluna.
+    
+    Args:
+        columns: Nomes das colunas numéricas
+        stats: Uma lista por estatística (ver _STATISTICS), na ordem de columns
+        approximate: Se True, os quantis ('median', 'p90' e 'p99') vão para
+            colunas marcadas com ≈
+        
+    Returns:
+        Dict com 'stats_df' e 'summary' (ver calculate_numeric_statistics)
+    """
     # Criar DataFrame com estatísticas detalhadas
     stats_data = []
-    for col in numeric_columns:
-        stats_data.append({
-            'Coluna': col,
-            'Contagem': df[col].count(),
-            'Média': round(df[col].mean(), 2),
-            'Soma': round(df[col].sum(), 2),
-            'Mínimo': df[col].min(),
-            'Máximo': df[col].max(),
-            'Mediana': round(df[col].median(), 2),
-            'Desvio Padrão': round(df[col].std(), 2)
-        })
+    for i, column in enumerate(columns):
+        row = {
+            'Coluna': column,
+            'Contagem': stats['count'][i],
+            'Média': round(stats['mean'][i], 2),
+            'Soma': round(stats['sum'][i], 2),
+            'Mínimo': stats['min'][i],
+            'Máximo': stats['max'][i]
+        }
+        if approximate:
+            row['Mediana ≈'] = round(stats['median'][i], 2)
+            row['P90 ≈'] = round(stats['p90'][i], 2)
+            row['P99 ≈'] = round(stats['p99'][i], 2)
+        else:
+            row['Mediana'] = round(stats['median'][i], 2)
+        row['Desvio Padrão'] = round(stats['std'][i], 2)
+        stats_data.append(row)
     
     stats_df = pd.DataFrame(stats_data)
     
-    # Calcular resumo geral
+    # Resumo geral a partir das estatísticas por coluna
     summary = {
-        'total_numeric_columns': len(numeric_columns),
-        'total_values': df[numeric_columns].count().sum(),
-        'total_sum': round(df[numeric_columns].sum().sum(), 2),
-        'overall_mean': round(df[numeric_columns].mean().mean(), 2)
+        'total_numeric_columns': len(columns),
+        'total_values': pd.Series(stats['count']).sum(),
+        'total_sum': round(pd.Series(stats['sum']).sum(), 2),
+        'overall_mean': round(pd.Series(stats['mean']).mean(), 2)
     }
     
     return {'stats_df': stats_df, 'summary': summary}
 
 
+class QuantileSketch:
+    """
+    Sketch de quantis mesclável no estilo KLL (Karnin, Lang e Liberty).
+    
+    Os valores ficam em compactadores empilhados: o nível h guarda itens que
+    representam 2**h valores cada. Quando um nível passa da sua capacidade,
+    ele é ordenado e metade dos itens (os de posição par ou ímpar, ao acaso)
+    sobe para o nível seguinte. A capacidade do nível mais alto é k e cai
+    por um fator 2/3 a cada nível abaixo, então a memória fica em O(k) itens
+    mais um por nível, qualquer que seja o número de valores.
+    
+    O erro de rank de um quantil é aleatório e fica perto de 1/k (com
+    k=200, a mediana cai entre os quantis 0,49 e 0,51 em praticamente todos
+    os casos). Enquanto nenhum nível foi compactado o sketch guarda todos os
+    valores e os quantis são exatos.
+    """
+    
+    def __init__(self, k: int = DEFAULT_SKETCH_K, seed: Optional[int] = 0):
+        """
+        Args:
+            k: Capacidade do maior compactador (maior k, menor erro)
+            seed: Semente do sorteio das compactações (None = não determinístico)
+        """
+        if k < 2:
+            raise ValueError(f"k deve ser ao menos 2: {k}")
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+    
+    def _capacity(self, level: int) -> int:
+        """Capacidade de um nível: k no mais alto, 2/3 a menos por nível abaixo."""
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+    
+    def _compress(self) -> None:
+        """Compacta os níveis acima da capacidade, do mais baixo para o mais alto."""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Com quantidade ímpar, o maior item fica neste nível
+                n_pairs = len(items) // 2
+                promoted = items[self._rng.integers(2):2 * n_pairs:2]
+                self.levels[level] = items[2 * n_pairs:]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+    
+    def update(self, values: np.ndarray) -> None:
+        """
+        Adiciona valores ao sketch (NaN é ignorado).
+        
+        Args:
+            values: Valores numéricos
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+    
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Incorpora outro sketch, como se os valores dele tivessem sido adicionados a este.
+        
+        Args:
+            other: Sketch a incorporar (não é modificado)
+            
+        Returns:
+            QuantileSketch: Este sketch
+        """
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+    
+    @property
+    def exact(self) -> bool:
+        """Se o sketch ainda guarda todos os valores."""
+        return len(self.levels) == 1
+    
+    def quantile(self, q: float) -> float:
+        """
+        Estima um quantil.
+        
+        Args:
+            q: Quantil entre 0 e 1 (0.5 = mediana)
+            
+        Returns:
+            float: Valor estimado (NaN se o sketch estiver vazio)
+        """
+        if self.count == 0:
+            return np.nan
+        if self.exact:
+            # Mesma interpolação de np.median / pandas quando há todos os valores
+            return np.median(self.levels[0]) if q == 0.5 else np.quantile(self.levels[0], q)
+        
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        ranks = np.cumsum(weights[order])
+        position = np.searchsorted(ranks, q * ranks[-1], side='left')
+        return items[order[min(position, len(items) - 1)]]
+    
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos itens guardados, em bytes."""
+        return sum(level.nbytes for level in self.levels)
+
+
+class RunningStatistics:
+    """
+    Estatísticas de colunas numéricas acumuladas bloco a bloco, sem guardar os dados.
+    
+    Para cada coluna mantém contagem, soma, mínimo, máximo, média e soma dos
+    quadrados dos desvios (M2) combinadas pela fórmula de Chan et al. (a
+    versão em blocos do algoritmo de Welford), além de um QuantileSketch para
+    a mediana. Em colunas inteiras, soma, mínimo e máximo são acumulados em
+    int64 (exatos mesmo acima de 2**53); só média e variância usam float64.
+    Acumuladores de partes diferentes do arquivo podem ser combinados com merge.
+    
+    As colunas numéricas são as do primeiro bloco; nos blocos seguintes,
+    valores não numéricos dessas colunas são tratados como ausentes.
+    """
+    
+    def __init__(self, sketch_k: int = DEFAULT_SKETCH_K, block_mb: float = _STATS_BLOCK_MB):
+        """
+        Args:
+            sketch_k: Parâmetro k dos sketches da mediana
+            block_mb: Tamanho máximo (MB) de cada bloco de colunas reduzido de uma vez
+        """
+        self.sketch_k = sketch_k
+        self.block_mb = block_mb
+        self.columns: Optional[pd.Index] = None
+        self.n_rows = 0
+    
+    def _start(self, columns: pd.Index) -> None:
+        """Cria os acumuladores vazios das colunas."""
+        n_columns = len(columns)
+        self.columns = columns
+        self._count = np.zeros(n_columns, dtype=np.int64)
+        self._int_sum = np.zeros(n_columns, dtype=np.int64)
+        self._float_sum = np.zeros(n_columns)
+        self._mean = np.zeros(n_columns)
+        self._m2 = np.zeros(n_columns)
+        self._min = np.full(n_columns, np.nan)
+        self._max = np.full(n_columns, np.nan)
+        self._int_min = np.full(n_columns, np.iinfo(np.int64).max)
+        self._int_max = np.full(n_columns, np.iinfo(np.int64).min)
+        self._integer = np.ones(n_columns, dtype=bool)
+        self._sketches = [QuantileSketch(self.sketch_k, seed=i) for i in range(n_columns)]
+    
+    def _combine(self, count, int_sum, float_sum, mean, m2, minimum, maximum,
+                 int_min, int_max, integer) -> None:
+        """Combina acumuladores de outra parte dos dados (arrays por coluna)."""
+        total = self._count + count
+        with np.errstate(all="ignore"):
+            delta = mean - self._mean
+            share = np.where(total > 0, count / total, 0)
+            self._m2 = np.where(count > 0, self._m2 + m2 + delta ** 2 * self._count * share, self._m2)
+            self._mean = np.where(count > 0, self._mean + delta * share, self._mean)
+        self._count = total
+        self._int_sum += int_sum
+        self._float_sum += float_sum
+        self._min = np.fmin(self._min, minimum)
+        self._max = np.fmax(self._max, maximum)
+        self._int_min = np.minimum(self._int_min, int_min)
+        self._int_max = np.maximum(self._int_max, int_max)
+        self._integer &= integer
+    
+    def update(self, chunk: pd.DataFrame) -> 'RunningStatistics':
+        """
+        Acumula as estatísticas de um bloco de linhas.
+        
+        Args:
+            chunk: Bloco do DataFrame (por exemplo, produzido por iter_csv_chunks)
+            
+        Returns:
+            RunningStatistics: Este acumulador
+        """
+        if self.columns is None:
+            self._start(chunk.columns[_numeric_positions(chunk)])
+        
+        values, integer = [], []
+        for column in self.columns:
+            series = chunk[column] if column in chunk.columns else pd.Series(np.nan, index=chunk.index)
+            if not (is_numeric_dtype(series.dtype) and not is_bool_dtype(series.dtype)):
+                series = pd.to_numeric(series, errors='coerce')
+            values.append(_numeric_values(series))
+            integer.append(getattr(series.dtype, 'numpy_dtype', series.dtype).kind in "iu")
+        
+        stats = _values_statistics(values, len(chunk), self.block_mb, median=False)
+        # Inteiros (inclusive nullable com NA, somados em float64) acumulam em int64
+        integer = np.array(integer, dtype=bool)
+        count = np.array(stats['count'], dtype=np.int64)
+        sums = np.array(stats['sum'], dtype=object)
+        minimum = np.array(stats['min'], dtype=object)
+        maximum = np.array(stats['max'], dtype=object)
+        has_integers = integer & (count > 0)
+        self._combine(
+            count,
+            np.where(integer, sums, 0).astype(np.int64),
+            np.where(integer, 0, sums).astype(np.float64),
+            np.nan_to_num(np.array(stats['mean'], dtype=np.float64)),
+            np.array(stats['m2'], dtype=np.float64),
+            minimum.astype(np.float64),
+            maximum.astype(np.float64),
+            np.where(has_integers, minimum, np.iinfo(np.int64).max).astype(np.int64),
+            np.where(has_integers, maximum, np.iinfo(np.int64).min).astype(np.int64),
+            integer
+        )
+        for sketch, column_values in zip(self._sketches, values):
+            sketch.update(column_values)
+        self.n_rows += len(chunk)
+        return self
+    
+    def merge(self, other: 'RunningStatistics') -> 'RunningStatistics':
+        """
+        Incorpora os acumuladores de outra parte dos mesmos dados.
+        
+        Args:
+            other: Acumulador com as mesmas colunas (não é modificado)
+            
+        Returns:
+            RunningStatistics: Este acumulador
+            
+        Raises:
+            ValueError: Se as colunas forem diferentes
+        """
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self._start(other.columns)
+        elif not self.columns.equals(other.columns):
+            raise ValueError("Os acumuladores têm colunas diferentes")
+        self._combine(other._count, other._int_sum, other._float_sum, other._mean, other._m2,
+                      other._min, other._max, other._int_min, other._int_max, other._integer)
+        for sketch, other_sketch in zip(self._sketches, other._sketches):
+            sketch.merge(other_sketch)
+        self.n_rows += other.n_rows
+        return self
+    
+    def result(self, approximate: bool = False) -> Dict[str, Any]:
+        """
+        Monta a tabela de estatísticas e o resumo, como calculate_numeric_statistics.
+        
+        Args:
+            approximate: Se True, inclui P90 e P99 dos sketches e marca os quantis com ≈
+            
+        Returns:
+            Dict com 'stats_df' e 'summary'
+        """
+        if self.columns is None or len(self.columns) == 0:
+            return {'stats_df': pd.DataFrame(), 'summary': {}}
+        
+        has_values = self._count > 0
+        with np.errstate(all="ignore"):
+            stds = np.sqrt(self._m2 / np.where(self._count > 1, self._count - 1, np.nan))
+        stats = {
+            'count': list(self._count),
+            'sum': [np.int64(int_sum) if integer else np.float64(int_sum + float_sum)
+                    for int_sum, float_sum, integer in zip(self._int_sum, self._float_sum, self._integer)],
+            'mean': list(np.where(has_values, self._mean, np.nan)),
+            'std': list(stds),
+        }
+        for name, level in APPROXIMATE_QUANTILES.items():
+            if approximate or name == 'median':
+                stats[name] = [sketch.quantile(level) for sketch in self._sketches]
+        for name, values, int_values in (('min', self._min, self._int_min), ('max', self._max, self._int_max)):
+            stats[name] = [int_value if integer and present else value
+                           for value, int_value, integer, present
+                           in zip(values, int_values, self._integer, has_values)]
+        return _statistics_tables(self.columns, stats, approximate)
+
+
+def calculate_streaming_statistics(chunks: Iterable[pd.DataFrame], sketch_k: int = DEFAULT_SKETCH_K,
+                                   block_mb: float = _STATS_BLOCK_MB, approximate: bool = False) -> Dict[str, Any]:
+    """
+    Calcula as estatísticas de calculate_numeric_statistics consumindo blocos de linhas.
+    
+    Só um bloco fica em memória por vez (ver RunningStatistics), então serve
+    para arquivos maiores que a memória lidos com iter_csv_chunks. Contagem,
+    mínimo e máximo são exatos; soma, média e desvio padrão diferem da versão
+    em memória apenas por arredondamento de ponto flutuante. A mediana vem
+    de um QuantileSketch: é exata enquanto a coluna tiver no máximo sketch_k
+    valores e, acima disso, fica a cerca de 1/sketch_k de distância em rank
+    da mediana real.
+    
+    Args:
+        chunks: Blocos consecutivos do DataFrame
+        sketch_k: Parâmetro k dos sketches da mediana
+        block_mb: Tamanho máximo (MB) de cada bloco de colunas reduzido de uma vez
+        approximate: Se True, inclui P90 e P99 e marca os quantis com ≈, como no modo
+            aproximado de calculate_numeric_statistics
+        
+    Returns:
+        Dict com 'stats_df' e 'summary' (ver calculate_numeric_statistics)
+    """
+    running = RunningStatistics(sketch_k, block_mb)
+    for chunk in chunks:
+        running.update(chunk)
+    return running.result(approximate)
+
+
 def get_dataset_info(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Obtém informações gerais sobre o dataset.
     
+    As contagens vêm do perfil do DataFrame (get_dataset_profile), calculado
+    uma única vez e compartilhado com get_column_details.
+    
     Args:
         df: DataFrame a ser analisado
         
     Returns:
         Dict com informações básicas e distribuição de tipos
     """
+    profile = get_dataset_profile(df)
     basic_info = {
-        'dimensions': f"{df.shape[0]} linhas × {df.shape[1]} colunas",
-        'memory_usage_kb': round(df.memory_usage(deep=True).sum() / 1024, 1),
-        'unique_values_total': df.nunique().sum(),
-        'null_values_total': df.isnull().sum().sum()
+        'dimensions': f"{profile.shape[0]} linhas × {profile.shape[1]} colunas",
+        'memory_usage_kb': round(profile.memory_usage / 1024, 1),
+        'unique_values_total': profile.unique_counts.sum(),
+        'null_values_total': profile.null_counts.sum()
     }
     
-    type_distribution = df.dtypes.value_counts().to_dict()
-    
     return {
         'basic_info': basic_info,
-        'type_distribution': type_distribution
+        'type_distribution': dict(profile.type_distribution)
     }
 
 
@@ -151,28 +3111,236 @@ def get_column_details(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Informações sobre cada coluna (tipo, valores únicos, nulos)
     """
+    profile = get_dataset_profile(df)
     return pd.DataFrame({
         'Coluna': df.columns,
-        'Tipo': df.dtypes.astype(str),
-        'Valores Únicos': [df[col].nunique() for col in df.columns],
-        'Valores Nulos': [df[col].isnull().sum() for col in df.columns]
+        'Tipo': profile.dtypes.astype(str),
+        'Valores Únicos': profile.unique_counts,
+        'Valores Nulos': profile.null_counts
     })
 
 
-def prepare_chart_data(df: pd.DataFrame, x_column: str, y_columns: List[str]) -> Dict[str, Any]:
+def _row_extremes(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Posições do mínimo e do máximo de cada linha de um bloco 2-D, ignorando NaN.
+    
+    Em floats, fmin/fmax ignoram NaN e a posição é a primeira com o valor
+    extremo (linhas só com NaN retornam 0), sem precisar de uma máscara de
+    ausentes do tamanho do bloco.
+    """
+    if block.dtype.kind != "f":
+        return block.argmin(axis=1), block.argmax(axis=1)
+    lows = np.fmin.reduce(block, axis=1)
+    highs = np.fmax.reduce(block, axis=1)
+    return (block == lows[:, None]).argmax(axis=1), (block == highs[:, None]).argmax(axis=1)
+
+
+def _m4_indices(series_values: List[np.ndarray], max_points: int) -> np.ndarray:
+    """
+    Posições das linhas mantidas pela redução M4 (primeiro, último, mínimo e máximo por intervalo).
+    
+    As linhas são divididas em intervalos consecutivos de mesmo tamanho, e em
+    cada um ficam a primeira e a última linha e as linhas com o mínimo e o
+    máximo de cada série. Picos, vales e o intervalo completo do eixo X são
+    preservados. Os extremos de todos os intervalos saem de uma única
+    redução sobre a série vista como matriz (intervalos × linhas).
+    
+    Args:
+        series_values: Valores de cada série (NaN = ausente), todos com o mesmo tamanho
+        max_points: Máximo de posições retornadas
+        
+    Returns:
+        np.ndarray: Posições ordenadas e sem repetição
+    """
+    n_rows = len(series_values[0]) if series_values else 0
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+    
+    n_buckets = max(1, max_points // (2 + 2 * len(series_values)))
+    size = -(-n_rows // n_buckets)
+    n_full = n_rows // size
+    starts = np.arange(0, n_rows, size)
+    picks = [starts, np.minimum(starts + size, n_rows) - 1]
+    for values in series_values:
+        full = values[:n_full * size].reshape(n_full, size)
+        picks.extend(extremes + starts[:n_full] for extremes in _row_extremes(full))
+        if n_full * size < n_rows:
+            tail = values[None, n_full * size:]
+            picks.extend(extremes + n_full * size for extremes in _row_extremes(tail))
+    return np.unique(np.concatenate(picks))
+
+
+def downsample_chart_data(chart_df: pd.DataFrame, y_columns: List[str],
+                          max_points: int = DEFAULT_CHART_POINTS) -> pd.DataFrame:
+    """
+    Reduz um DataFrame de gráfico a no máximo max_points linhas, mantendo a forma das séries.
+    
+    Usa a redução M4 (ver _m4_indices) sobre as linhas na ordem em que serão
+    desenhadas, em vez de cortar as primeiras linhas: o gráfico continua
+    cobrindo todo o eixo X e mostrando os extremos de cada série.
+    
+    Args:
+        chart_df: Dados do gráfico, já na ordem do eixo X
+        y_columns: Colunas numéricas das séries
+        max_points: Máximo de linhas mantidas
+        
+    Returns:
+        pd.DataFrame: chart_df, se já couber, ou as linhas escolhidas
+    """
+    if len(chart_df) <= max_points:
+        return chart_df
+    positions = _m4_indices([_numeric_values(chart_df[col]) for col in y_columns], max_points)
+    return chart_df.iloc[positions]
+
+
+def _others_label(labels: pd.Index) -> str:
+    """Rótulo do grupo que reúne os demais: "Outros", com sufixo se já houver um grupo com esse nome."""
+    label, suffix = _OTHERS_LABEL, 2
+    while label in labels:
+        label = f"{_OTHERS_LABEL} ({suffix})"
+        suffix += 1
+    return label
+
+
+def _aggregate_chart_data(chart_df: pd.DataFrame, x_column: str, y_columns: List[str],
+                          aggregation: str, top_groups: int) -> Tuple[pd.DataFrame, int]:
+    """
+    Agrupa os dados do gráfico por X, mantendo os maiores grupos e somando os demais em "Outros".
+    
+    Um único groupby calcula as reduções de todas as colunas Y; a média é
+    derivada de soma e contagem, para que o grupo "Outros" tenha a média
+    exata das suas linhas. Os grupos são ordenados pelo valor agregado da
+    primeira coluna Y, do maior para o menor.
+    
+    Args:
+        chart_df: Dados do gráfico, sem valores nulos
+        x_column: Coluna do eixo X
+        y_columns: Colunas das séries
+        aggregation: Uma de CHART_AGGREGATIONS
+        top_groups: Quantidade de grupos exibidos antes de "Outros"
+        
+    Returns:
+        Tuple[pd.DataFrame, int]: (uma linha por grupo com X como texto, total de grupos)
+        
+    Raises:
+        ValueError: Se a agregação for desconhecida ou top_groups menor que 1
+    """
+    if aggregation not in CHART_AGGREGATIONS:
+        raise ValueError(f"Agregação desconhecida: {aggregation}")
+    if top_groups < 1:
+        raise ValueError(f"A quantidade de grupos deve ser ao menos 1: {top_groups}")
+    
+    functions = ['sum', 'count'] if aggregation == 'mean' else [aggregation]
+    grouped = chart_df.groupby(x_column, sort=False, observed=True)[y_columns].agg(functions)
+    n_groups = len(grouped)
+    
+    if aggregation == 'mean':
+        values = grouped.xs('sum', axis=1, level=1) / grouped.xs('count', axis=1, level=1)
+    else:
+        values = grouped.xs(aggregation, axis=1, level=1)
+    
+    order = values[y_columns[0]].sort_values(ascending=False, kind='stable').index
+    result = values.loc[order[:top_groups]]
+    result.index = result.index.astype(str)
+    
+    if n_groups > top_groups:
+        rest = grouped.loc[order[top_groups:]]
+        if aggregation == 'mean':
+            others = rest.xs('sum', axis=1, level=1).sum() / rest.xs('count', axis=1, level=1).sum()
+        else:
+            # Somas e contagens se somam; mínimos e máximos se combinam pelo extremo
+            combine = 'sum' if aggregation in ('sum', 'count') else aggregation
+            others = rest.xs(aggregation, axis=1, level=1).agg(combine)
+        others_row = others.to_frame(_others_label(result.index)).T
+        result = pd.concat([result, others_row.astype(result.dtypes.to_dict())])
+    
+    result.index.name = x_column
+    return result.reset_index(), n_groups
+
+
+def choose_time_bucket(start: pd.Timestamp, end: pd.Timestamp, target_points: int) -> Optional[str]:
+    """
+    Escolhe a largura dos intervalos de tempo de um gráfico a partir do período e da quantidade de pontos desejada.
+    
+    Retorna a menor largura de TIME_BUCKETS que gera no máximo target_points
+    intervalos (ou a maior, 'MS', se nenhuma couber).
+    
+    Args:
+        start: Primeira data
+        end: Última data
+        target_points: Quantidade máxima de intervalos desejada
+        
+    Returns:
+        Optional[str]: Frequência do pandas ('min', 'h', 'D', 'W' ou 'MS'),
+        ou None se o período for menor que o menor intervalo
+    """
+    span = end - start
+    if span < TIME_BUCKETS['min']:
+        return None
+    for freq, width in TIME_BUCKETS.items():
+        if span / width < target_points:
+            return freq
+    return 'MS'
+
+
+def _resample_chart_data(chart_df: pd.DataFrame, x_column: str, y_columns: List[str],
+                         freq: str, aggregation: str) -> pd.DataFrame:
+    """
+    Agrega os dados do gráfico em intervalos de tempo de largura freq.
+    
+    Intervalos sem linhas ficam de fora com média, mínimo e máximo (não há
+    valor a desenhar); com soma e contagem eles valem 0.
+    """
+    resampled = chart_df.resample(freq, on=x_column)[y_columns].agg(aggregation)
+    if aggregation in ('mean', 'min', 'max'):
+        resampled = resampled.dropna(how='all')
+    return resampled.reset_index()
+
+
+def prepare_chart_data(df: pd.DataFrame, x_column: str, y_columns: List[str],
+                       max_points: Optional[int] = DEFAULT_CHART_POINTS,
+                       aggregation: Optional[str] = None,
+                       top_groups: int = DEFAULT_TOP_GROUPS,
+                       time_aggregation: Optional[str] = 'mean') -> Dict[str, Any]:
     """
     Prepara dados para geração de gráfico.
     
+    As estatísticas das colunas Y usam todas as linhas válidas; o DataFrame
+    do gráfico é reduzido a max_points linhas por downsample_chart_data. Com
+    uma agregação (ver CHART_AGGREGATIONS), as linhas são agrupadas por X e
+    o gráfico recebe no máximo top_groups + 1 barras (a última, "Outros",
+    reúne os grupos restantes).
+    
+    X é tratado como data quando já tem tipo data ou quando é uma coluna de
+    texto cujas datas seguem um formato detectado (ver DatasetProfile.date_format);
+    a conversão fica guardada no perfil do DataFrame e é reaproveitada nos
+    reruns. Quando X é uma data e há mais de max_points linhas, as linhas são
+    agregadas com time_aggregation em intervalos de tempo cuja largura
+    (minuto, hora, dia, semana ou mês) é escolhida por choose_time_bucket
+    para gerar no máximo cerca de max_points pontos.
+    
     Args:
         df: DataFrame com os dados originais
         x_column: Nome da coluna para eixo X
         y_columns: Lista com nomes das colunas para eixo Y
+        max_points: Máximo de pontos do gráfico (None = todas as linhas)
+        aggregation: Agregação por valor de X (None = uma barra/ponto por linha)
+        top_groups: Quantidade de grupos exibidos com agregação
+        time_aggregation: Agregação dos intervalos de tempo (None = sem intervalos,
+            só a redução M4)
         
     Returns:
         Dict contendo:
             - chart_df: DataFrame preparado para o gráfico
             - is_date: Boolean indicando se X é uma coluna de data
             - stats: Estatísticas das colunas Y
+            - total_points: Quantidade de linhas válidas antes da redução
+            - n_groups: Quantidade de valores distintos de X (só com agregação)
+            - time_bucket: Frequência dos intervalos de tempo (None se não houve)
+            - time_aggregation: Agregação aplicada aos intervalos (None se não houve)
+            
+    Raises:
+        ValueError: Se a agregação for desconhecida ou top_groups menor que 1
     """
     if not y_columns or not x_column:
         return {'chart_df': pd.DataFrame(), 'is_date': False, 'stats': {}}
@@ -182,26 +3350,27 @@ def prepare_chart_data(df: pd.DataFrame, x_column: str, y_columns: List[str]) ->
     if missing_cols:
         return {'chart_df': pd.DataFrame(), 'is_date': False, 'stats': {}}
     
-    # Selecionar apenas as colunas necessárias
-    chart_df = df[[x_column] + y_columns].copy()
+    # Datas convertidas e ordenadas uma única vez e guardadas no perfil do DataFrame
+    profile = get_dataset_profile(df)
+    dates = profile.parsed_dates(x_column) if aggregation is None else None
+    is_date = dates is not None
+    x_values = dates if is_date else df[x_column]
     
-    # Remover linhas com valores nulos
-    chart_df = chart_df.dropna()
+    # Linhas sem valores nulos (nem datas fora do formato detectado), em ordem
+    # cronológica quando X é uma data; só essas linhas das colunas usadas são copiadas
+    valid = np.logical_and.reduce([x_values.notna().to_numpy()] +
+                                  [df[col].notna().to_numpy() for col in y_columns])
+    if is_date:
+        rows = profile.sort_order(x_column)
+        rows = rows[valid[rows]]
+    else:
+        rows = np.flatnonzero(valid)
+    chart_df = df[y_columns].take(rows)
+    chart_df.insert(0, x_column, x_values.array.take(rows), allow_duplicates=True)
     
     if len(chart_df) == 0:
         return {'chart_df': pd.DataFrame(), 'is_date': False, 'stats': {}}
     
-    # Verificar se a coluna X é uma data
-    is_date = False
-    try:
-        pd.to_datetime(chart_df[x_column])
-        is_date = True
-        # Converter e ordenar por data
-        chart_df[x_column] = pd.to_datetime(chart_df[x_column])
-        chart_df = chart_df.sort_values(x_column)
-    except:
-        pass
-    
     # Calcular estatísticas das colunas Y
     y_stats = {}
     for col in y_columns:
@@ -210,11 +3379,39 @@ def prepare_chart_data(df: pd.DataFrame, x_column: str, y_columns: List[str]) ->
             'max': chart_df[col].max(),
             'mean': chart_df[col].mean()
         }
+    total_points = len(chart_df)
+    
+    if aggregation is not None:
+        chart_df, n_groups = _aggregate_chart_data(chart_df, x_column, y_columns, aggregation, top_groups)
+        return {
+            'chart_df': chart_df,
+            'is_date': False,
+            'stats': y_stats,
+            'total_points': total_points,
+            'n_groups': n_groups
+        }
+    
+    if time_aggregation is not None and time_aggregation not in CHART_AGGREGATIONS:
+        raise ValueError(f"Agregação desconhecida: {time_aggregation}")
+    
+    # Datas com linhas demais: intervalos de tempo
+    time_bucket = None
+    if is_date and time_aggregation is not None and max_points is not None and total_points > max_points:
+        dates = chart_df[x_column]
+        time_bucket = choose_time_bucket(dates.min(), dates.max(), max_points)
+        if time_bucket is not None:
+            chart_df = _resample_chart_data(chart_df, x_column, y_columns, time_bucket, time_aggregation)
+    
+    if max_points is not None:
+        chart_df = downsample_chart_data(chart_df, y_columns, max_points)
     
     return {
         'chart_df': chart_df,
         'is_date': is_date,
-        'stats': y_stats
+        'stats': y_stats,
+        'total_points': total_points,
+        'time_bucket': time_bucket,
+        'time_aggregation': time_aggregation if time_bucket is not None else None
     }
 
 
@@ -6,13 +6,28 @@ import time
 from datetime import datetime
 from utils import (
     load_csv_file,
+    is_pyarrow_available,
+    CSV_ENGINES,
     get_dataframe_info,
-    filter_dataframe_by_text,
-    limit_dataframe_rows,
+    search_dataframe,
+    build_search_index,
+    build_trigram_index,
+    get_search_text_memory,
+    drop_search_text,
+    SEARCH_MODES,
+    TRIGRAM_INDEX_MIN_ROWS,
+    SEARCH_WORKERS,
+    PARALLEL_SEARCH_MIN_CELLS,
+    paginate_dataframe,
+    find_row_page,
+    PAGE_SIZES,
+    DEFAULT_PAGE_SIZE,
     calculate_numeric_statistics,
     calculate_summary_statistics,
     prepare_chart_data,
     calculate_chart_series_statistics,
+    CHART_AGGREGATIONS,
+    TOP_GROUPS,
     get_data_type_summary,
     create_info_dataframes
 )
@@ -59,25 +74,56 @@ uploaded_file = st.file_uploader(
     help="Escolha um arquivo .csv do seu computador"
 )
 
+with st.expander("⚙️ Opções de leitura"):
+    read_engine = st.selectbox(
+        "Motor de leitura:",
+        options=CSV_ENGINES,
+        help="O motor pyarrow faz a leitura em múltiplas threads"
+    )
+    use_arrow_dtypes = st.checkbox(
+        "Usar tipos Arrow (strings compactas)",
+        help="Armazena as colunas com tipos do Apache Arrow, reduzindo o uso de memória"
+    )
+    if (read_engine == "pyarrow" or use_arrow_dtypes) and not is_pyarrow_available():
+        st.caption("ℹ️ pyarrow não está instalado; será usado o leitor padrão")
+
 if uploaded_file is not None:
-    # Log do início do upload
-    start_time = time.time()
-    logger.info(f"Iniciando upload do arquivo: {uploaded_file.name} (tamanho: {uploaded_file.size} bytes)")
-    
-    # Usar função do utils para carregar o arquivo
-    df, error_message = load_csv_file(uploaded_file)
+    # Identifica o upload e as opções de leitura; o arquivo só é lido de novo se mudarem
+    upload_key = (getattr(uploaded_file, 'file_id', uploaded_file.name), uploaded_file.size,
+                  read_engine, use_arrow_dtypes)
     
-    if df is not None:
-        # Calcular duração do upload
-        upload_duration = time.time() - start_time
-        logger.info(f"Upload concluído com sucesso - Arquivo: {uploaded_file.name}, "
-                   f"Dimensões: {df.shape[0]}x{df.shape[1]}, "
-                   f"Duração: {upload_duration:.2f}s")
+    if st.session_state.get('upload_key') == upload_key and 'dataframe' in st.session_state:
+        df, error_message = st.session_state['dataframe'], None
+    else:
+        # Log do início do upload
+        start_time = time.time()
+        logger.info(f"Iniciando upload do arquivo: {uploaded_file.name} (tamanho: {uploaded_file.size} bytes)")
         
-        # Armazena no estado da sessão
-        st.session_state['dataframe'] = df
-        st.session_state['filename'] = uploaded_file.name
+        # Usar função do utils para carregar o arquivo
+        df, error_message = load_csv_file(
+            uploaded_file,
+            engine=read_engine,
+            dtype_backend="pyarrow" if use_arrow_dtypes else None
+        )
         
+        if df is not None:
+            # Calcular duração do upload
+            upload_duration = time.time() - start_time
+            logger.info(f"Upload concluído com sucesso - Arquivo: {uploaded_file.name}, "
+                       f"Dimensões: {df.shape[0]}x{df.shape[1]}, "
+                       f"Motor: {read_engine}, "
+                       f"Duração: {upload_duration:.2f}s")
+            
+            # Armazena no estado da sessão; o índice e o texto de busca do arquivo anterior são descartados
+            if 'dataframe' in st.session_state:
+                drop_search_text(st.session_state['dataframe'])
+            st.session_state['dataframe'] = df
+            st.session_state['filename'] = uploaded_file.name
+            st.session_state['upload_key'] = upload_key
+            st.session_state.pop('search_index', None)
+            st.session_state.pop('trigram_index', None)
+    
+    if df is not None:
         # Obter informações do DataFrame usando utils
         df_info = get_dataframe_info(df)
         
@@ -124,8 +170,12 @@ if 'dataframe' in st.session_state:
     if st.button("🗑️ Limpar dados carregados"):
         filename = st.session_state.get('filename', 'arquivo desconhecido')
         logger.info(f"Limpando dados carregados do arquivo: {filename}")
+        drop_search_text(st.session_state['dataframe'])
         del st.session_state['dataframe']
         del st.session_state['filename']
+        st.session_state.pop('upload_key', None)
+        st.session_state.pop('search_index', None)
+        st.session_state.pop('trigram_index', None)
         st.rerun()
 
     # Exibição do DataFrame com controles
@@ -133,7 +183,7 @@ if 'dataframe' in st.session_state:
     st.subheader("📋 Visualização dos Dados")
     
     # Controles de filtro e exibição
-    col1, col2 = st.columns([2, 1])
+    col1, col2, col3 = st.columns([2, 1, 1])
     
     with col1:
         search_text = st.text_input(
@@ -143,46 +193,164 @@ if 'dataframe' in st.session_state:
         )
     
     with col2:
-        max_rows = st.number_input(
-            "📊 Máximo de linhas a exibir",
-            min_value=10,
-            max_value=10000,
-            value=100,
-            step=50,
-            help="Limite a quantidade de linhas para melhor performance"
+        search_mode_labels = {
+            "contains": "Contém o texto",
+            "regex": "Expressão regular",
+            "exact": "Célula exata",
+            "token": "Palavras inteiras",
+            "prefix": "Início de palavra"
+        }
+        search_mode = st.selectbox(
+            "🔤 Modo de busca",
+            options=SEARCH_MODES,
+            format_func=search_mode_labels.get,
+            help="\"Contém o texto\" busca o texto literalmente (mais rápido); use \"Expressão regular\" "
+                 "para padrões. Os modos por palavra usam um índice criado uma vez por arquivo"
+        )
+        search_workers = st.number_input(
+            "🧵 Threads da busca",
+            min_value=1,
+            max_value=SEARCH_WORKERS * 2,
+            value=SEARCH_WORKERS,
+            step=1,
+            help=f"A busca é dividida entre threads a partir de {PARALLEL_SEARCH_MIN_CELLS:,} células"
+        )
+    
+    with col3:
+        page_size = st.selectbox(
+            "📊 Linhas por página",
+            options=PAGE_SIZES,
+            index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+            help="Só as linhas da página atual são enviadas ao navegador"
         )
     
+    # Restringir a busca a algumas colunas de texto evita converter e varrer as demais
+    search_columns = st.multiselect(
+        "🎯 Buscar apenas nas colunas",
+        options=df_info['text_columns'],
+        help="Deixe vazio para buscar em todas as colunas de texto"
+    )
+    
     # Aplicar filtros usando funções do utils
     start_filter_time = time.time()
-    df_display = df.copy()
-    original_rows = len(df_display)
+    original_rows = len(df)
+    mask = None
     
     # Filtro de busca por texto
     if search_text:
         logger.info(f"Aplicando filtro de busca: '{search_text}' em dataset com {original_rows} linhas")
         
-        df_display, found_count = filter_dataframe_by_text(df_display, search_text)
+        search_index = None
+        if search_mode in ("token", "prefix") and not search_columns:
+            # Índice criado na primeira busca por palavra e mantido até trocar de arquivo
+            if 'search_index' not in st.session_state:
+                index_start_time = time.time()
+                with st.spinner("Criando índice de busca..."):
+                    st.session_state['search_index'] = build_search_index(df)
+                logger.info(f"Índice de busca criado - Tokens: {len(st.session_state['search_index']['tokens'])}, "
+                           f"Duração: {time.time() - index_start_time:.3f}s")
+            search_index = st.session_state['search_index']
+        
+        trigram_index = None
+        if search_mode == "contains" and len(search_text) >= 3 and original_rows >= TRIGRAM_INDEX_MIN_ROWS:
+            # Em arquivos grandes, o índice de trigramas evita varrer todas as células
+            if 'trigram_index' not in st.session_state:
+                index_start_time = time.time()
+                with st.spinner("Criando índice de trigramas..."):
+                    st.session_state['trigram_index'] = build_trigram_index(df)
+                logger.info(f"Índice de trigramas criado - Colunas: {len(st.session_state['trigram_index']['columns'])}, "
+                           f"Duração: {time.time() - index_start_time:.3f}s")
+            trigram_index = st.session_state['trigram_index']
+        
+        # Filtra o DataFrame da sessão, cuja identidade guarda as buscas anteriores
+        search_error = None
+        column_hits = {}
+        try:
+            mask, column_hits = search_dataframe(df, search_text, mode=search_mode,
+                                                 columns=search_columns or None,
+                                                 index=search_index, trigram_index=trigram_index,
+                                                 n_workers=int(search_workers))
+            found_count = int(mask.sum())
+            if len(df_info['text_columns']) == 0:
+                # Sem colunas de texto a tabela continua completa
+                mask = None
+        except ValueError as e:
+            search_error = str(e)
+            mask = None
+            found_count = original_rows
         
         filter_duration = time.time() - start_filter_time
         
-        logger.info(f"Filtro aplicado - Termo: '{search_text}', "
+        logger.info(f"Filtro aplicado - Termo: '{search_text}', Modo: {search_mode}, Threads: {search_workers}, "
                    f"Resultados: {found_count}/{original_rows} linhas, "
                    f"Duração: {filter_duration:.3f}s")
         
-        if found_count == 0:
+        if search_error:
+            logger.warning(f"Busca inválida - Termo: '{search_text}', Erro: {search_error}")
+            st.error(f"❌ {search_error}")
+        elif found_count == 0:
             st.warning(f"⚠️ Nenhum resultado encontrado para '{search_text}'")
         elif len(df_info['text_columns']) == 0:
             st.warning("⚠️ Não há colunas de texto para realizar a busca")
         else:
             st.info(f"🔍 Encontrados {found_count} registros contendo '{search_text}'")
+            with st.expander("📍 Ocorrências por coluna"):
+                hits_df = pd.DataFrame({
+                    'Coluna': [str(column) for column in column_hits],
+                    'Linhas encontradas': list(column_hits.values())
+                }).sort_values('Linhas encontradas', ascending=False, kind='stable')
+                st.dataframe(hits_df, hide_index=True, use_container_width=True)
+        
+        # Texto em minúsculas guardado entre buscas; pode ser liberado se faltar memória
+        cached_columns, cached_bytes = get_search_text_memory(df)
+        if cached_columns > 0:
+            col_cache, col_drop = st.columns([3, 1])
+            with col_cache:
+                st.caption(f"🧠 Texto de busca em cache: {cached_columns} colunas, "
+                           f"{cached_bytes / 1024 / 1024:.1f} MB")
+            with col_drop:
+                if st.button("Liberar cache de busca"):
+                    freed_bytes = drop_search_text(df)
+                    logger.info(f"Texto de busca descartado: {freed_bytes / 1024 / 1024:.1f} MB")
     
-    # Limitar número de linhas
-    df_display, was_limited = limit_dataframe_rows(df_display, max_rows)
-    if was_limited:
-        st.info(f"📊 Exibindo as primeiras {max_rows} linhas de {len(df)} total")
+    # Paginação: volta à primeira página quando o filtro muda
+    total_rows = original_rows if mask is None else found_count
+    total_pages = max(1, -(-total_rows // page_size))
+    page_filter = (search_text, search_mode, tuple(search_columns), page_size)
+    if st.session_state.get('page_filter') != page_filter:
+        st.session_state['page_filter'] = page_filter
+        st.session_state['page_number'] = 1
+    
+    page_col1, page_col2 = st.columns(2)
+    with page_col1:
+        jump_row = st.number_input(
+            "↪️ Ir para a linha",
+            min_value=0,
+            max_value=max(original_rows - 1, 0),
+            value=None,
+            step=1,
+            help="Posição da linha no arquivo (a partir de 0); abre a página que a contém"
+        )
+        if jump_row is not None and jump_row != st.session_state.get('jump_row'):
+            st.session_state['page_number'] = find_row_page(jump_row, mask, page_size)
+        st.session_state['jump_row'] = jump_row
+        st.session_state['page_number'] = min(st.session_state.get('page_number', 1), total_pages)
+    with page_col2:
+        page_number = st.number_input(
+            "📄 Página",
+            min_value=1,
+            max_value=total_pages,
+            step=1,
+            key='page_number'
+        )
+    
+    df_display, page_number, total_pages = paginate_dataframe(df, mask, page_number, page_size)
+    first_row = (page_number - 1) * page_size
+    st.info(f"📊 Exibindo as linhas {first_row + min(len(df_display), 1)}–{first_row + len(df_display)} "
+            f"de {total_rows} (página {page_number} de {total_pages})")
     
     # Exibir informações do DataFrame filtrado
-    st.write(f"**Shape atual:** {df_display.shape[0]} linhas × {df_display.shape[1]} colunas")
+    st.write(f"**Shape atual:** {total_rows} linhas × {df.shape[1]} colunas")
     
     # Exibir o DataFrame
     st.dataframe(df_display, use_container_width=True, height=500)
@@ -320,6 +488,37 @@ if 'dataframe' in st.session_state:
             help="Selecione uma ou mais colunas numéricas para plotar"
         )
         
+        # Agregação por valor de X (padrão para barras: soma)
+        agg_col1, agg_col2 = st.columns([1, 2])
+        
+        with agg_col1:
+            aggregation_labels = {
+                None: "Nenhuma",
+                "sum": "Soma",
+                "mean": "Média",
+                "count": "Contagem",
+                "min": "Mínimo",
+                "max": "Máximo"
+            }
+            aggregation = st.selectbox(
+                "🧮 Agregação por X:",
+                options=[None] + CHART_AGGREGATIONS,
+                index=1 if chart_type == "Barras" and x_col != "(índice)" else 0,
+                format_func=aggregation_labels.get,
+                disabled=x_col == "(índice)",
+                help="Agrupa as linhas pelo valor de X; útil quando X é uma categoria ou um identificador"
+            )
+        
+        with agg_col2:
+            top_groups = st.slider(
+                "🏆 Grupos exibidos:",
+                min_value=1,
+                max_value=100,
+                value=TOP_GROUPS,
+                disabled=aggregation is None,
+                help="Os maiores grupos (pela primeira coluna Y) viram barras; os demais são reunidos em \"Outros\""
+            )
+        
         # Controle de limite de dados
         max_points = st.slider(
             "🎯 Máximo de pontos no gráfico:",
@@ -327,25 +526,32 @@ if 'dataframe' in st.session_state:
             max_value=10000,
             value=200,
             step=50,
-            help="Limite a quantidade de pontos para melhor performance"
+            disabled=aggregation is not None,
+            help="Séries maiores são reduzidas mantendo o intervalo completo e os picos e vales"
         )
         
         if y_cols:
             try:
                 # Log da preparação do gráfico
                 start_chart_time = time.time()
-                logger.info(f"Preparando gráfico - Tipo: {chart_type}, Eixo X: {x_col}, Eixo Y: {y_cols}")
+                logger.info(f"Preparando gráfico - Tipo: {chart_type}, Eixo X: {x_col}, Eixo Y: {y_cols}, "
+                           f"Agregação: {aggregation}")
                 
                 # Preparar dados para o gráfico usando função do utils
-                chart_df, chart_info = prepare_chart_data(df, x_col, y_cols, max_points)
+                chart_df, chart_info = prepare_chart_data(df, x_col, y_cols, max_points, aggregation, top_groups)
                 
                 chart_duration = time.time() - start_chart_time
                 logger.info(f"Dados para gráfico preparados - Pontos: {len(chart_df)}, "
                            f"Duração: {chart_duration:.3f}s")
                 
-                # Mostrar informação sobre limitação de dados
-                if chart_info['was_limited']:
-                    st.info(f"📊 Exibindo os primeiros {len(chart_df)} pontos de {len(df)} total")
+                # Mostrar informação sobre agrupamento ou limitação de dados
+                if chart_info['aggregation'] is not None:
+                    others = (f"; os demais {chart_info['n_groups'] - top_groups} em \"Outros\""
+                              if chart_info['n_groups'] > top_groups else "")
+                    st.info(f"📊 {len(df)} linhas agrupadas em {chart_info['n_groups']} valores de {x_col}{others}")
+                elif chart_info['was_limited']:
+                    st.info(f"📊 Exibindo {len(chart_df)} pontos de {len(df)} total "
+                            f"(primeiro, último, mínimo e máximo de cada intervalo)")
                 
                 # Criar gráfico
                 if chart_type == "Linha":
@@ -368,7 +574,7 @@ if 'dataframe' in st.session_state:
                 
                 # Mostrar estatísticas básicas das séries
                 st.markdown("#### 📊 Estatísticas das Séries Plotadas")
-                series_stats_df = calculate_chart_series_statistics(chart_df, y_cols)
+                series_stats_df = calculate_chart_series_statistics(df, y_cols)
                 st.dataframe(series_stats_df, use_container_width=True, hide_index=True)
             
             except Exception as e:
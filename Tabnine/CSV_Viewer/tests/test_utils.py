@@ -24,10 +24,28 @@ try:
     from utils import (
         load_csv_file,
         get_dataframe_info,
+        get_dataset_profile,
         filter_dataframe_by_text,
+        search_dataframe,
+        build_search_index,
+        search_index_mask,
+        build_trigram_index,
+        trigram_search_mask,
+        clear_frame_states,
+        compile_search_pattern,
+        get_search_text,
+        get_search_text_memory,
+        drop_search_text,
         limit_dataframe_rows,
+        paginate_dataframe,
+        find_row_page,
         calculate_numeric_statistics,
-        calculate_summary_statistics
+        calculate_summary_statistics,
+        prepare_chart_data,
+        downsample_indices,
+        aggregate_chart_data,
+        get_sort_order,
+        get_read_options
     )
     print("✅ Funções importadas com sucesso do utils.py")
 except ImportError as e:
@@ -187,6 +205,59 @@ class TestLoadCSVFile:
             assert df.isnull().sum().sum() == 2  # 2 valores ausentes
 
 
+class TestArrowBackend:
+    """Testes para o motor pyarrow e tipos Arrow, com fallback"""
+    
+    CSV_CONTENT = (
+        "nome,cidade,idade,salario\n"
+        "João Silva,São Paulo,25,5000.5\n"
+        "Maria Santos,,30,\n"
+        "Pedro Lima,Belo Horizonte,,7000.0\n"
+    )
+    
+    def test_read_options_fallback_without_pyarrow(self):
+        """Testa fallback para o leitor padrão sem pyarrow"""
+        with patch('utils.is_pyarrow_available', return_value=False):
+            options = get_read_options("pyarrow", "pyarrow")
+        
+        assert options == {'engine': 'c'}
+    
+    def test_load_csv_invalid_engine(self):
+        """Testa motor de leitura inválido"""
+        df, error = load_csv_file(StringIO(self.CSV_CONTENT), engine="rapido")
+        
+        assert df is None
+        assert "Motor de leitura inválido" in error
+    
+    def test_arrow_backend_same_results(self):
+        """Testa que busca, info e estatísticas não mudam com tipos Arrow"""
+        pytest.importorskip("pyarrow")
+        numpy_df, _ = load_csv_file(StringIO(self.CSV_CONTENT))
+        arrow_df, error = load_csv_file(StringIO(self.CSV_CONTENT), engine="pyarrow", dtype_backend="pyarrow")
+        
+        assert error is None
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in arrow_df.dtypes)
+        
+        numpy_info = get_dataframe_info(numpy_df)
+        arrow_info = get_dataframe_info(arrow_df)
+        assert arrow_info['numeric_columns'] == numpy_info['numeric_columns']
+        assert arrow_info['text_columns'] == numpy_info['text_columns']
+        assert arrow_info['missing_values'] == numpy_info['missing_values']
+        
+        for term in ['silva', 'nan', 'paulo']:
+            expected_df, expected_count = filter_dataframe_by_text(numpy_df, term)
+            result_df, result_count = filter_dataframe_by_text(arrow_df, term)
+            assert result_count == expected_count
+            assert result_df.index.tolist() == expected_df.index.tolist()
+        
+        columns = numpy_info['numeric_columns']
+        pd.testing.assert_frame_equal(
+            calculate_numeric_statistics(arrow_df, columns),
+            calculate_numeric_statistics(numpy_df, columns),
+            check_dtype=False
+        )
+
+
 class TestGetDataFrameInfo:
     """Testes para extração de informações do DataFrame"""
     
@@ -250,6 +321,33 @@ class TestGetDataFrameInfo:
         assert info['text_count'] == 3
         assert len(info['numeric_columns']) == 0
         assert len(info['text_columns']) == 3
+    
+    def test_dataframe_info_reuses_profile(self):
+        """Testa que as contagens são calculadas uma única vez por DataFrame"""
+        df = pd.DataFrame({'nome': ['João', None], 'idade': [25, 30]})
+        profile = get_dataset_profile(df)
+        
+        with patch.object(pd.Series, 'isnull') as isnull:
+            info = get_dataframe_info(df)
+            get_dataframe_info(df)
+        
+        isnull.assert_not_called()
+        assert get_dataset_profile(df) is profile
+        assert info['missing_values'] == {'nome': 1, 'idade': 0}
+        
+        # Alterar a lista retornada não altera o perfil
+        info['numeric_columns'].append('outra')
+        assert get_dataframe_info(df)['numeric_columns'] == ['idade']
+    
+    def test_dataframe_info_profile_rebuilt(self):
+        """Testa que o perfil é refeito quando os tipos mudam ou para outro DataFrame"""
+        df = pd.DataFrame({'a': ['1', '2'], 'b': [1, 2]})
+        profile = get_dataset_profile(df)
+        
+        assert get_dataset_profile(df.copy()) is not profile
+        
+        df['a'] = df['a'].astype(int)
+        assert get_dataframe_info(df)['numeric_columns'] == ['a', 'b']
 
 
 class TestFilterDataFrameByText:
@@ -329,6 +427,365 @@ class TestFilterDataFrameByText:
         
         assert count == 0
         assert len(filtered_df) == len(df)  # Retorna DataFrame original
+    
+    def test_filter_by_text_max_rows(self):
+        """Testa que max_rows limita as linhas retornadas, mas não a contagem"""
+        df = pd.DataFrame({'nome': ['Ana', 'Bruno', 'Carla', 'Diana'], 'idade': [1, 2, 3, 4]})
+        
+        filtered_df, count = filter_dataframe_by_text(df, 'a', max_rows=2)
+        
+        assert count == 3
+        assert filtered_df['nome'].tolist() == ['Ana', 'Carla']
+        assert filter_dataframe_by_text(df, '')[0] is df
+
+
+class TestSearchIndex:
+    """Testes para o índice invertido de busca por palavras"""
+    
+    def _sample_df(self):
+        return pd.DataFrame({
+            'nome': ['João Silva', 'Maria Silva', 'Pedro Silveira', None],
+            'cidade': ['São Paulo', 'Rio de Janeiro', 'São Paulo', 'Santos'],
+            'idade': [25, 30, 35, 40]
+        })
+    
+    def test_build_index_text_columns_only(self):
+        """Testa que apenas colunas de texto são indexadas"""
+        index = build_search_index(self._sample_df())
+        
+        assert list(index['tokens']) == sorted(index['tokens'])
+        assert 'silva' in index['tokens']
+        assert '25' not in index['tokens']
+        assert len(index['offsets']) == len(index['tokens']) + 1
+    
+    def test_index_whole_word_and_prefix(self):
+        """Testa consultas por palavra inteira e por início de palavra"""
+        index = build_search_index(self._sample_df())
+        
+        assert search_index_mask(index, 'Silva').tolist() == [True, True, False, False]
+        assert search_index_mask(index, 'silv', prefix=True).tolist() == [True, True, True, False]
+        assert search_index_mask(index, 'são paulo silva').tolist() == [True, False, False, False]
+        assert search_index_mask(index, '???') is None
+    
+    def test_filter_with_index_matches_scan(self):
+        """Testa que o filtro com índice retorna o mesmo resultado da varredura"""
+        df = self._sample_df()
+        index = build_search_index(df)
+        
+        for search_text in ['silva', 'SÃO', 'rio de', 'none', 'sil']:
+            for mode in ['token', 'prefix']:
+                with_index, count = filter_dataframe_by_text(df, search_text, mode=mode, index=index)
+                without_index, expected = filter_dataframe_by_text(df, search_text, mode=mode)
+                
+                assert count == expected
+                pd.testing.assert_frame_equal(with_index, without_index)
+    
+    def test_filter_invalid_mode(self):
+        """Testa modo de busca inválido"""
+        with pytest.raises(ValueError):
+            filter_dataframe_by_text(self._sample_df(), 'silva', mode='fuzzy')
+
+
+class TestSearchModes:
+    """Testes para os modos literal, expressão regular e célula exata"""
+    
+    def _sample_df(self):
+        return pd.DataFrame({
+            'codigo': ['a.b', 'axb', 'f(x)', 'A.B'],
+            'cidade': ['São Paulo', 'São Paulo Norte', 'são paulo', 'Santos'],
+            'valor': [1.5, 10.0, 2.0, 1.0]
+        })
+    
+    def test_contains_is_literal(self):
+        """Testa que metacaracteres são buscados literalmente no modo padrão"""
+        clear_frame_states()
+        df = self._sample_df()
+        
+        filtered_df, count = filter_dataframe_by_text(df, 'a.b')
+        assert count == 2
+        assert filtered_df.index.tolist() == [0, 3]
+        assert filter_dataframe_by_text(df, 'f(')[1] == 1
+    
+    def test_regex_mode_compiles_once(self):
+        """Testa o modo regex e o cache da expressão compilada"""
+        clear_frame_states()
+        compile_search_pattern.cache_clear()
+        df = self._sample_df()
+        
+        filtered_df, count = filter_dataframe_by_text(df, 'a.b', mode="regex")
+        filter_dataframe_by_text(df, 'a.b', mode="regex")
+        
+        assert count == 3
+        assert compile_search_pattern.cache_info().misses == 1
+        with pytest.raises(ValueError, match="Expressão regular inválida"):
+            filter_dataframe_by_text(df, 'f(', mode="regex")
+    
+    def test_exact_mode(self):
+        """Testa que o modo exato compara a célula inteira, sem diferenciar maiúsculas"""
+        clear_frame_states()
+        df = self._sample_df()
+        
+        filtered_df, count = filter_dataframe_by_text(df, 'SÃO PAULO', mode="exact")
+        assert filtered_df.index.tolist() == [0, 2]
+        assert filter_dataframe_by_text(df, 'paulo', mode="exact")[1] == 0
+        assert filter_dataframe_by_text(df, 'santos', mode="exact")[1] == 1
+
+
+class TestTrigramIndex:
+    """Testes para o índice de trigramas da busca por trecho"""
+    
+    def _sample_df(self):
+        return pd.DataFrame({
+            'nome': ['João Silva', 'Maria Silva', 'Pedro Silveira', None] * 3,
+            'cidade': ['São Paulo', 'Rio de Janeiro', 'São Paulo', 'Santos'] * 3,
+            'idade': [25, 30, 35, 40] * 3
+        })
+    
+    def test_trigram_matches_scan(self):
+        """Testa que o índice retorna o mesmo resultado da varredura"""
+        df = self._sample_df()
+        index = build_trigram_index(df)
+        
+        for search_text in ['silv', 'SÃO P', 'none', 'o de j', 'xyz', 'sa', 'r.o']:
+            with_index, count = filter_dataframe_by_text(df, search_text, trigram_index=index)
+            without_index, expected = filter_dataframe_by_text(df, search_text)
+            
+            assert count == expected
+            pd.testing.assert_frame_equal(with_index, without_index)
+    
+    def test_trigram_only_text_columns(self):
+        """Testa que apenas colunas de texto são indexadas"""
+        index = build_trigram_index(self._sample_df())
+        
+        assert [column['column'] for column in index['columns']] == ['nome', 'cidade']
+    
+    def test_trigram_fallback_queries(self):
+        """Testa que buscas curtas não usam o índice e metacaracteres são literais"""
+        df = self._sample_df()
+        index = build_trigram_index(df)
+        
+        assert trigram_search_mask(df, index, 'sa') is None
+        assert not trigram_search_mask(df, index, 'sil.a').any()
+        assert trigram_search_mask(df, index, 'silveira').sum() == 3
+    
+    def test_trigram_values_equal_in_pandas(self):
+        """Testa valores que o pandas agrupa juntos mas que a busca enxerga diferentes (None/NaN, 1/1.0/True)"""
+        values = [None, np.nan, 1, 1.0, True, 'none', '1.0', 'true', 'nan', 0, False]
+        df = pd.DataFrame({'misto': pd.Series(values * 20, dtype=object)})
+        index = build_trigram_index(df)
+        
+        for search_text in ['none', 'nan', '1.0', 'true', 'false']:
+            mask = trigram_search_mask(df, index, search_text)
+            expected, _ = filter_dataframe_by_text(df, search_text)
+            
+            assert df.index[mask].equals(expected.index)
+    
+    def test_trigram_columns_without_trigrams(self):
+        """Testa colunas sem valores de 3+ caracteres (siglas, pontuação) e DataFrame sem linhas"""
+        df = pd.DataFrame({'sexo': ['M', 'F'] * 500, 'uf': ['SP', 'RJ'] * 500, 'sinal': ['!?', '-'] * 500})
+        index = build_trigram_index(df)
+        
+        assert all(column['offsets'].tolist() == [0] for column in index['columns'])
+        assert not trigram_search_mask(df, index, 'abc').any()
+        
+        df['nome'] = ['Ana', 'Bia'] * 500
+        index = build_trigram_index(df)
+        with_index, count = filter_dataframe_by_text(df, 'ana', trigram_index=index)
+        without_index, expected = filter_dataframe_by_text(df, 'ana')
+        assert count == expected == 500
+        pd.testing.assert_frame_equal(with_index, without_index)
+        
+        empty = df.iloc[:0]
+        assert trigram_search_mask(empty, build_trigram_index(empty), 'ana').tolist() == []
+
+
+class TestIncrementalSearch:
+    """Testes para o refinamento de buscas durante a digitação"""
+    
+    def _sample_df(self):
+        return pd.DataFrame({
+            'nome': ['João Silva', 'Maria Silva', 'Pedro Silveira', 'Ana Souza'] * 5,
+            'cidade': ['São Paulo', 'São Pedro', 'Santos', 'São Paulo'] * 5
+        })
+    
+    def test_refined_search_matches_full_scan(self):
+        """Testa que refinar a busca anterior retorna o mesmo resultado"""
+        import utils
+        clear_frame_states()
+        df = self._sample_df()
+        
+        filter_dataframe_by_text(df, 'são')
+        with patch.object(utils, '_scan_text_columns', wraps=utils._scan_text_columns) as scan:
+            refined, count = filter_dataframe_by_text(df, 'são paulo')
+        
+        # Apenas as 15 linhas com "são" são verificadas de novo
+        assert len(scan.call_args[0][3]) == 15
+        expected, expected_count = filter_dataframe_by_text(df.copy(), 'são paulo')
+        assert count == expected_count == 10
+        pd.testing.assert_frame_equal(refined, expected)
+    
+    def test_unrelated_or_regex_search_rescans(self):
+        """Testa que buscas que não estendem a anterior varrem o DataFrame todo"""
+        import utils
+        clear_frame_states()
+        df = self._sample_df()
+        
+        filter_dataframe_by_text(df, 'silva')
+        with patch.object(utils, '_scan_text_columns', wraps=utils._scan_text_columns) as scan:
+            _, count = filter_dataframe_by_text(df, 'santos')
+            _, regex_count = filter_dataframe_by_text(df, 'santos|silva', mode="regex")
+        
+        assert [len(call[0][0]) for call in scan.call_args_list] == [20, 20]
+        assert count == 5
+        assert regex_count == 15
+
+
+class TestSearchDataframe:
+    """Testes para a busca restrita a colunas com ocorrências por coluna"""
+    
+    def _sample_df(self):
+        return pd.DataFrame({
+            'nome': ['João Silva', 'Maria Souza', 'Pedro Silveira', 'Ana Paula'],
+            'cidade': ['São Paulo', 'Silvânia', 'Santos', 'São Paulo'],
+            'idade': [30, 25, 35, 28]
+        })
+    
+    def test_counts_per_column(self):
+        """Testa as linhas encontradas em cada coluna na mesma busca"""
+        clear_frame_states()
+        mask, counts = search_dataframe(self._sample_df(), 'silv')
+        
+        assert mask.tolist() == [True, True, True, False]
+        assert counts == {'nome': 2, 'cidade': 1}
+    
+    def test_columns_restrict_search(self):
+        """Testa que só as colunas escolhidas são buscadas, em todos os modos"""
+        clear_frame_states()
+        df = self._sample_df()
+        index = build_search_index(df)
+        trigram_index = build_trigram_index(df)
+        
+        for mode in ["contains", "regex", "exact", "token", "prefix"]:
+            mask, counts = search_dataframe(df, 'paulo' if mode != "exact" else 'são paulo', mode=mode,
+                                            columns=['cidade'], index=index, trigram_index=trigram_index)
+            assert mask.tolist() == [True, False, False, True], mode
+            assert counts == {'cidade': 2}, mode
+        
+        _, count = filter_dataframe_by_text(df, 'paula', columns=['cidade'])
+        assert count == 0
+    
+    def test_refinement_not_reused_for_wider_columns(self):
+        """Testa que uma busca restrita não é refinada quando as colunas aumentam"""
+        clear_frame_states()
+        df = self._sample_df()
+        
+        search_dataframe(df, 'sil', columns=['cidade'])
+        mask, counts = search_dataframe(df, 'silv')
+        
+        assert mask.sum() == 3
+        assert counts == {'nome': 2, 'cidade': 1}
+    
+    def test_token_counts_with_index(self):
+        """Testa as ocorrências dos modos por palavra com e sem índice"""
+        clear_frame_states()
+        df = self._sample_df()
+        
+        expected = search_dataframe(df, 'são paulo', mode="token")
+        mask, counts = search_dataframe(df, 'são paulo', mode="token", index=build_search_index(df))
+        
+        assert mask.tolist() == expected[0].tolist() == [True, False, False, True]
+        assert counts == expected[1] == {'nome': 0, 'cidade': 2}
+    
+    def test_unknown_column_raises(self):
+        """Testa que colunas inexistentes geram ValueError"""
+        with pytest.raises(ValueError):
+            search_dataframe(self._sample_df(), 'silva', columns=['email'])
+
+
+class TestSearchText:
+    """Testes para o texto em minúsculas guardado para a busca"""
+    
+    def test_text_built_once_and_reused(self):
+        """Testa que o texto de cada coluna é gerado só na primeira busca"""
+        import utils
+        clear_frame_states()
+        df = pd.DataFrame({'nome': ['João SILVA', 'Maria Souza'], 'idade': [30, 25]})
+        
+        with patch.object(utils, '_to_search_text', wraps=utils._to_search_text) as render:
+            filter_dataframe_by_text(df, 'silva')
+            filter_dataframe_by_text(df, 'SOUZA')
+            _, regex_count = filter_dataframe_by_text(df, r'^jo|a$', mode="regex")
+        
+        # Só a coluna de texto é convertida, uma única vez
+        assert render.call_count == 1
+        assert regex_count == 2
+        assert get_search_text(df, 0).tolist() == ['joão silva', 'maria souza']
+    
+    def test_memory_reported_and_dropped(self):
+        """Testa o relatório de memória e o descarte do texto guardado"""
+        clear_frame_states()
+        df = pd.DataFrame({'nome': ['Ana', 'Bruno'], 'cidade': ['Recife', 'Natal']})
+        assert get_search_text_memory(df) == (0, 0)
+        
+        filter_dataframe_by_text(df, 'an')
+        columns, nbytes = get_search_text_memory(df)
+        assert columns == 2
+        assert nbytes > 0
+        
+        assert drop_search_text() == nbytes
+        assert get_search_text_memory(df) == (0, 0)
+        _, count = filter_dataframe_by_text(df, 'natal')
+        assert count == 1
+    
+    def test_budget_keeps_most_recent_column(self):
+        """Testa que o orçamento descarta as colunas usadas há mais tempo"""
+        clear_frame_states()
+        df = pd.DataFrame({'nome': ['Ana'], 'cidade': ['Recife']})
+        
+        get_search_text(df, 0, max_mb=1e-9)
+        get_search_text(df, 1, max_mb=1e-9)
+        
+        assert get_search_text_memory(df)[0] == 1
+
+
+class TestParallelSearch:
+    """Testes para a busca paralela em fatias de linhas e colunas"""
+    
+    def _sample_df(self):
+        rng = np.random.default_rng(1)
+        return pd.DataFrame({
+            'nome': rng.choice(['Ana Silva', 'Bruno Costa', 'Carla Souza'], 500),
+            'cidade': rng.choice(['São Paulo', 'Recife', 'Natal'], 500),
+            'valor': rng.integers(0, 1000, 500)
+        })
+    
+    def test_parallel_matches_serial(self):
+        """Testa que a busca em threads retorna as mesmas linhas da serial"""
+        import utils
+        df = self._sample_df()
+        
+        for mode, search_text in [("contains", "silva"), ("regex", "rec|nat"), ("token", "são")]:
+            clear_frame_states()
+            expected, expected_count = filter_dataframe_by_text(df, search_text, mode=mode)
+            clear_frame_states()
+            with patch.object(utils, 'PARALLEL_SEARCH_MIN_CELLS', 100), \
+                    patch.object(utils, 'PARALLEL_SHARD_MIN_ROWS', 32), \
+                    patch.object(utils, 'ThreadPoolExecutor', wraps=utils.ThreadPoolExecutor) as pool:
+                result, count = filter_dataframe_by_text(df, search_text, mode=mode, n_workers=4)
+            
+            assert pool.called
+            assert count == expected_count > 0
+            pd.testing.assert_frame_equal(result, expected)
+    
+    def test_small_dataframe_stays_serial(self):
+        """Testa que DataFrames pequenos não criam threads"""
+        import utils
+        clear_frame_states()
+        with patch.object(utils, 'ThreadPoolExecutor') as pool:
+            _, count = filter_dataframe_by_text(self._sample_df(), 'silva', n_workers=8)
+        
+        assert not pool.called
+        assert count > 0
 
 
 class TestLimitDataFrameRows:
@@ -362,6 +819,58 @@ class TestLimitDataFrameRows:
         
         assert not was_limited
         assert len(limited_df) == 3
+    
+    def test_limit_rows_with_mask(self):
+        """Testa limitação das linhas de uma máscara de filtro"""
+        df = pd.DataFrame({'x': [1, 2, 3, 4, 5, 6]})
+        mask = df['x'].to_numpy() % 2 == 0
+        
+        limited_df, was_limited = limit_dataframe_rows(df, 2, mask)
+        
+        assert was_limited
+        assert list(limited_df['x']) == [2, 4]
+        assert not limit_dataframe_rows(df, 3, mask)[1]
+
+
+class TestPaginateDataframe:
+    """Testes para a paginação da tabela"""
+    
+    def test_page_without_mask(self):
+        """Testa a página do DataFrame completo"""
+        df = pd.DataFrame({'n': range(25)})
+        page_df, page, total_pages = paginate_dataframe(df, page=3, page_size=10)
+        
+        assert page_df['n'].tolist() == list(range(20, 25))
+        assert (page, total_pages) == (3, 3)
+    
+    def test_page_from_mask(self):
+        """Testa que a página vem da máscara, mantendo o índice original"""
+        df = pd.DataFrame({'n': range(25)}, index=range(100, 125))
+        mask = (df['n'] % 3 == 0).to_numpy()
+        page_df, page, total_pages = paginate_dataframe(df, mask, page=2, page_size=4)
+        
+        assert page_df.index.tolist() == [112, 115, 118, 121]
+        assert total_pages == 3
+    
+    def test_page_clamped(self):
+        """Testa páginas fora do intervalo e filtros sem resultado"""
+        df = pd.DataFrame({'n': range(25)})
+        
+        assert paginate_dataframe(df, page=99, page_size=10)[1] == 3
+        page_df, page, total_pages = paginate_dataframe(df, np.zeros(25, dtype=bool), page=2)
+        assert page_df.empty
+        assert (page, total_pages) == (1, 1)
+        with pytest.raises(ValueError):
+            paginate_dataframe(df, page_size=0)
+    
+    def test_find_row_page(self):
+        """Testa a página aberta ao ir para uma linha"""
+        mask = np.arange(25) % 2 == 0
+        
+        assert find_row_page(19, page_size=10) == 2
+        # Linha 9 fora do filtro: página da linha 10 (6ª filtrada)
+        assert find_row_page(9, mask, page_size=2) == 3
+        assert find_row_page(24, mask, page_size=5) == 3
 
 
 class TestCalculateNumericStatistics:
@@ -424,6 +933,35 @@ class TestCalculateNumericStatistics:
         assert stats['Máximo'] == 50.0
         # Corrigir o valor esperado do desvio padrão
         assert abs(stats['Desvio Padrão'] - 15.81) < 0.01  # Usar aproximação
+    
+    def test_calculate_statistics_matches_pandas(self):
+        """Testa que o cálculo em blocos é idêntico às reduções do pandas"""
+        rng = np.random.default_rng(3)
+        n = 20_001
+        df = pd.DataFrame({
+            'valor': rng.normal(1e6, 3, n),
+            'taxa': np.where(rng.random(n) < 0.2, np.nan, rng.random(n)),
+            'quantidade': rng.integers(-10**9, 10**9, n),
+            'nota': rng.integers(0, 10, n).astype(np.int8),
+            'peso': np.where(rng.random(n) < 0.1, np.nan, rng.normal(70, 9, n)).astype(np.float32),
+            'vazia': np.full(n, np.nan),
+            'estoque': pd.array(np.where(rng.random(n) < 0.1, None, rng.integers(0, 1000, n)), dtype='Int64')
+        })
+        columns = list(df.columns)
+        
+        expected = pd.DataFrame({
+            'Coluna': columns,
+            'Contagem': [df[col].count() for col in columns],
+            'Média': [df[col].mean() for col in columns],
+            'Soma': [df[col].sum() for col in columns],
+            'Mínimo': [df[col].min() for col in columns],
+            'Máximo': [df[col].max() for col in columns],
+            'Desvio Padrão': [df[col].std() for col in columns]
+        })
+        for stat in ['Média', 'Soma', 'Mínimo', 'Máximo', 'Desvio Padrão']:
+            expected[stat] = expected[stat].round(2)
+        
+        pd.testing.assert_frame_equal(calculate_numeric_statistics(df, columns), expected)
 
 
 class TestCalculateSummaryStatistics:
@@ -453,3 +991,114 @@ class TestCalculateSummaryStatistics:
         assert summary['total_sum'] == 0.0
         assert summary['avg_mean'] == 0.0
         assert summary['total_count'] == 0
+
+
+class TestPrepareChartData:
+    """Testes para preparação e redução dos dados do gráfico"""
+    
+    def test_small_dataframe_unchanged(self):
+        """Testa que DataFrames menores que o limite não são reduzidos"""
+        df = pd.DataFrame({'x': ['a', 'b', 'c'], 'y': [1, 3, 2]})
+        
+        chart_df, chart_info = prepare_chart_data(df, 'x', ['y'], max_points=10)
+        
+        assert chart_df['y'].tolist() == [1, 3, 2]
+        assert chart_info['was_limited'] is False
+        assert chart_info['original_length'] == 3
+    
+    def test_downsampling_keeps_range_and_extremes(self):
+        """Testa que a redução mantém o eixo X completo e os extremos das séries"""
+        rng = np.random.default_rng(2)
+        n = 50_001
+        df = pd.DataFrame({'a': np.cumsum(rng.standard_normal(n)), 'b': rng.random(n)})
+        df.loc[::9, 'b'] = np.nan
+        
+        chart_df, chart_info = prepare_chart_data(df, '(índice)', ['a', 'b'], max_points=300)
+        
+        assert chart_info['was_limited'] is True
+        assert len(chart_df) <= 300
+        assert chart_df['Índice'].iloc[0] == 0
+        assert chart_df['Índice'].iloc[-1] == n - 1
+        assert chart_df['Índice'].is_monotonic_increasing
+        for col in ['a', 'b']:
+            assert chart_df[col].min() == df[col].min()
+            assert chart_df[col].max() == df[col].max()
+    
+    def test_downsample_indices_sorted_dates(self):
+        """Testa a redução depois de ordenar uma coluna de datas"""
+        dates = pd.date_range('2024-01-01', periods=1000, freq='h')
+        df = pd.DataFrame({'data': dates[::-1], 'valor': np.arange(1000)})
+        
+        chart_df, chart_info = prepare_chart_data(df, 'data', ['valor'], max_points=40)
+        
+        assert chart_info['is_date_sorted'] is True
+        assert chart_df['data'].iloc[0] == dates[0]
+        assert chart_df['data'].iloc[-1] == dates[-1]
+        assert len(downsample_indices(df, ['valor'], 40)) <= 40
+    
+    def test_date_sort_order_reused(self):
+        """Testa que a ordem das datas é calculada uma vez e reaproveitada com outras colunas Y"""
+        rng = np.random.default_rng(5)
+        n = 2_000
+        df = pd.DataFrame({'data': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 30, n), unit='D'),
+                           'a': rng.random(n), 'b': rng.random(n)})
+        df.loc[::13, 'data'] = pd.NaT
+        
+        with patch.object(pd.arrays.DatetimeArray, 'argsort', autospec=True,
+                          side_effect=pd.arrays.DatetimeArray.argsort) as argsort:
+            first, _ = prepare_chart_data(df, 'data', ['a'], max_points=n)
+            second, _ = prepare_chart_data(df, 'data', ['b'], max_points=n)
+        
+        assert argsort.call_count == 1
+        expected = df.sort_values('data', kind='stable')
+        assert first['a'].tolist() == expected['a'].tolist()
+        assert second['b'].tolist() == expected['b'].tolist()
+        assert get_sort_order(df, 'data') is get_sort_order(df, 'data')
+    
+    @pytest.mark.parametrize("aggregation", ["sum", "mean", "count", "min", "max"])
+    def test_aggregation_top_groups_and_others(self, aggregation):
+        """Testa a agregação por X com os maiores grupos e o grupo Outros"""
+        rng = np.random.default_rng(4)
+        n = 5_000
+        df = pd.DataFrame({'produto': rng.integers(0, 200, n), 'vendas': rng.random(n) * 50})
+        df.loc[::11, 'vendas'] = np.nan
+        
+        chart_df, chart_info = prepare_chart_data(df, 'produto', ['vendas'], 200, aggregation, top_groups=8)
+        
+        # Empates ficam na ordem em que os grupos aparecem
+        expected = df.groupby('produto', sort=False)['vendas'].agg(aggregation)
+        top = expected.sort_values(ascending=False, kind='stable').head(8)
+        rest = df.loc[~df['produto'].isin(top.index), 'vendas'].agg(aggregation)
+        
+        assert chart_info['aggregation'] == aggregation
+        assert chart_info['n_groups'] == len(expected)
+        assert chart_df['produto'].tolist() == [str(i) for i in top.index] + ['Outros']
+        np.testing.assert_allclose(chart_df['vendas'].to_numpy(dtype=float), list(top) + [rest])
+    
+    def test_aggregation_invalid_and_index_axis(self):
+        """Testa agregação inválida e o eixo "(índice)", em que a agregação é ignorada"""
+        df = pd.DataFrame({'cat': ['a', 'b', 'a'], 'v': [1, 2, 3]})
+        
+        with pytest.raises(ValueError):
+            aggregate_chart_data(df, 'cat', ['v'], 'median')
+        with pytest.raises(ValueError):
+            aggregate_chart_data(df, 'cat', ['v'], 'sum', top_groups=0)
+        
+        chart_df, n_groups = aggregate_chart_data(df, 'cat', ['v'], 'sum')
+        assert chart_df['v'].tolist() == [4, 2]
+        assert n_groups == 2
+        
+        chart_df, chart_info = prepare_chart_data(df, '(índice)', ['v'], 10, 'sum')
+        assert chart_info['aggregation'] is None
+        assert len(chart_df) == 3
+    
+    def test_aggregation_real_others_group(self):
+        """Testa que um grupo real chamado "Outros" não é sobrescrito pelo grupo dos demais"""
+        df = pd.DataFrame({'cat': ['Outros'] * 50 + [f'g{i}' for i in range(30)] * 2, 'v': range(110)})
+        
+        chart_df, n_groups = aggregate_chart_data(df, 'cat', ['v'], 'sum', top_groups=5)
+        
+        assert n_groups == 31
+        assert chart_df['cat'].tolist() == ['Outros', 'g29', 'g28', 'g27', 'g26', 'Outros (2)']
+        assert chart_df['v'].tolist() == [1225, 188, 186, 184, 182, 4030]
+        assert chart_df['v'].sum() == df['v'].sum()
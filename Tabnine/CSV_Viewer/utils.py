@@ -5,16 +5,105 @@ Este módulo contém funções puras para processamento e análise de dados CSV,
 incluindo carregamento, filtragem, cálculo de estatísticas e preparação de dados para gráficos.
 """
 
+import importlib.util
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Any, Optional, Union
 
 
-def load_csv_file(uploaded_file) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+# Motores de leitura aceitos por load_csv_file
+CSV_ENGINES = ["c", "pyarrow"]
+
+# Modos de busca: trecho literal, expressão regular, célula inteira, palavra inteira e início de palavra
+SEARCH_MODES = ["contains", "regex", "exact", "token", "prefix"]
+
+# Tokens do índice de busca: sequências de letras, dígitos e '_'
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Quantidade de expressões regulares compiladas mantidas em cache
+REGEX_CACHE_SIZE = 128
+
+# DataFrames com buscas anteriores guardadas e buscas guardadas por DataFrame
+MAX_FRAME_STATES = 8
+SEARCH_HISTORY_SIZE = 4
+
+# Orçamento (MB) do texto em minúsculas guardado para a busca, somando todos os DataFrames
+SEARCH_TEXT_MAX_MB = 256.0
+
+# Busca paralela: threads padrão, células (linhas x colunas) mínimas e linhas mínimas por fatia
+SEARCH_WORKERS = os.cpu_count() or 1
+PARALLEL_SEARCH_MIN_CELLS = 2_000_000
+PARALLEL_SHARD_MIN_ROWS = 50_000
+
+# Número de linhas a partir do qual o app cria o índice de trigramas
+TRIGRAM_INDEX_MIN_ROWS = 100000
+
+# Caracteres (linhas x largura) de cada lote convertido para array Unicode
+TRIGRAM_BATCH_CHARS = 4_000_000
+
+# Tamanho máximo (MB) de cada bloco de colunas reduzido de uma vez nas estatísticas
+STATS_BLOCK_MB = 64.0
+
+# Opções de linhas por página da tabela e valor padrão
+PAGE_SIZES = [25, 50, 100, 250, 500, 1000]
+DEFAULT_PAGE_SIZE = 100
+
+# Agregações do gráfico por valor de X, grupos exibidos e rótulo dos demais
+CHART_AGGREGATIONS = ["sum", "mean", "count", "min", "max"]
+TOP_GROUPS = 20
+OTHERS_LABEL = "Outros"
+
+
+def is_pyarrow_available() -> bool:
+    """
+    Verifica se a biblioteca opcional pyarrow está instalada.
+    
+    Returns:
+        True se pyarrow puder ser importado
+    """
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def get_read_options(engine: str = "c", dtype_backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Monta os argumentos de motor e backend de tipos para pd.read_csv.
+    
+    Sem pyarrow instalado, o motor volta para "c" e o backend para os tipos NumPy.
+    
+    Args:
+        engine: Motor de leitura ("c" ou "pyarrow")
+        dtype_backend: Backend de tipos (None, "numpy_nullable" ou "pyarrow")
+        
+    Returns:
+        Dicionário com os argumentos para pd.read_csv
+    """
+    if not is_pyarrow_available():
+        engine = "c"
+        if dtype_backend == "pyarrow":
+            dtype_backend = None
+    
+    options = {'engine': engine}
+    if dtype_backend is not None:
+        options['dtype_backend'] = dtype_backend
+    return options
+
+
+def load_csv_file(uploaded_file, engine: str = "c",
+                  dtype_backend: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     """
     Carrega um arquivo CSV em um DataFrame.
     
     Args:
         uploaded_file: Arquivo CSV carregado via Streamlit
+        engine: Motor de leitura ("c" ou "pyarrow" para parsing multi-thread)
+        dtype_backend: Backend de tipos ("pyarrow" para strings compactas)
         
     Returns:
         Tuple contendo (DataFrame, mensagem_erro)
@@ -22,12 +111,143 @@ def load_csv_file(uploaded_file) -> Tuple[Optional[pd.DataFrame], Optional[str]]
         Se erro: (None, mensagem_erro)
     """
     try:
-        df = pd.read_csv(uploaded_file)
+        if engine not in CSV_ENGINES:
+            raise ValueError(f"Motor de leitura inválido: {engine}")
+        df = pd.read_csv(uploaded_file, **get_read_options(engine, dtype_backend))
         return df, None
     except Exception as e:
         return None, str(e)
 
 
+def _to_search_text(series: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna para texto para a busca.
+    
+    Nulos de colunas Arrow/extensão viram 'nan', como nas colunas NumPy,
+    para que a busca retorne o mesmo resultado em qualquer backend.
+    
+    Args:
+        series: Coluna para converter
+        
+    Returns:
+        Série com o texto de cada célula
+    """
+    text = series.astype(str)
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and series.hasnans:
+        text = text.mask(series.isna(), 'nan')
+    return text
+
+
+# Estado auxiliar por DataFrame (identidade -> (weakref, estado)), em ordem de uso
+_frame_states = OrderedDict()
+_frame_states_lock = threading.RLock()
+
+
+def _get_frame_state(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Retorna o estado auxiliar (ex.: buscas anteriores) associado a um DataFrame.
+    
+    O estado é indexado pela identidade do DataFrame, some quando ele é
+    coletado e no máximo MAX_FRAME_STATES DataFrames são mantidos.
+    
+    Args:
+        df: DataFrame dono do estado
+        
+    Returns:
+        Dicionário mutável com o estado do DataFrame
+    """
+    key = id(df)
+    with _frame_states_lock:
+        entry = _frame_states.get(key)
+        if entry is not None and entry[0]() is df:
+            _frame_states.move_to_end(key)
+            return entry[1]
+        
+        state = {}
+        ref = weakref.ref(df, lambda dead_ref, key=key: _discard_frame_state(key, dead_ref))
+        _frame_states[key] = (ref, state)
+        while len(_frame_states) > MAX_FRAME_STATES:
+            _frame_states.popitem(last=False)
+        return state
+
+
+def _discard_frame_state(key: int, dead_ref: weakref.ref) -> None:
+    """Remove o estado de um DataFrame coletado."""
+    with _frame_states_lock:
+        entry = _frame_states.get(key)
+        if entry is not None and entry[0] is dead_ref:
+            del _frame_states[key]
+
+
+def clear_frame_states() -> None:
+    """Descarta o estado auxiliar de todos os DataFrames."""
+    with _frame_states_lock:
+        _frame_states.clear()
+
+
+def _live_frame_states() -> List[Dict[str, Any]]:
+    """Retorna o estado auxiliar de cada DataFrame ainda vivo."""
+    with _frame_states_lock:
+        return [state for ref, state in _frame_states.values() if ref() is not None]
+
+
+def get_dataset_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Retorna o perfil do DataFrame (colunas por tipo e valores ausentes), calculando-o uma única vez.
+    
+    O perfil fica no estado auxiliar do DataFrame e é reaproveitado por todas
+    as chamadas de get_dataframe_info e get_data_type_summary, em todos os
+    reruns, até outro arquivo ser carregado (um novo DataFrame). Se as colunas
+    ou os tipos mudarem, o perfil é refeito.
+    
+    Args:
+        df: DataFrame para análise
+        
+    Returns:
+        Dicionário com 'dtypes', 'numeric_columns', 'text_columns',
+        'missing_values', 'type_counts' e 'sort_orders' (ver get_sort_order)
+    """
+    state = _get_frame_state(df)
+    profile = state.get('profile')
+    if profile is not None and profile['dtypes'].equals(df.dtypes):
+        return profile
+    
+    dtypes = df.dtypes
+    profile = {
+        'dtypes': dtypes,
+        'numeric_columns': df.select_dtypes(include=['number']).columns.tolist(),
+        'text_columns': df.select_dtypes(include=['object', 'string']).columns.tolist(),
+        'missing_values': {col: df[col].isnull().sum() for col in df.columns},
+        'type_counts': dtypes.value_counts().to_dict(),
+        'sort_orders': {}
+    }
+    state['profile'] = profile
+    return profile
+
+
+def get_sort_order(df: pd.DataFrame, column: str) -> np.ndarray:
+    """
+    Retorna as posições das linhas em ordem crescente de uma coluna, calculando-as uma única vez.
+    
+    A ordenação é estável (valores iguais mantêm a ordem do arquivo) e deixa
+    os valores ausentes no fim, como sort_values. As posições ficam no perfil
+    do DataFrame, então os reruns do gráfico com a mesma coluna no eixo X,
+    com quaisquer colunas Y, só reordenam as linhas, sem ordenar de novo.
+    
+    Args:
+        df: DataFrame com os dados
+        column: Nome da coluna usada na ordenação
+        
+    Returns:
+        Array com as posições das linhas ordenadas
+    """
+    sort_orders = get_dataset_profile(df)['sort_orders']
+    order = sort_orders.get(column)
+    if order is None:
+        order = sort_orders[column] = np.asarray(df[column].array.argsort(kind='stable'))
+    return order
+
+
 def get_dataframe_info(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Extrai informações básicas do DataFrame.
@@ -38,71 +258,928 @@ def get_dataframe_info(df: pd.DataFrame) -> Dict[str, Any]:
     Returns:
         Dicionário com informações do DataFrame
     """
-    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-    text_cols = df.select_dtypes(include=['object', 'string']).columns.tolist()
+    profile = get_dataset_profile(df)
     
     return {
         'shape': df.shape,
         'total_rows': df.shape[0],
         'total_columns': df.shape[1],
-        'numeric_columns': numeric_cols,
-        'text_columns': text_cols,
-        'numeric_count': len(numeric_cols),
-        'text_count': len(text_cols),
-        'column_types': df.dtypes.astype(str).to_dict(),
-        'missing_values': df.isnull().sum().to_dict()
+        'numeric_columns': list(profile['numeric_columns']),
+        'text_columns': list(profile['text_columns']),
+        'numeric_count': len(profile['numeric_columns']),
+        'text_count': len(profile['text_columns']),
+        'column_types': profile['dtypes'].astype(str).to_dict(),
+        'missing_values': dict(profile['missing_values'])
     }
 
 
-def filter_dataframe_by_text(df: pd.DataFrame, search_text: str) -> Tuple[pd.DataFrame, int]:
+# Relógio lógico usado para descartar o texto de busca usado há mais tempo
+_search_text_clock = 0
+_search_text_lock = threading.Lock()
+
+
+def get_search_text(df: pd.DataFrame, position: int, max_mb: float = SEARCH_TEXT_MAX_MB) -> pd.Series:
+    """
+    Retorna o texto em minúsculas de uma coluna, gerando-o na primeira busca.
+    
+    O texto fica no estado auxiliar do DataFrame e é reaproveitado pelas
+    próximas buscas. Com PyArrow disponível ele é guardado como
+    'string[pyarrow]', que ocupa menos memória e permite busca literal
+    vetorizada. Se a soma de todos os DataFrames passar de max_mb, as
+    colunas usadas há mais tempo são descartadas.
+    
+    Args:
+        df: DataFrame buscado
+        position: Posição da coluna no DataFrame
+        max_mb: Orçamento em MB do texto guardado
+        
+    Returns:
+        Série com o texto em minúsculas da coluna, com índice posicional
+    """
+    global _search_text_clock
+    columns = _get_frame_state(df).setdefault('search_text', {})
+    with _search_text_lock:
+        _search_text_clock += 1
+        entry = columns.get(position)
+        if entry is not None:
+            entry[2] = _search_text_clock
+            return entry[0]
+    
+    text = _to_search_text(df.iloc[:, position]).reset_index(drop=True)
+    if is_pyarrow_available():
+        text = text.astype(pd.StringDtype("pyarrow"))
+    text = text.str.lower()
+    nbytes = int(text.memory_usage(index=False, deep=True))
+    
+    with _search_text_lock:
+        # [texto, bytes, último uso, índice de células exatas]
+        columns[position] = [text, nbytes, _search_text_clock, None]
+        
+        # Descarta as colunas usadas há mais tempo até caber no orçamento
+        entries = [(entry[2], state_columns, key, entry[1])
+                   for state_columns in (state.get('search_text', {}) for state in _live_frame_states())
+                   for key, entry in state_columns.items()]
+        total = sum(entry[3] for entry in entries)
+        for _, state_columns, key, size in sorted(entries, key=lambda entry: entry[0]):
+            if total <= max_mb * 1024 * 1024 or (state_columns is columns and key == position):
+                break
+            state_columns.pop(key, None)
+            total -= size
+    return text
+
+
+def get_search_text_memory(df: Optional[pd.DataFrame] = None) -> Tuple[int, int]:
+    """
+    Informa a memória ocupada pelo texto de busca guardado.
+    
+    Args:
+        df: DataFrame consultado (padrão: todos os DataFrames com estado)
+        
+    Returns:
+        Tuple contendo (número de colunas guardadas, bytes ocupados)
+    """
+    states = [_get_frame_state(df)] if df is not None else _live_frame_states()
+    with _search_text_lock:
+        sizes = [entry[1] for state in states for entry in state.get('search_text', {}).values()]
+    return len(sizes), sum(sizes)
+
+
+def drop_search_text(df: Optional[pd.DataFrame] = None) -> int:
+    """
+    Descarta o texto de busca guardado (ex.: quando falta memória).
+    
+    Args:
+        df: DataFrame cujo texto será descartado (padrão: todos)
+        
+    Returns:
+        Número de bytes liberados
+    """
+    states = [_get_frame_state(df)] if df is not None else _live_frame_states()
+    with _search_text_lock:
+        dropped = [state.pop('search_text', {}) for state in states]
+    return sum(entry[1] for columns in dropped for entry in columns.values())
+
+
+def _column_tokens(text: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extrai os pares (token, linha) de uma coluna de texto em minúsculas.
+    
+    Cada valor distinto é tokenizado uma única vez e as linhas são associadas
+    aos tokens do seu valor com operações vetorizadas.
+    
+    Args:
+        text: Coluna em texto minúsculo
+        
+    Returns:
+        Tuple contendo (tokens distintos, posição do token de cada par, linha de cada par)
+    """
+    codes, values = pd.factorize(text.to_numpy())
+    exploded = pd.Series(values, dtype=object).str.findall(TOKEN_PATTERN).explode().dropna()
+    if exploded.empty:
+        empty = np.array([], dtype=np.int64)
+        return np.array([], dtype=object), empty, empty
+    
+    value_ids = exploded.index.to_numpy()
+    token_ids, tokens = pd.factorize(exploded.to_numpy())
+    
+    # Linhas agrupadas por valor: cada par (valor, token) recebe as linhas do valor
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(values))
+    order = order[len(codes) - counts.sum():]
+    starts = np.cumsum(counts) - counts
+    repeats = counts[value_ids]
+    within = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    rows = order[np.repeat(starts[value_ids], repeats) + within]
+    
+    return np.asarray(tokens, dtype=object), np.repeat(token_ids, repeats), rows
+
+
+def build_search_index(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Constrói um índice invertido token -> linhas das colunas de texto.
+    
+    Os tokens (palavras em minúsculas) ficam em um array ordenado e as linhas
+    de cada token ficam contíguas em 'postings', delimitadas por 'offsets'.
+    
+    Args:
+        df: DataFrame para indexar
+        
+    Returns:
+        Dicionário com 'tokens', 'offsets', 'postings' e 'total_rows'
+    """
+    total_rows = len(df)
+    text_columns = df.select_dtypes(include=['object', 'string']).columns
+    
+    column_tokens, column_ids, column_rows = [], [], []
+    offset = 0
+    for col in text_columns:
+        tokens, ids, rows = _column_tokens(_to_search_text(df[col]).str.lower())
+        column_tokens.append(tokens)
+        column_ids.append(ids + offset)
+        column_rows.append(rows)
+        offset += len(tokens)
+    
+    if offset == 0:
+        return {
+            'tokens': np.array([], dtype=object),
+            'offsets': np.zeros(1, dtype=np.int64),
+            'postings': np.array([], dtype=np.int32),
+            'total_rows': total_rows
+        }
+    
+    # Numeração global e ordenada dos tokens
+    global_ids, tokens = pd.factorize(np.concatenate(column_tokens), sort=True)
+    ids = global_ids[np.concatenate(column_ids)].astype(np.int64)
+    
+    # Pares (token, linha) únicos, ordenados por token e linha
+    keys = np.sort(ids * total_rows + np.concatenate(column_rows))
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    ids, rows = np.divmod(keys, total_rows)
+    
+    return {
+        'tokens': np.asarray(tokens, dtype=object),
+        'offsets': np.searchsorted(ids, np.arange(len(tokens) + 1)),
+        'postings': rows.astype(np.int32 if total_rows < 2 ** 31 else np.int64),
+        'total_rows': total_rows
+    }
+
+
+def search_index_mask(index: Dict[str, Any], search_text: str, prefix: bool = False) -> Optional[np.ndarray]:
+    """
+    Consulta o índice: linhas que contêm todas as palavras do texto buscado.
+    
+    Args:
+        index: Índice criado por build_search_index
+        search_text: Texto para buscar
+        prefix: Se True, a última palavra é tratada como início de palavra
+        
+    Returns:
+        Máscara booleana por linha, ou None se o texto não tiver palavras
+    """
+    terms = TOKEN_PATTERN.findall(search_text.lower())
+    if not terms:
+        return None
+    
+    tokens, offsets, postings = index['tokens'], index['offsets'], index['postings']
+    mask = None
+    for i, term in enumerate(terms):
+        start = np.searchsorted(tokens, term, side='left')
+        if prefix and i == len(terms) - 1:
+            end = np.searchsorted(tokens, term + '\U0010ffff', side='left')
+        else:
+            end = np.searchsorted(tokens, term, side='right')
+        
+        term_mask = np.zeros(index['total_rows'], dtype=bool)
+        term_mask[postings[offsets[start]:offsets[end]]] = True
+        mask = term_mask if mask is None else mask & term_mask
+    return mask
+
+
+def _trigram_codes(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extrai os trigramas de um array de strings.
+    
+    As strings são convertidas em lotes de tamanho parecido para arrays Unicode
+    (um uint32 por caractere) e cada trigrama vira um inteiro com os três
+    pontos de código (21 bits cada).
+    
+    Args:
+        values: Array de strings
+        
+    Returns:
+        Tuple contendo (código de cada trigrama, posição da string de origem)
+    """
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    order = np.argsort(lengths, kind='stable')
+    order = order[lengths[order] >= 3]
+    
+    code_parts, id_parts = [], []
+    start = 0
+    while start < len(order):
+        end = min(len(order), start + max(1, TRIGRAM_BATCH_CHARS // lengths[order[start]]))
+        while end - start > 1 and (end - start) * lengths[order[end - 1]] > TRIGRAM_BATCH_CHARS:
+            end = start + max(1, TRIGRAM_BATCH_CHARS // lengths[order[end - 1]])
+        batch = order[start:end]
+        width = int(lengths[batch[-1]])
+        
+        chars = np.array(values[batch].tolist(), dtype=f'<U{width}').view(np.uint32)
+        chars = chars.reshape(len(batch), width).astype(np.uint64)
+        codes = (chars[:, :-2] << np.uint64(42)) | (chars[:, 1:-1] << np.uint64(21)) | chars[:, 2:]
+        valid = chars[:, 2:] != 0
+        code_parts.append(codes[valid])
+        id_parts.append(np.broadcast_to(batch[:, None], codes.shape)[valid])
+        start = end
+    
+    if not code_parts:
+        return np.array([], dtype=np.uint64), np.array([], dtype=np.int64)
+    return np.concatenate(code_parts), np.concatenate(id_parts)
+
+
+def build_trigram_index(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Constrói um índice de trigramas das colunas de texto para a busca por trecho.
+    
+    Para cada coluna, os textos distintos (as células convertidas como na
+    varredura, em minúsculas) são decompostos em trigramas; cada trigrama
+    aponta para os textos que o contêm. Agrupar pelo texto, e não pelo valor
+    original, mantém separados valores que o pandas considera iguais mas que
+    a busca enxerga diferentes (None e NaN, 1 e 1.0 e True).
+    
+    Args:
+        df: DataFrame para indexar
+        
+    Returns:
+        Dicionário com 'columns' (um dict por coluna de texto) e 'total_rows'
+    """
+    columns = []
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        # Texto distinto de cada linha (nulos já convertidos para 'nan'/'None')
+        codes, uniques = pd.factorize(_to_search_text(df[col]).str.lower())
+        text = np.asarray(uniques, dtype=object)
+        
+        # Uma linha qualquer de cada texto, usada para verificar os candidatos
+        rows = np.empty(len(text), dtype=np.int64)
+        rows[codes] = np.arange(len(codes))
+        
+        # Pares (trigrama, valor) únicos, ordenados por trigrama e valor
+        trigram_codes, value_ids = _trigram_codes(text)
+        order = np.lexsort((value_ids, trigram_codes))
+        trigram_codes, value_ids = trigram_codes[order], value_ids[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (trigram_codes[1:] != trigram_codes[:-1]) | (value_ids[1:] != value_ids[:-1])
+        trigram_codes, value_ids = trigram_codes[keep], value_ids[keep]
+        
+        # Início da lista de cada trigrama (nenhum se não houver valor com 3+ caracteres)
+        first = np.ones(len(trigram_codes), dtype=bool)
+        first[1:] = trigram_codes[1:] != trigram_codes[:-1]
+        starts = np.flatnonzero(first)
+        columns.append({
+            'column': col,
+            'codes': codes.astype(np.int32),
+            'rows': rows,
+            'trigrams': trigram_codes[starts],
+            'offsets': np.append(starts, len(trigram_codes)),
+            'postings': value_ids.astype(np.int32)
+        })
+    
+    return {'columns': columns, 'total_rows': len(df)}
+
+
+def trigram_search_columns(df: pd.DataFrame, index: Dict[str, Any], search_text: str,
+                           columns: Optional[List[str]] = None) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Busca um trecho de texto usando o índice de trigramas, coluna a coluna.
+    
+    Os valores que contêm todos os trigramas do texto são verificados com a
+    mesma busca literal da varredura, então o resultado é idêntico.
+    
+    Args:
+        df: DataFrame indexado
+        index: Índice criado por build_trigram_index
+        search_text: Texto para buscar
+        columns: Colunas buscadas (padrão: todas as indexadas)
+        
+    Returns:
+        Máscara booleana por linha de cada coluna, ou None se o texto tiver
+        menos de 3 caracteres
+    """
+    if len(search_text) < 3:
+        return None
+    query = search_text.lower()
+    query_codes = np.unique(_trigram_codes(np.array([query], dtype=object))[0])
+    
+    column_hits = {}
+    for column in index['columns']:
+        if columns is not None and column['column'] not in columns:
+            continue
+        column_hits[column['column']] = np.zeros(index['total_rows'], dtype=bool)
+        trigrams, offsets, postings = column['trigrams'], column['offsets'], column['postings']
+        positions = np.searchsorted(trigrams, query_codes)
+        if np.any(positions >= len(trigrams)) or np.any(trigrams[np.minimum(positions, len(trigrams) - 1)] != query_codes):
+            continue
+        
+        # Interseção das listas, começando pela mais curta
+        lists = sorted((postings[offsets[p]:offsets[p + 1]] for p in positions), key=len)
+        candidates = lists[0]
+        for values in lists[1:]:
+            candidates = np.intersect1d(candidates, values, assume_unique=True)
+        if len(candidates) == 0:
+            continue
+        
+        sample = df[column['column']].iloc[column['rows'][candidates]]
+        matched = _to_search_text(sample).str.lower().str.contains(query, regex=False).to_numpy(dtype=bool)
+        if matched.any():
+            hit = np.zeros(len(column['rows']), dtype=bool)
+            hit[candidates[matched]] = True
+            column_hits[column['column']] = hit[column['codes']]
+    return column_hits
+
+
+def trigram_search_mask(df: pd.DataFrame, index: Dict[str, Any], search_text: str) -> Optional[np.ndarray]:
+    """
+    Busca um trecho de texto usando o índice de trigramas.
+    
+    Args:
+        df: DataFrame indexado
+        index: Índice criado por build_trigram_index
+        search_text: Texto para buscar
+        
+    Returns:
+        Máscara booleana por linha, ou None se o texto tiver menos de 3 caracteres
+    """
+    column_hits = trigram_search_columns(df, index, search_text)
+    if column_hits is None:
+        return None
+    return _any_hit(column_hits, index['total_rows'])
+
+
+def _any_hit(column_hits: Dict[str, np.ndarray], total_rows: int) -> np.ndarray:
+    """Combina as máscaras das colunas: linhas encontradas em alguma coluna."""
+    mask = np.zeros(total_rows, dtype=bool)
+    for hits in column_hits.values():
+        mask |= hits
+    return mask
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_search_pattern(pattern: str) -> re.Pattern:
+    """
+    Compila uma expressão regular de busca (ignorando maiúsculas) uma única vez.
+    
+    Args:
+        pattern: Expressão regular digitada
+        
+    Returns:
+        Expressão compilada
+        
+    Raises:
+        ValueError: Se a expressão regular for inválida
+    """
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Expressão regular inválida: {e}") from e
+
+
+def _match_search_text(text: pd.Series, pattern: str, regex: bool = False) -> np.ndarray:
+    """
+    Verifica quais células do texto em minúsculas contêm o texto ou expressão.
+    
+    Textos literais são comparados sem expressão regular (bem mais rápido).
+    Expressões regulares usam o padrão compilado em cache, avaliado pelo
+    módulo re (o motor do PyArrow não aceita, por exemplo, lookbehind).
+    
+    Args:
+        text: Texto em minúsculas (ver get_search_text)
+        pattern: Texto ou expressão regular
+        regex: Se pattern é uma expressão regular
+        
+    Returns:
+        Máscara booleana por célula
+    """
+    if regex:
+        search = compile_search_pattern(pattern).search
+        values = text.to_numpy(dtype=object)
+        return np.fromiter((search(value) is not None for value in values), dtype=bool, count=len(values))
+    return text.str.contains(pattern.lower(), regex=False).to_numpy(dtype=bool)
+
+
+def _scan_text_columns(df: pd.DataFrame, text_columns: pd.Index, pattern: str,
+                       rows: Optional[np.ndarray] = None, n_workers: int = 1,
+                       regex: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Busca um texto ou expressão (case-insensitive) nas colunas de texto.
+    
+    Usa o texto em minúsculas de get_search_text. Com n_workers > 1 e ao
+    menos PARALLEL_SEARCH_MIN_CELLS células, cada coluna é dividida em
+    fatias de linhas verificadas em threads (as buscas literais do PyArrow
+    liberam o GIL).
+    
+    Args:
+        df: DataFrame para varrer
+        text_columns: Colunas de texto
+        pattern: Texto ou expressão regular
+        rows: Posições das linhas a verificar (padrão: todas)
+        n_workers: Número de threads
+        regex: Se pattern é uma expressão regular
+        
+    Returns:
+        Máscara booleana de cada coluna, com uma posição por linha verificada
+        
+    Raises:
+        ValueError: Se a expressão regular for inválida
+    """
+    if regex:
+        compile_search_pattern(pattern)
+    positions = [int(position) for position in np.flatnonzero(df.columns.isin(text_columns))]
+    total_rows = len(df) if rows is None else len(rows)
+    if n_workers <= 1 or total_rows * len(positions) < PARALLEL_SEARCH_MIN_CELLS:
+        column_hits = {}
+        for position in positions:
+            text = get_search_text(df, position)
+            if rows is not None:
+                text = text.iloc[rows]
+            column_hits[df.columns[position]] = _match_search_text(text, pattern, regex)
+        return column_hits
+    
+    shard_rows = max(PARALLEL_SHARD_MIN_ROWS, -(-total_rows // n_workers))
+    
+    def match_shard(text, start):
+        selection = slice(start, start + shard_rows) if rows is None else rows[start:start + shard_rows]
+        return _match_search_text(text.iloc[selection], pattern, regex)
+    
+    column_hits = {df.columns[position]: np.zeros(total_rows, dtype=bool) for position in positions}
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        # Converte cada coluna uma única vez antes de dividir em fatias
+        texts = list(executor.map(lambda position: get_search_text(df, position), positions))
+        shards = [(df.columns[position], start, executor.submit(match_shard, text, start))
+                  for position, text in zip(positions, texts) for start in range(0, total_rows, shard_rows)]
+        for column, start, future in shards:
+            column_hits[column][start:start + shard_rows] = future.result()
+    return column_hits
+
+
+def _exact_lookup(df: pd.DataFrame, position: int) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Retorna os códigos dos valores de uma coluna para a busca por célula exata.
+    
+    Cada valor distinto do texto em minúsculas recebe um código, e o texto
+    buscado é localizado por hash entre os valores distintos. O índice fica
+    junto do texto de get_search_text e entra no mesmo orçamento de memória.
+    
+    Args:
+        df: DataFrame buscado
+        position: Posição da coluna no DataFrame
+        
+    Returns:
+        Tuple contendo (código de cada linha, valores distintos)
+    """
+    text = get_search_text(df, position)
+    columns = _get_frame_state(df)['search_text']
+    with _search_text_lock:
+        entry = columns.get(position)
+        if entry is not None and entry[0] is text and entry[3] is not None:
+            return entry[3]
+    
+    codes, uniques = pd.factorize(text)
+    codes = codes.astype(np.int32 if len(uniques) < np.iinfo(np.int32).max else np.int64)
+    uniques = pd.Index(np.asarray(uniques, dtype=object))
+    with _search_text_lock:
+        entry = columns.get(position)
+        if entry is not None and entry[0] is text and entry[3] is None:
+            entry[3] = (codes, uniques)
+            entry[1] += codes.nbytes + int(uniques.memory_usage(deep=True))
+    return codes, uniques
+
+
+def _exact_text_columns(df: pd.DataFrame, text_columns: pd.Index, search_text: str) -> Dict[str, np.ndarray]:
+    """
+    Busca células de texto iguais ao texto (ignorando maiúsculas).
+    
+    Args:
+        df: DataFrame buscado
+        text_columns: Colunas de texto
+        search_text: Conteúdo completo da célula
+        
+    Returns:
+        Máscara booleana por linha de cada coluna
+    """
+    query = search_text.lower()
+    column_hits = {}
+    for position in np.flatnonzero(df.columns.isin(text_columns)):
+        codes, uniques = _exact_lookup(df, int(position))
+        code = uniques.get_indexer([query])[0]
+        column_hits[df.columns[position]] = codes == code if code >= 0 else np.zeros(len(df), dtype=bool)
+    return column_hits
+
+
+def _narrow_from_history(df: pd.DataFrame, text_columns: pd.Index, search_text: str,
+                         history: List[Tuple[str, int, Tuple[str, ...], np.ndarray, Dict[str, int]]],
+                         n_workers: int = 1) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Refina uma busca anterior cujo texto está contido no texto atual.
+    
+    Quem contém "sao paulo" também contém "sao p", então basta verificar as
+    linhas encontradas na busca anterior, se ela cobriu as mesmas colunas.
+    
+    Args:
+        df: DataFrame buscado
+        text_columns: Colunas de texto buscadas agora
+        search_text: Texto buscado agora
+        history: Buscas anteriores como (texto, número de linhas, colunas,
+            máscara, ocorrências por coluna)
+        n_workers: Número de threads da varredura
+        
+    Returns:
+        Máscara de cada coluna na busca atual, ou None se nenhuma busca anterior servir
+    """
+    query = search_text.lower()
+    best = None
+    for previous_text, total_rows, previous_columns, previous_mask, _ in history:
+        if (total_rows != len(df) or previous_text.lower() not in query
+                or not set(text_columns).issubset(previous_columns)):
+            continue
+        if best is None or previous_mask.sum() < best.sum():
+            best = previous_mask
+    if best is None:
+        return None
+    
+    rows = np.flatnonzero(best)
+    column_hits = {column: np.zeros(len(df), dtype=bool) for column in text_columns}
+    if len(rows):
+        for column, hits in _scan_text_columns(df, text_columns, search_text, rows, n_workers).items():
+            column_hits[column][rows] = hits
+    return column_hits
+
+
+def search_dataframe(df: pd.DataFrame, search_text: str, mode: str = "contains",
+                     columns: Optional[List[str]] = None,
+                     index: Optional[Dict[str, Any]] = None,
+                     trigram_index: Optional[Dict[str, Any]] = None,
+                     n_workers: int = 1) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Busca texto nas colunas de string e conta as linhas encontradas em cada uma.
+    
+    No modo "contains" o texto é buscado literalmente (".", "(" etc. são
+    caracteres comuns) em qualquer posição das células; no modo "regex" ele é
+    uma expressão regular, compilada uma vez e mantida em cache; no modo
+    "exact" a célula inteira deve ser igual ao texto, localizada por hash. Nos
+    modos "token" e "prefix" cada palavra deve aparecer inteira (ou como início
+    de palavra, para a última palavra em "prefix"); com um índice criado por
+    build_search_index a consulta não varre o DataFrame. No modo "contains",
+    um índice de trigramas restringe a verificação aos valores candidatos e,
+    sem ele, uma busca anterior no mesmo DataFrame cujo texto está contido no
+    atual (digitação incremental) é refinada em vez de varrer tudo.
+    
+    Com columns, só essas colunas de texto são convertidas e varridas. As
+    ocorrências saem da mesma varredura da máscara; nos modos por palavra com
+    índice (que não separa colunas), só as linhas encontradas são verificadas.
+    
+    Args:
+        df: DataFrame para buscar
+        search_text: Texto para buscar
+        mode: Modo de busca (um de SEARCH_MODES)
+        columns: Colunas buscadas (padrão: todas as colunas de texto)
+        index: Índice de busca do DataFrame (opcional)
+        trigram_index: Índice criado por build_trigram_index (opcional)
+        n_workers: Threads usadas nas varreduras a partir de PARALLEL_SEARCH_MIN_CELLS células
+        
+    Returns:
+        Tuple contendo (máscara booleana por linha, linhas encontradas por coluna)
+        
+    Raises:
+        ValueError: Se o modo for inválido, alguma coluna não existir ou a
+        expressão regular não compilar
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Modo de busca inválido: {mode}")
+    
+    # Identificar colunas de texto (opcionalmente só as escolhidas)
+    text_columns = df.select_dtypes(include=['object', 'string']).columns
+    if columns is not None:
+        missing = [column for column in columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"Colunas não encontradas: {missing}")
+        text_columns = text_columns[text_columns.isin(columns)]
+    
+    if not search_text:
+        return np.ones(len(df), dtype=bool), {}
+    
+    counts = None
+    if mode == "contains":
+        history = _get_frame_state(df).setdefault('search_history', [])
+        key = (search_text, len(df), tuple(text_columns))
+        repeated = [entry for entry in history if entry[:3] == key]
+        if repeated:
+            mask, counts = repeated[0][3], repeated[0][4]
+        else:
+            column_hits = None
+            if trigram_index is not None and trigram_index['total_rows'] == len(df):
+                column_hits = trigram_search_columns(df, trigram_index, search_text, list(text_columns))
+            if column_hits is None:
+                column_hits = _narrow_from_history(df, text_columns, search_text, history, n_workers)
+            if column_hits is None:
+                column_hits = _scan_text_columns(df, text_columns, search_text, n_workers=n_workers)
+            mask = _any_hit(column_hits, len(df))
+            counts = {column: int(hits.sum()) for column, hits in column_hits.items()}
+        
+        # Últimas buscas (mais recente no fim), usadas pelas próximas digitações
+        history[:] = [entry for entry in history if entry[:3] != key][-(SEARCH_HISTORY_SIZE - 1):]
+        history.append(key + (mask, counts))
+        mask = mask.copy()
+    elif mode == "regex":
+        column_hits = _scan_text_columns(df, text_columns, search_text, n_workers=n_workers, regex=True)
+    elif mode == "exact":
+        column_hits = _exact_text_columns(df, text_columns, search_text)
+    else:
+        terms = TOKEN_PATTERN.findall(search_text.lower())
+        patterns = [rf'(?<!\w){re.escape(term)}' + ('' if mode == "prefix" and i == len(terms) - 1 else r'(?!\w)')
+                    for i, term in enumerate(terms)]
+        all_text_columns = columns is None or len(text_columns) == len(df.select_dtypes(include=['object', 'string']).columns)
+        if not terms:
+            column_hits = _scan_text_columns(df, text_columns, search_text, n_workers=n_workers)
+        elif index is not None and index['total_rows'] == len(df) and all_text_columns:
+            mask = search_index_mask(index, search_text, prefix=mode == "prefix")
+            rows = np.flatnonzero(mask)
+            row_hits = _scan_text_columns(df, text_columns, '|'.join(patterns), rows, n_workers, regex=True)
+            counts = {column: int(hits.sum()) for column, hits in row_hits.items()}
+        else:
+            # Sem índice: mesma semântica por varredura com limites de palavra
+            mask = np.ones(len(df), dtype=bool)
+            any_term = {column: np.zeros(len(df), dtype=bool) for column in text_columns}
+            for pattern in patterns:
+                term_hits = _scan_text_columns(df, text_columns, pattern, n_workers=n_workers, regex=True)
+                mask &= _any_hit(term_hits, len(df))
+                for column, hits in term_hits.items():
+                    any_term[column] |= hits
+            counts = {column: int((hits & mask).sum()) for column, hits in any_term.items()}
+    
+    if counts is None:
+        mask = _any_hit(column_hits, len(df))
+        counts = {column: int(hits.sum()) for column, hits in column_hits.items()}
+    return mask, counts
+
+
+def filter_dataframe_by_text(df: pd.DataFrame, search_text: str, mode: str = "contains",
+                             index: Optional[Dict[str, Any]] = None,
+                             trigram_index: Optional[Dict[str, Any]] = None,
+                             n_workers: int = 1,
+                             columns: Optional[List[str]] = None,
+                             max_rows: Optional[int] = None) -> Tuple[pd.DataFrame, int]:
     """
     Filtra DataFrame por texto em colunas de string.
     
+    Nunca copia o DataFrame inteiro: sem texto (ou sem colunas de texto) o
+    próprio df é retornado, e com max_rows apenas as primeiras linhas
+    encontradas são copiadas.
+    
     Args:
         df: DataFrame para filtrar
         search_text: Texto para buscar
+        mode: Modo de busca (ver search_dataframe)
+        index: Índice de busca do DataFrame (opcional)
+        trigram_index: Índice criado por build_trigram_index (opcional)
+        n_workers: Número de threads da busca (1 = serial)
+        columns: Colunas buscadas (padrão: todas as colunas de texto)
+        max_rows: Máximo de linhas retornadas (None = todas)
         
     Returns:
-        Tuple contendo (DataFrame filtrado, número de resultados encontrados)
+        Tuple contendo (DataFrame filtrado, número de resultados encontrados),
+        com o número de resultados contando também as linhas além de max_rows
+        
+    Raises:
+        ValueError: Se o modo for inválido, alguma coluna não existir ou a
+        expressão regular não compilar
     """
-    if not search_text:
-        return df, len(df)
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Modo de busca inválido: {mode}")
     
-    # Identificar colunas de texto
-    text_columns = df.select_dtypes(include=['object', 'string']).columns
+    if not search_text:
+        return (df if max_rows is None else df.head(max_rows)), len(df)
     
-    if len(text_columns) == 0:
+    if len(df.select_dtypes(include=['object', 'string']).columns) == 0:
         return df, 0
     
-    # Criar máscara de busca
-    mask = df[text_columns].astype(str).apply(
-        lambda x: x.str.contains(search_text, case=False, na=False)
-    ).any(axis=1)
-    
-    filtered_df = df[mask]
-    return filtered_df, len(filtered_df)
+    mask, _ = search_dataframe(df, search_text, mode, columns, index, trigram_index, n_workers)
+    rows = np.flatnonzero(mask)
+    return df.iloc[rows[:max_rows]], len(rows)
 
 
-def limit_dataframe_rows(df: pd.DataFrame, max_rows: int) -> Tuple[pd.DataFrame, bool]:
+def limit_dataframe_rows(df: pd.DataFrame, max_rows: int,
+                         mask: Optional[np.ndarray] = None) -> Tuple[pd.DataFrame, bool]:
     """
     Limita o número de linhas do DataFrame.
     
+    Com uma máscara de filtro, retorna as primeiras max_rows linhas que passam
+    nela, sem montar o DataFrame filtrado completo.
+    
     Args:
         df: DataFrame para limitar
         max_rows: Número máximo de linhas
+        mask: Máscara booleana das linhas filtradas (None = todas as linhas)
         
     Returns:
         Tuple contendo (DataFrame limitado, foi_limitado)
     """
+    if mask is not None:
+        rows = np.flatnonzero(mask)
+        return df.iloc[rows[:max_rows]], len(rows) > max_rows
     if len(df) > max_rows:
         return df.head(max_rows), True
     return df, False
 
 
+def paginate_dataframe(df: pd.DataFrame, mask: Optional[np.ndarray] = None, page: int = 1,
+                       page_size: int = DEFAULT_PAGE_SIZE) -> Tuple[pd.DataFrame, int, int]:
+    """
+    Seleciona uma página das linhas que passam no filtro.
+    
+    Apenas as linhas da página são copiadas; o total de páginas vem da
+    máscara, sem montar o DataFrame filtrado.
+    
+    Args:
+        df: DataFrame completo
+        mask: Máscara booleana das linhas filtradas (None = todas as linhas)
+        page: Número da página (a partir de 1), ajustado às páginas existentes
+        page_size: Número de linhas por página
+        
+    Returns:
+        Tuple contendo (linhas da página, página exibida, total de páginas)
+        
+    Raises:
+        ValueError: Se page_size não for positivo
+    """
+    if page_size < 1:
+        raise ValueError(f"Linhas por página inválidas: {page_size}")
+    
+    total_rows = len(df) if mask is None else int(np.count_nonzero(mask))
+    total_pages = max(1, -(-total_rows // page_size))
+    page = min(max(int(page), 1), total_pages)
+    start = (page - 1) * page_size
+    
+    if mask is None:
+        return df.iloc[start:start + page_size], page, total_pages
+    return df.iloc[np.flatnonzero(mask)[start:start + page_size]], page, total_pages
+
+
+def find_row_page(row: int, mask: Optional[np.ndarray] = None, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    Encontra a página que exibe uma linha do DataFrame completo.
+    
+    Se a linha não passou no filtro, retorna a página da próxima linha
+    filtrada (ou a última página).
+    
+    Args:
+        row: Posição da linha no DataFrame completo (a partir de 0)
+        mask: Máscara booleana das linhas filtradas (None = todas as linhas)
+        page_size: Número de linhas por página
+        
+    Returns:
+        Número da página (a partir de 1)
+    """
+    rank = max(int(row), 0)
+    if mask is not None:
+        # Quantas linhas filtradas vêm antes da linha procurada
+        rank = min(int(np.count_nonzero(mask[:rank])), max(int(np.count_nonzero(mask)) - 1, 0))
+    return rank // page_size + 1
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    """
+    Converte uma coluna numérica para array NumPy.
+    
+    Tipos nullable ou Arrow viram float64 com NaN quando há valores
+    ausentes; sem ausentes, mantêm o tipo NumPy equivalente.
+    """
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+    numpy_dtype = getattr(series.dtype, 'numpy_dtype', np.dtype(np.float64))
+    if series.hasnans or numpy_dtype.kind not in "iuf":
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return series.to_numpy(dtype=numpy_dtype)
+
+
+def _block_statistics(block: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Calcula contagem, soma, média, desvio padrão, mínimo e máximo de cada linha de um bloco 2-D.
+    
+    Cada linha do bloco é uma coluna do DataFrame. As reduções são as mesmas
+    do pandas (pandas.core.nanops), feitas para todas as colunas de uma vez,
+    com a máscara de ausentes calculada uma única vez. Os ausentes do bloco
+    são substituídos por 0.
+    
+    Args:
+        block: Valores das colunas, uma por linha, todas do mesmo tipo
+        
+    Returns:
+        Dicionário com um array por estatística
+    """
+    dtype = block.dtype
+    is_float = dtype.kind == "f"
+    n_columns, n_values = block.shape
+    if n_values == 0:
+        empty = np.full(n_columns, np.nan)
+        return {'count': np.zeros(n_columns, dtype=np.int64), 'sum': block.sum(axis=1),
+                'mean': empty, 'std': empty, 'min': empty, 'max': empty}
+    
+    # Mínimo e máximo ignorando NaN, antes de preencher os ausentes
+    minimums, maximums = np.fmin.reduce(block, axis=1), np.fmax.reduce(block, axis=1)
+    mask = np.isnan(block) if is_float else None
+    if mask is not None and mask.any():
+        count = n_values - mask.sum(axis=1)
+        np.putmask(block, mask, 0)
+    else:
+        mask = None
+        count = np.full(n_columns, n_values, dtype=np.int64)
+    
+    # Floats somam no próprio tipo; inteiros somam em int64/uint64 e calculam a média em float64
+    sums = block.sum(axis=1, dtype=dtype if is_float else np.dtype(np.uint64 if dtype.kind == "u" else np.int64))
+    as_float = block if is_float else block.astype(np.float64)
+    with np.errstate(all="ignore"):
+        if is_float:
+            means = sums / count.astype(dtype)
+            float_sums = sums if dtype == np.float64 else block.sum(axis=1, dtype=np.float64)
+        else:
+            means = block.sum(axis=1, dtype=np.float64) / count
+            float_sums = as_float.sum(axis=1)
+        
+        # Variância em duas passadas: média e soma dos quadrados dos desvios (ddof=1)
+        var_count = np.where(count > 1, count, np.nan)
+        squares = (float_sums / var_count)[:, None] - as_float
+        squares **= 2
+        if mask is not None:
+            np.putmask(squares, mask, 0)
+        variances = squares.sum(axis=1, dtype=np.float64) / (var_count - 1)
+        stds = np.sqrt(variances.astype(dtype) if is_float else variances)
+    
+    return {'count': count, 'sum': sums, 'mean': means, 'std': stds, 'min': minimums, 'max': maximums}
+
+
+def _column_statistics(df: pd.DataFrame, columns: List[str],
+                       block_mb: float = STATS_BLOCK_MB) -> Dict[str, List[Any]]:
+    """
+    Calcula as estatísticas das colunas numéricas, agrupando as de mesmo tipo em blocos.
+    
+    Args:
+        df: DataFrame com os dados
+        columns: Colunas numéricas
+        block_mb: Tamanho máximo (MB) de cada bloco de colunas
+        
+    Returns:
+        Dicionário com uma lista por estatística ('count', 'sum', 'mean',
+        'std', 'min', 'max'), na ordem de columns, igual às reduções do pandas
+    """
+    values = [_numeric_values(df[column]) for column in columns]
+    groups = {}
+    for i, array in enumerate(values):
+        groups.setdefault(array.dtype, []).append(i)
+    
+    results = {name: [None] * len(columns) for name in ('count', 'sum', 'mean', 'std', 'min', 'max')}
+    for dtype, members in groups.items():
+        width = max(1, int(block_mb * 1024 * 1024 // max(len(df) * dtype.itemsize, 1)))
+        for start in range(0, len(members), width):
+            chunk = members[start:start + width]
+            for name, column_values in _block_statistics(np.stack([values[i] for i in chunk])).items():
+                for j, i in enumerate(chunk):
+                    results[name][i] = column_values[j]
+    
+    # Inteiros nullable com ausentes foram reduzidos em float64: soma, mínimo e máximo voltam a ser inteiros
+    for i, column in enumerate(columns):
+        dtype = df[column].dtype
+        if (not isinstance(dtype, np.dtype) and getattr(dtype, 'numpy_dtype', dtype).kind in "iu"
+                and values[i].dtype.kind == "f" and results['count'][i] > 0):
+            for name in ('sum', 'min', 'max'):
+                results[name][i] = np.int64(results[name][i])
+    return results
+
+
 def calculate_numeric_statistics(df: pd.DataFrame, selected_columns: List[str]) -> pd.DataFrame:
     """
     Calcula estatísticas para colunas numéricas selecionadas.
     
+    As colunas de mesmo tipo são reduzidas juntas, em blocos 2-D, e os
+    valores são iguais aos das reduções do pandas coluna a coluna.
+    
     Args:
         df: DataFrame com os dados
         selected_columns: Lista de colunas numéricas para analisar
@@ -113,16 +1190,16 @@ def calculate_numeric_statistics(df: pd.DataFrame, selected_columns: List[str])
     if not selected_columns:
         return pd.DataFrame()
     
-    df_numeric = df[selected_columns]
+    stats = _column_statistics(df, selected_columns)
     
     stats_data = {
         'Coluna': selected_columns,
-        'Contagem': [df_numeric[col].count() for col in selected_columns],
-        'Média': [df_numeric[col].mean() for col in selected_columns],
-        'Soma': [df_numeric[col].sum() for col in selected_columns],
-        'Mínimo': [df_numeric[col].min() for col in selected_columns],
-        'Máximo': [df_numeric[col].max() for col in selected_columns],
-        'Desvio Padrão': [df_numeric[col].std() for col in selected_columns]
+        'Contagem': stats['count'],
+        'Média': stats['mean'],
+        'Soma': stats['sum'],
+        'Mínimo': stats['min'],
+        'Máximo': stats['max'],
+        'Desvio Padrão': stats['std']
     }
     
     stats_df = pd.DataFrame(stats_data)
@@ -157,15 +1234,143 @@ def calculate_summary_statistics(stats_df: pd.DataFrame) -> Dict[str, float]:
     }
 
 
-def prepare_chart_data(df: pd.DataFrame, x_col: str, y_cols: List[str], max_points: int) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+def _row_extremes(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Posições do mínimo e do máximo de cada linha de um bloco 2-D, ignorando NaN.
+    
+    Em floats, fmin/fmax ignoram NaN e a posição é a primeira com o valor
+    extremo (linhas só com NaN retornam 0).
+    """
+    if block.dtype.kind != "f":
+        return block.argmin(axis=1), block.argmax(axis=1)
+    lows = np.fmin.reduce(block, axis=1)
+    highs = np.fmax.reduce(block, axis=1)
+    return (block == lows[:, None]).argmax(axis=1), (block == highs[:, None]).argmax(axis=1)
+
+
+def downsample_indices(df: pd.DataFrame, y_cols: List[str], max_points: int) -> np.ndarray:
+    """
+    Escolhe as linhas de um gráfico pela redução M4, mantendo a forma das séries.
+    
+    As linhas são divididas em intervalos consecutivos de mesmo tamanho; de
+    cada intervalo ficam a primeira e a última linha e as linhas com o
+    mínimo e o máximo de cada série. O gráfico cobre todo o eixo X e mostra
+    picos e vales, ao contrário de cortar as primeiras linhas. Os extremos
+    de todos os intervalos saem de uma única redução sobre cada série vista
+    como matriz (intervalos × linhas).
+    
+    Args:
+        df: DataFrame com os dados, já na ordem do eixo X
+        y_cols: Colunas numéricas das séries
+        max_points: Número máximo de linhas escolhidas
+        
+    Returns:
+        Array com as posições escolhidas, em ordem crescente
+    """
+    n_rows = len(df)
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+    
+    n_buckets = max(1, max_points // (2 + 2 * len(y_cols)))
+    size = -(-n_rows // n_buckets)
+    n_full = n_rows // size
+    starts = np.arange(0, n_rows, size)
+    picks = [starts, np.minimum(starts + size, n_rows) - 1]
+    for y_col in y_cols:
+        values = _numeric_values(df[y_col])
+        full = values[:n_full * size].reshape(n_full, size)
+        picks.extend(extremes + starts[:n_full] for extremes in _row_extremes(full))
+        if n_full * size < n_rows:
+            tail = values[None, n_full * size:]
+            picks.extend(extremes + n_full * size for extremes in _row_extremes(tail))
+    return np.unique(np.concatenate(picks))
+
+
+def _others_label(labels: pd.Index) -> str:
+    """Rótulo do grupo que reúne os demais: "Outros", com sufixo se já houver um grupo com esse nome."""
+    label, suffix = OTHERS_LABEL, 2
+    while label in labels:
+        label = f"{OTHERS_LABEL} ({suffix})"
+        suffix += 1
+    return label
+
+
+def aggregate_chart_data(df: pd.DataFrame, x_col: str, y_cols: List[str], aggregation: str = "sum",
+                         top_groups: int = TOP_GROUPS) -> Tuple[pd.DataFrame, int]:
+    """
+    Agrupa os dados por X, mantendo os maiores grupos e reunindo os demais em "Outros".
+    
+    Um único groupby calcula as reduções de todas as colunas Y (valores
+    ausentes são ignorados, como no pandas). A média é derivada de soma e
+    contagem, para que "Outros" tenha a média exata das suas linhas. Os
+    grupos são ordenados pelo valor agregado da primeira coluna Y, do maior
+    para o menor.
+    
+    Args:
+        df: DataFrame com os dados
+        x_col: Coluna do eixo X
+        y_cols: Colunas das séries
+        aggregation: Uma de CHART_AGGREGATIONS
+        top_groups: Quantidade de grupos exibidos antes de "Outros"
+        
+    Returns:
+        Tuple contendo (uma linha por grupo com X como texto, total de grupos)
+        
+    Raises:
+        ValueError: Se a agregação for desconhecida ou top_groups menor que 1
+    """
+    if aggregation not in CHART_AGGREGATIONS:
+        raise ValueError(f"Agregação desconhecida: {aggregation}")
+    if top_groups < 1:
+        raise ValueError(f"A quantidade de grupos deve ser ao menos 1: {top_groups}")
+    
+    functions = ['sum', 'count'] if aggregation == 'mean' else [aggregation]
+    grouped = df.groupby(x_col, sort=False, observed=True)[y_cols].agg(functions)
+    n_groups = len(grouped)
+    
+    if aggregation == 'mean':
+        values = grouped.xs('sum', axis=1, level=1) / grouped.xs('count', axis=1, level=1)
+    else:
+        values = grouped.xs(aggregation, axis=1, level=1)
+    
+    order = values[y_cols[0]].sort_values(ascending=False, kind='stable').index
+    result = values.loc[order[:top_groups]]
+    result.index = result.index.astype(str)
+    
+    if n_groups > top_groups:
+        rest = grouped.loc[order[top_groups:]]
+        if aggregation == 'mean':
+            others = rest.xs('sum', axis=1, level=1).sum() / rest.xs('count', axis=1, level=1).sum()
+        else:
+            # Somas e contagens se somam; mínimos e máximos se combinam pelo extremo
+            combine = 'sum' if aggregation in ('sum', 'count') else aggregation
+            others = rest.xs(aggregation, axis=1, level=1).agg(combine)
+        others_row = others.to_frame(_others_label(result.index)).T
+        result = pd.concat([result, others_row.astype(result.dtypes.to_dict())])
+    
+    result.index.name = x_col
+    return result.reset_index(), n_groups
+
+
+def prepare_chart_data(df: pd.DataFrame, x_col: str, y_cols: List[str], max_points: int,
+                       aggregation: Optional[str] = None,
+                       top_groups: int = TOP_GROUPS) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
     Prepara dados para criação de gráficos.
     
+    Séries com mais de max_points linhas são reduzidas por downsample_indices,
+    que preserva o intervalo completo do eixo X e os extremos de cada série.
+    Com uma agregação, as linhas são agrupadas por X (ver aggregate_chart_data)
+    e o gráfico recebe no máximo top_groups + 1 barras; com "(índice)" no
+    eixo X cada linha é um grupo, então a agregação é ignorada.
+    
     Args:
         df: DataFrame com os dados
         x_col: Nome da coluna para eixo X (ou "(índice)" para usar índice)
         y_cols: Lista de colunas para eixo Y
         max_points: Número máximo de pontos no gráfico
+        aggregation: Agregação por valor de X (None = um ponto por linha)
+        top_groups: Quantidade de grupos exibidos com agregação
         
     Returns:
         Tuple contendo (DataFrame preparado, informações do gráfico)
@@ -173,28 +1378,44 @@ def prepare_chart_data(df: pd.DataFrame, x_col: str, y_cols: List[str], max_poin
     if not y_cols:
         return pd.DataFrame(), {}
     
-    # Limitar número de linhas
-    df_chart = df.copy()
-    was_limited = False
+    if aggregation is not None and x_col != "(índice)":
+        chart_df, n_groups = aggregate_chart_data(df, x_col, y_cols, aggregation, top_groups)
+        chart_info = {
+            'x_label': x_col,
+            'y_columns': y_cols,
+            'total_points': len(chart_df),
+            'was_limited': False,
+            'original_length': len(df),
+            'is_date_sorted': False,
+            'aggregation': aggregation,
+            'n_groups': n_groups
+        }
+        return chart_df, chart_info
+    
+    # Apenas as colunas do gráfico, sem copiar o DataFrame
+    columns = list(dict.fromkeys(y_cols if x_col == "(índice)" else [x_col] + y_cols))
+    df_chart = df[columns]
+    
+    # Se o eixo X for uma coluna de data, ordenar antes de reduzir (pela ordem guardada no perfil)
+    is_date_sorted = False
+    if x_col != "(índice)":
+        if df_chart[x_col].dtype == 'datetime64[ns]' or 'date' in str(df_chart[x_col].dtype).lower():
+            df_chart = df_chart.take(get_sort_order(df, x_col))
+            is_date_sorted = True
     
-    if len(df_chart) > max_points:
-        df_chart = df_chart.head(max_points)
-        was_limited = True
+    # Reduzir o número de linhas mantendo a forma das séries
+    positions = np.arange(len(df_chart))
+    was_limited = len(df_chart) > max_points
+    if was_limited:
+        positions = downsample_indices(df_chart, y_cols, max_points)
+        df_chart = df_chart.iloc[positions]
     
     # Preparar dados do eixo X
     if x_col == "(índice)":
-        x_data = list(range(len(df_chart)))
+        x_data = positions.tolist()
         x_label = "Índice"
-        is_date_sorted = False
     else:
         x_label = x_col
-        # Se for coluna de data, tentar ordenar
-        if df_chart[x_col].dtype == 'datetime64[ns]' or 'date' in str(df_chart[x_col].dtype).lower():
-            df_chart = df_chart.sort_values(by=x_col)
-            is_date_sorted = True
-        else:
-            is_date_sorted = False
-        
         x_data = df_chart[x_col].tolist()
     
     # Preparar dados do gráfico
@@ -211,7 +1432,8 @@ def prepare_chart_data(df: pd.DataFrame, x_col: str, y_cols: List[str], max_poin
         'total_points': len(df_chart),
         'was_limited': was_limited,
         'original_length': len(df),
-        'is_date_sorted': is_date_sorted
+        'is_date_sorted': is_date_sorted,
+        'aggregation': None
     }
     
     return chart_df, chart_info
@@ -257,7 +1479,7 @@ def get_data_type_summary(df: pd.DataFrame) -> Dict[str, int]:
     Returns:
         Dicionário com contagem de cada tipo de dado
     """
-    return df.dtypes.value_counts().to_dict()
+    return dict(get_dataset_profile(df)['type_counts'])
 
 
 def create_info_dataframes(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]: